@@ -0,0 +1,67 @@
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from models.effect import Effect
+from models.scene import Scene
+from models.segment import Segment
+from services.data_cache import DataCacheService
+
+
+def build_cache(effect_count: int, segments_per_effect: int) -> DataCacheService:
+    """Build cache holding one scene of effect_count effects with segments_per_effect segments each"""
+    effects = []
+    for effect_id in range(effect_count):
+        effect = Effect(effect_id=effect_id)
+        for segment_id in range(segments_per_effect):
+            effect.add_segment(Segment(
+                segment_id=segment_id,
+                color=[0, 1],
+                transparency=[0.0, 0.0],
+                length=[10],
+                move_speed=0.0,
+                move_range=[0, 99],
+                initial_position=0,
+                current_position=0.0,
+                is_edge_reflect=False,
+                region_id=0,
+                dimmer_time=[],
+            ))
+        effects.append(effect)
+    cache = DataCacheService()
+    cache.scenes = {0: Scene(scene_id=0, led_count=100, fps=60, current_effect_id=effect_count - 1,
+                             current_palette_id=0, palettes=[[[0, 0, 0]]], effects=effects)}
+    cache._scene_ids = None
+    cache.current_scene_id = 0
+    cache.current_effect_id = effect_count - 1
+    return cache
+
+
+def time_per_call(func, iterations: int) -> float:
+    """Average wall time of func() in microseconds"""
+    func()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) * 1_000_000 / iterations
+
+
+def main(effect_count: int = 200, segments_per_effect: int = 500):
+    logging.disable(logging.INFO)
+    cache = build_cache(effect_count, segments_per_effect)
+    last_effect = effect_count - 1
+    print(f"{effect_count} effects x {segments_per_effect} segments")
+    print(f"{'get_scene_ids':<34} {time_per_call(cache.get_scene_ids, 10000):>10.2f} us")
+    print(f"{'get_effect_ids':<34} {time_per_call(cache.get_effect_ids, 10000):>10.2f} us")
+    print(f"{'get_effect (last)':<34} {time_per_call(lambda: cache.get_effect(0, last_effect), 10000):>10.2f} us")
+    print(f"{'get_segment_ids':<34} {time_per_call(cache.get_segment_ids, 10000):>10.2f} us")
+    effect = cache.get_current_effect()
+    print(f"{'get_segment_ids after add_segment':<34} "
+          f"{time_per_call(lambda: (effect.invalidate_index(), effect.get_segment_ids()), 1000):>10.2f} us")
+
+
+if __name__ == "__main__":
+    main()
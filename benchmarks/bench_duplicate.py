@@ -0,0 +1,35 @@
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from models.scene import Scene
+from bench_cache_lookup import build_cache
+
+
+def time_once(func) -> float:
+    """Wall time of one func() call in milliseconds"""
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def main(effect_count: int = 20, segments_per_effect: int = 500):
+    logging.disable(logging.INFO)
+    cache = build_cache(effect_count, segments_per_effect)
+    last_effect = effect_count - 1
+    print(f"{effect_count} effects x {segments_per_effect} segments")
+    print(f"{'to_dict/from_dict copy':<34} "
+          f"{time_once(lambda: Scene.from_dict(cache.get_scene(0).to_dict())):>10.2f} ms")
+    print(f"{'duplicate_scene':<34} {time_once(lambda: cache.duplicate_scene(0)):>10.2f} ms")
+    print(f"{'first edit of duplicate':<34} "
+          f"{time_once(lambda: cache.update_segment_parameter('0', 'move_speed', 1.0, 1, last_effect)):>10.2f} ms")
+    print(f"{'second edit of duplicate':<34} "
+          f"{time_once(lambda: cache.update_segment_parameter('1', 'move_speed', 1.0, 1, last_effect)):>10.2f} ms")
+    print(f"{'duplicate_effect':<34} {time_once(lambda: cache.duplicate_effect(last_effect, 0)):>10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
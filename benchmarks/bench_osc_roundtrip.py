@@ -0,0 +1,67 @@
+import asyncio
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.mock_engine import MockPlaybackEngine
+from services.osc_service import OSCService
+from services.osc_transport import AsyncOSCTransport
+
+
+def bench_fire_and_forget(engine: MockPlaybackEngine, count: int = 20000):
+    service = OSCService(client_port=engine.port)
+    service.start_client()
+    before = engine.get_stats()['commands_received']
+    start = time.perf_counter()
+    for index in range(count):
+        service.send_update_segment(0, "move_speed", float(index))
+    sent_seconds = time.perf_counter() - start
+
+    deadline = time.monotonic() + 5.0
+    while engine.get_stats()['commands_received'] - before < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+    received = engine.get_stats()['commands_received'] - before
+    applied_seconds = time.perf_counter() - start
+    final = engine.export_state()['scenes'][0]['effects'][0]['segments']['0']['move_speed']
+    print(f"fire-and-forget   {count / sent_seconds:,.0f} msg/s sent, {received / applied_seconds:,.0f} msg/s applied, "
+          f"{count - received} lost, converged={final == float(count - 1)}")
+
+
+async def bench_round_trip(engine: MockPlaybackEngine, count: int = 2000, window: int = 32):
+    transport = AsyncOSCTransport(server_port=0, client_port=engine.port)
+    await transport.start()
+
+    latencies = []
+    for index in range(count):
+        start = time.perf_counter()
+        await transport.request("/update_segment", 0, "transparency", 0, (index % 100) / 100)
+        latencies.append(time.perf_counter() - start)
+    ms = np.array(latencies) * 1000
+    print(f"sequential rtt    p50 {np.percentile(ms, 50):.3f} ms  p99 {np.percentile(ms, 99):.3f} ms  "
+          f"{count / ms.sum() * 1000:,.0f} req/s")
+
+    start = time.perf_counter()
+    for offset in range(0, count, window):
+        await asyncio.gather(*(transport.submit("/update_segment", 0, "move_speed", float(i))
+                               for i in range(offset, min(offset + window, count))))
+    seconds = time.perf_counter() - start
+    print(f"pipelined x{window:<4}   {count / seconds:,.0f} req/s")
+    transport.stop()
+
+
+def main():
+    logging.disable(logging.INFO)
+    engine = MockPlaybackEngine(port=0)
+    engine.start()
+    bench_fire_and_forget(engine)
+    asyncio.run(bench_round_trip(engine))
+    engine.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import logging
+import os
+import socket
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from pythonosc.udp_client import SimpleUDPClient
+
+from services.osc_service import OSCService
+from services.osc_template import TemplateUDPClient, palette_address
+
+
+def palette_ticks(count: int):
+    return [(index % 4, index % 6, index % 256, (index * 7) % 256, (index * 13) % 256) for index in range(count)]
+
+
+def bench(label: str, send, ticks, baseline: float = None) -> float:
+    start = time.perf_counter()
+    for palette_id, color_index, r, g, b in ticks:
+        send(palette_id, color_index, r, g, b)
+    rate = len(ticks) / (time.perf_counter() - start)
+    speedup = f"  x{rate / baseline:.1f}" if baseline else ""
+    print(f"{label:<34} {rate:>12,.0f} msg/s{speedup}")
+    return rate
+
+
+def main(count: int = 10000):
+    logging.disable(logging.INFO)
+    sink = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sink.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    sink.bind(("127.0.0.1", 0))
+    port = sink.getsockname()[1]
+    ticks = palette_ticks(count)
+
+    simple = SimpleUDPClient("127.0.0.1", port)
+    baseline = bench("SimpleUDPClient.send_message", lambda p, c, r, g, b: simple.send_message(f"/palette/{p}/{c}", [r, g, b]), ticks)
+
+    fast = TemplateUDPClient("127.0.0.1", port)
+    bench("TemplateUDPClient.send_fast", lambda p, c, r, g, b: fast.send_fast(palette_address(p, c), (r, g, b)), ticks, baseline)
+
+    service = OSCService(client_port=port)
+    service.start_client()
+    bench("OSCService._transmit (templated)", lambda p, c, r, g, b: service._transmit(palette_address(p, c), (r, g, b)), ticks, baseline)
+    service.client = simple
+    bench("OSCService._transmit (builder)", lambda p, c, r, g, b: service._transmit(f"/palette/{p}/{c}", (r, g, b)), ticks, baseline)
+
+    fast.close()
+    sink.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from engine.parallel import render_scenes_parallel
+from bench_renderer import build_scene
+
+
+def bench_parallel_scaling(scene_count: int = 8, led_count: int = 2000, duration: float = 10.0):
+    scenes = [build_scene(led_count) for _ in range(scene_count)]
+    frames = scene_count * int(duration * scenes[0].fps)
+    cores = os.cpu_count() or 1
+    print(f"{scene_count} scenes x {led_count} LEDs x {duration:.0f} s ({frames} frames), {cores} cores")
+    print("workers   seconds   frames/s   speedup")
+
+    baseline = None
+    with tempfile.TemporaryDirectory() as directory:
+        paths = [os.path.join(directory, f"scene_{index}.npy") for index in range(scene_count)]
+        for workers in sorted({1, 2, 4, 8, 16, cores}):
+            start = time.perf_counter()
+            render_scenes_parallel(scenes, paths, duration, max_workers=workers)
+            seconds = time.perf_counter() - start
+            baseline = baseline or seconds
+            print(f"{workers:<9} {seconds:<9.2f} {frames / seconds:<10.0f} {baseline / seconds:.2f}x")
+
+
+if __name__ == "__main__":
+    bench_parallel_scaling()
@@ -0,0 +1,99 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from engine.dimmer import DimmerBankCache
+from engine.renderer import FrameRenderer, apply_palette, palette_to_array
+from models.effect import Effect
+from models.scene import Scene
+from models.segment import Segment
+
+
+PALETTE = [[0, 0, 0], [255, 0, 0], [255, 255, 0], [0, 0, 255], [0, 255, 0], [255, 255, 255]]
+
+
+def build_scene(led_count: int, leds_per_segment: int = 50) -> Scene:
+    """Build synthetic scene with one three-color moving segment per leds_per_segment LEDs"""
+    effect = Effect(effect_id=0)
+    for segment_id in range(max(1, led_count // leds_per_segment)):
+        effect.add_segment(Segment(
+            segment_id=segment_id,
+            color=[segment_id % 6, (segment_id + 1) % 6, (segment_id + 2) % 6],
+            transparency=[0.0, 0.3, 0.6],
+            length=[leds_per_segment // 2, leds_per_segment // 2],
+            move_speed=20.0 + segment_id % 40,
+            move_range=[0, led_count - 1],
+            initial_position=(segment_id * leds_per_segment) % led_count,
+            current_position=0.0,
+            is_edge_reflect=segment_id % 2 == 0,
+            region_id=0,
+            dimmer_time=[[1000, 0, 100], [500, 100, 100], [1000, 100, 0]],
+        ))
+    return Scene(
+        scene_id=0,
+        led_count=led_count,
+        fps=60,
+        current_effect_id=0,
+        current_palette_id=0,
+        palettes=[PALETTE],
+        effects=[effect],
+    )
+
+
+def time_per_call(func, iterations: int) -> float:
+    """Average wall time of func() in milliseconds"""
+    func()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) * 1000.0 / iterations
+
+
+def bench_render_scaling():
+    print("LEDs    segments   ms/frame   ns/LED")
+    for led_count in (400, 1000, 5000, 10000, 20000):
+        scene = build_scene(led_count)
+        renderer = FrameRenderer(scene)
+        frame_index = iter(range(10 ** 9))
+        ms = time_per_call(lambda: renderer.render(0, next(frame_index) / scene.fps), 200)
+        segments = len(scene.effects[0].segments)
+        print(f"{led_count:<7} {segments:<10} {ms:<10.3f} {ms * 1e6 / led_count:.1f}")
+
+
+def bench_palette_swap(led_count: int = 10000):
+    scene = build_scene(led_count)
+    renderer = FrameRenderer(scene)
+    palettes = [palette_to_array(PALETTE), palette_to_array(PALETTE[::-1])]
+    index_frame = renderer.render_index(0, 1.0)
+    swaps = iter(range(10 ** 9))
+
+    full_ms = time_per_call(lambda: renderer.render(0, 1.0, next(swaps) % 2), 200)
+    lut_ms = time_per_call(lambda: apply_palette(index_frame, palettes[next(swaps) % 2]), 2000)
+    print(f"\nPalette swap at {led_count} LEDs")
+    print(f"full re-composite   {full_ms:.3f} ms/frame")
+    print(f"palette LUT only    {lut_ms:.3f} ms/frame ({full_ms / lut_ms:.0f}x faster)")
+
+
+def bench_dimmer_ramps(segment_count: int = 200):
+    print(f"\nDimmer evaluation for {segment_count} segments")
+    print("ramps/segment   ms/frame")
+    for ramp_count in (2, 50, 500):
+        segments = list(build_scene(segment_count * 50).effects[0].segments.values())
+        for segment in segments:
+            segment.dimmer_time = [[100 + i % 7, i % 100, (i * 37) % 100] for i in range(ramp_count)]
+        banks = DimmerBankCache()
+        frame_index = iter(range(10 ** 9))
+        ms = time_per_call(lambda: banks.get(segments).levels_at(next(frame_index) / 60.0), 500)
+        print(f"{ramp_count:<15} {ms:.3f}")
+
+
+def main():
+    bench_render_scaling()
+    bench_palette_swap()
+    bench_dimmer_ramps()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import argparse
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.utils.logger import AppLogger
+from services.mock_engine import MockPlaybackEngine
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run local stand-in playback engine on UDP")
+    parser.add_argument("--ip", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8001, help="Port to listen on (GUI client port)")
+    parser.add_argument("--reply-port", type=int, default=None, help="Send responses to this port instead of the sender (GUI server port)")
+    parser.add_argument("--load", default=None, help="Show JSON file to load on start")
+    parser.add_argument("--render", action="store_true", help="Render current effect at scene fps")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    AppLogger.initialize()
+
+    reply_address = (args.ip, args.reply_port) if args.reply_port else None
+    engine = MockPlaybackEngine(args.ip, args.port, reply_address, args.render)
+    if args.load:
+        engine.data_cache.load_from_file(args.load)
+    if not engine.start():
+        return 1
+
+    try:
+        while True:
+            time.sleep(5.0)
+            AppLogger.info(f"Mock engine stats: {engine.get_stats()}")
+    except KeyboardInterrupt:
+        engine.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
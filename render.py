@@ -0,0 +1,63 @@
+import argparse
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.services.file_service import FileService
+from src.utils.logger import AppLogger
+from engine.offline import DEFAULT_CHUNK_FRAMES, render_scene_to_file
+from engine.parallel import render_scenes_parallel
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Render scene timeline to frame file without GUI")
+    parser.add_argument("input", help="Show JSON file")
+    parser.add_argument("output", help="Output frame file (.npy, anything else is raw RGB), or directory with --all-scenes")
+    parser.add_argument("--duration", type=float, required=True, help="Seconds to render")
+    parser.add_argument("--scene", type=int, default=None, help="Scene ID (default: first scene)")
+    parser.add_argument("--all-scenes", action="store_true", help="Render every scene to <output>/scene_<id>.npy")
+    parser.add_argument("--effect", type=int, default=None, help="Effect ID (default: scene's current effect)")
+    parser.add_argument("--palette", type=int, default=None, help="Palette ID (default: scene's current palette)")
+    parser.add_argument("--chunk-frames", type=int, default=DEFAULT_CHUNK_FRAMES, help="Frames held in memory at once")
+    parser.add_argument("--workers", type=int, default=None, help="Render processes (default: single process, all cores with --all-scenes)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    AppLogger.initialize()
+
+    file_service = FileService()
+    errors = []
+    file_service.on_file_loaded = lambda path, success, error: errors.append(error) if not success else None
+    if not file_service.load_file_from_path(args.input):
+        AppLogger.error(errors[0] if errors else f"Failed to load {args.input}")
+        return 1
+
+    data_cache = file_service.data_cache
+    if args.all_scenes:
+        os.makedirs(args.output, exist_ok=True)
+        scenes = [data_cache.get_scene(scene_id) for scene_id in data_cache.get_scene_ids()]
+        paths = [os.path.join(args.output, f"scene_{scene.scene_id}.npy") for scene in scenes]
+        return 0 if render_scenes_parallel(
+            scenes, paths, args.duration, args.effect, args.palette, args.chunk_frames, args.workers
+        ) else 1
+
+    scene_id = args.scene if args.scene is not None else data_cache.current_scene_id
+    scene = data_cache.get_scene(scene_id)
+    if scene is None:
+        AppLogger.error(f"Scene {scene_id} not found in {args.input}")
+        return 1
+
+    if args.workers and args.workers > 1:
+        success = render_scenes_parallel(
+            [scene], [args.output], args.duration, args.effect, args.palette, args.chunk_frames, args.workers
+        )
+    else:
+        success = render_scene_to_file(scene, args.output, args.duration, args.effect, args.palette, args.chunk_frames)
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
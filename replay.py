@@ -0,0 +1,59 @@
+import argparse
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.utils.logger import AppLogger
+from services.mock_engine import MockPlaybackEngine
+from services.osc_recorder import replay_log
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay recorded OSC session against a playback engine")
+    parser.add_argument("log", help="Session log written by OSCService.start_recording")
+    parser.add_argument("--ip", default="127.0.0.1", help="Engine address")
+    parser.add_argument("--port", type=int, default=8001, help="Engine port")
+    parser.add_argument("--speed", type=float, default=1.0, help="Playback speed multiplier, 0 for as fast as possible")
+    parser.add_argument("--mock", action="store_true", help="Replay against a local mock engine instead of --ip/--port")
+    parser.add_argument("--load", default=None, help="Show JSON file the mock engine loads first")
+    parser.add_argument("--settle", type=float, default=0.5, help="Seconds to wait for responses after the last packet")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    AppLogger.initialize()
+
+    engine = None
+    address = (args.ip, args.port)
+    if args.mock:
+        engine = MockPlaybackEngine(port=0)
+        if args.load:
+            engine.data_cache.load_from_file(args.load)
+        if not engine.start():
+            return 1
+        address = ("127.0.0.1", engine.port)
+
+    try:
+        report = replay_log(args.log, address, args.speed, args.settle)
+    except (OSError, ValueError) as e:
+        AppLogger.error(f"Replay failed: {e}")
+        return 1
+    finally:
+        if engine:
+            engine.stop()
+
+    AppLogger.info(
+        f"Replayed {report['packets']} packets in {report['elapsed_s']:.2f}s "
+        f"({report['packets_per_s']:,.0f}/s, recorded {report['recorded_packets_per_s']:,.0f}/s over {report['recorded_s']:.2f}s), "
+        f"max lag {report['max_lag_ms']:.1f} ms, {report['send_errors']} send errors, "
+        f"{report['responses']}/{report['recorded_responses']} responses, {report['dropped']} dropped"
+    )
+    if engine:
+        AppLogger.info(f"Mock engine stats: {engine.get_stats()}")
+    return 0 if report['send_errors'] == 0 and report['dropped'] == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
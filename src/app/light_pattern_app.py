@@ -1,13 +1,20 @@
 import flet as ft
 import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 from components.panel import SceneEffectPanel, SegmentEditPanel
 from components.data import DataActionHandler
+from components.preview import LEDPreviewComponent
 from components.ui.menu_bar import MenuBarComponent
 from services.file_service import FileService
 from services.data_cache import data_cache
+from services.osc_service import osc_service
 from utils.logger import AppLogger
 
 
+TEXT_INPUTS = (ft.TextField, ft.SearchBar)
+
+
 class LightPatternApp(ft.Container):
     """Main application container with data action handler integration"""
     
@@ -20,6 +27,10 @@ class LightPatternApp(ft.Container):
         self.file_service = FileService(data_cache)
         
         self._setup_file_service_callbacks()
+        self._text_focus: Optional[str] = None
+        self._history_sender = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history-step")
+        self._watch_text_focus()
+        self.page.on_keyboard_event = self._on_keyboard_event
         
         self.expand = True
         self.opacity = 1.0
@@ -67,13 +78,52 @@ class LightPatternApp(ft.Container):
         self.file_service.on_file_saved = on_file_saved
         self.file_service.on_error = on_error
         
+    def _watch_text_focus(self):
+        """Follow which text input has keyboard focus
+
+        Flet has no focused-control property, but the client reports focus and
+        blur of every text field, handled or not, so they are seen here before
+        the page dispatches them.
+        """
+        dispatch = self.page.on_event_async
+        
+        async def on_event_async(e):
+            if e.name in ("focus", "blur") and isinstance(self.page.get_control(e.target), TEXT_INPUTS):
+                if e.name == "focus":
+                    self._text_focus = e.target
+                elif self._text_focus == e.target:
+                    self._text_focus = None
+            await dispatch(e)
+            
+        self.page.on_event_async = on_event_async
+        
+    def _on_keyboard_event(self, e: ft.KeyboardEvent):
+        """Undo with Ctrl+Z, redo with Ctrl+Shift+Z or Ctrl+Y, bringing a connected engine along
+
+        Shortcuts are left to a text input that has focus. The engine is
+        updated on a background thread, one step after another, because a
+        step that needs a state sync can take seconds.
+        """
+        if not (e.ctrl or e.meta) or self._text_focus is not None:
+            return
+        key = e.key.upper()
+        if key == "Z" and not e.shift:
+            step = data_cache.undo()
+        elif key == "Y" or key == "Z":
+            step = data_cache.redo()
+        else:
+            return
+        if step is not None and osc_service.is_connected():
+            self._history_sender.submit(_send_history_step, step)
+            
     def build_content(self):
         """Build the main application layout"""
         
         self.scene_effect_panel = SceneEffectPanel(self.page)
         self.segment_edit_panel = SegmentEditPanel(self.page)
+        self.led_preview = LEDPreviewComponent(self.page)
         
-        main_content = ft.Row([
+        panels = ft.Row([
             ft.Container(
                 content=self.scene_effect_panel,
                 width=None,
@@ -91,6 +141,16 @@ class LightPatternApp(ft.Container):
         spacing=5,
         vertical_alignment=ft.CrossAxisAlignment.START)
         
+        main_content = ft.Column([
+            ft.Container(
+                content=self.led_preview,
+                padding=ft.padding.symmetric(horizontal=10, vertical=5)
+            ),
+            panels
+        ],
+        expand=True,
+        spacing=0)
+        
         if self.use_menu_bar:
             menu_bar = MenuBarComponent(self.page, self.file_service, self.data_action_handler)
             
@@ -158,4 +218,12 @@ class LightPatternApp(ft.Container):
             return cache_status.get('is_loaded', False) and cache_status.get('scene_count', 0) > 0
         except Exception as e:
             AppLogger.error(f"Data integrity check failed: {e}")
-            return False
\ No newline at end of file
+            return False
+
+
+def _send_history_step(step):
+    """Replay undo or redo step on the engine, logging instead of losing errors in the worker thread"""
+    try:
+        osc_service.send_history_step(step, data_cache)
+    except Exception as e:
+        AppLogger.error(f"Error sending undo/redo step to engine: {e}")
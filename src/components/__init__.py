@@ -52,6 +52,11 @@ from .data import (
     DataActionHandler
 )
 
+from .preview import (
+    LEDPreviewComponent,
+    PreviewActionHandler
+)
+
 __all__ = [
     # UI Components
     'Toast',
@@ -95,5 +100,9 @@ __all__ = [
     'SegmentEditPanel',
     
     # Data Components
-    'DataActionHandler'
+    'DataActionHandler',
+    
+    # Preview Components
+    'LEDPreviewComponent',
+    'PreviewActionHandler'
 ]
\ No newline at end of file
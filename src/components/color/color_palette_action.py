@@ -1,6 +1,8 @@
+import copy
 import flet as ft
 from services.color_service import color_service
 from services.data_cache import data_cache
+from services.state_diff import DEFAULT_PALETTE
 from .tabbed_color_picker import TabbedColorPickerDialog
 from ..ui.toast import ToastManager
 from utils.helpers import safe_dropdown_update
@@ -18,7 +20,7 @@ class ColorPaletteActionHandler:
     def add_palette(self, e):
         """Handle add palette action - create at end, set as current"""
         try:
-            new_palette_id = data_cache.create_new_palette()
+            new_palette_id = data_cache.create_palette(copy.deepcopy(DEFAULT_PALETTE))
             
             if new_palette_id is not None:
                 data_cache.set_current_palette(new_palette_id)
@@ -82,10 +84,12 @@ class ColorPaletteActionHandler:
             return
             
         try:
-            new_palette_id = data_cache.duplicate_palette(current_palette_id)
+            with data_cache.transaction():
+                new_palette_id = data_cache.duplicate_palette(current_palette_id)
+                if new_palette_id is not None:
+                    data_cache.set_current_palette(new_palette_id)
             
             if new_palette_id is not None:
-                data_cache.set_current_palette(new_palette_id)
                 color_service.sync_with_cache_palette()
                 self.toast_manager.show_success_sync(f"Palette {current_palette_id} duplicated as Palette {new_palette_id} (now current)")
             else:
@@ -193,13 +197,14 @@ class ColorPaletteActionHandler:
     def create_palette_with_colors(self, colors: List[str]) -> Optional[int]:
         """Create new palette with specific colors"""
         try:
-            new_palette_id = data_cache.create_new_palette()
+            with data_cache.transaction():
+                new_palette_id = data_cache.create_palette(copy.deepcopy(DEFAULT_PALETTE))
+                if new_palette_id is not None:
+                    for i, color in enumerate(colors[:6]):
+                        data_cache.update_palette_color(new_palette_id, i, color)
+                    data_cache.set_current_palette(new_palette_id)
             
             if new_palette_id is not None:
-                for i, color in enumerate(colors[:6]):
-                    data_cache.update_palette_color(new_palette_id, i, color)
-                    
-                data_cache.set_current_palette(new_palette_id)
                 color_service.sync_with_cache_palette()
                 self.toast_manager.show_success_sync(f"Custom palette {new_palette_id} created")
                 return new_palette_id
@@ -1,12 +1,17 @@
 import flet as ft
 from typing import Dict, Any, Optional
 from services.data_cache import data_cache
+from services.cache_events import (ChangeBatch, PaletteColorChanged, SceneSettingsChanged, SegmentParamChanged, SelectionChanged,
+                                   StructureChanged)
 from services.color_service import color_service
 from models.color_palette import ColorPalette
 from components.ui.toast import ToastManager
 from utils.helpers import safe_component_update
 from utils.logger import AppLogger
 
+MOVE_PARAMS = frozenset({"move_range", "move_speed", "initial_position", "is_edge_reflect"})
+COLOR_PARAMS = frozenset({"color", "transparency", "length"})
+
 
 class DataActionHandler:
     """Action handler to work with data cache and update UI"""
@@ -16,7 +21,10 @@ class DataActionHandler:
         self.toast_manager = ToastManager(page)
         self.scene_effect_panel = None
         self.segment_edit_panel = None
-        data_cache.add_change_listener(self._on_cache_changed)
+        data_cache.subscribe(self._on_cache_changed, (StructureChanged, SelectionChanged, ChangeBatch))
+        data_cache.subscribe(self._on_scene_settings_changed, SceneSettingsChanged)
+        data_cache.subscribe(self._on_palette_color_changed, PaletteColorChanged)
+        data_cache.subscribe(self._on_segment_param_changed, SegmentParamChanged)
         self._initialize_ui_with_cache_data()
         
     def _initialize_ui_with_cache_data(self):
@@ -49,7 +57,6 @@ class DataActionHandler:
             self._set_loading_state(True)
             success = data_cache.load_from_json_data(json_data)
             if success:
-                self.update_all_ui_from_cache()
                 self.toast_manager.show_success_sync("Loaded JSON data successfully")
             else:
                 self.toast_manager.show_error_sync("Failed to load JSON data")
@@ -66,7 +73,6 @@ class DataActionHandler:
             self._set_loading_state(True)
             success = data_cache.load_from_file(file_path)
             if success:
-                self.update_all_ui_from_cache()
                 self.toast_manager.show_success_sync(f"Loaded file {file_path} successfully")
             else:
                 self.toast_manager.show_error_sync(f"Failed to load file {file_path}")
@@ -304,13 +310,49 @@ class DataActionHandler:
         except Exception as e:
             AppLogger.error(f"Error updating color service: {e}")
             
-    def _on_cache_changed(self):
-        """Handle cache changes"""
+    def _on_cache_changed(self, event=None):
+        """Rebuild all panels after structure, selection or transaction changes"""
         try:
             self.update_all_ui_from_cache()
         except Exception as e:
             AppLogger.error(f"Error handling cache change: {e}")
             
+    def _on_scene_settings_changed(self, event: SceneSettingsChanged):
+        """Refresh scene settings when the current scene's properties change"""
+        if event.scene_id != data_cache.current_scene_id or not self.scene_effect_panel:
+            return
+        self._update_scene_settings()
+        safe_component_update(self.scene_effect_panel, "scene_settings_update")
+        
+    def _on_palette_color_changed(self, event: PaletteColorChanged):
+        """Re-sync palette colors used by the color service and segment preview"""
+        if event.scene_id != data_cache.current_scene_id or event.palette_id != data_cache.current_palette_id:
+            return
+        self._update_color_service()
+        if self.segment_edit_panel and hasattr(self.segment_edit_panel, 'update_color_composition'):
+            self.segment_edit_panel.update_color_composition()
+            
+    def _on_segment_param_changed(self, event: SegmentParamChanged):
+        """Refresh only the segment controls showing the changed parameter of the selected segment"""
+        if (event.scene_id != data_cache.current_scene_id or event.effect_id != data_cache.current_effect_id
+                or str(event.segment_id) != str(color_service.current_segment_id) or not self.segment_edit_panel):
+            return
+            
+        try:
+            segment = data_cache.get_segment(str(event.segment_id))
+            if event.param in MOVE_PARAMS:
+                self._update_move_component(segment)
+            elif event.param in COLOR_PARAMS:
+                if hasattr(self.segment_edit_panel, 'update_color_composition'):
+                    self.segment_edit_panel.update_color_composition()
+            elif event.param == "region_id" and hasattr(self.segment_edit_panel, 'segment_component'):
+                sc = self.segment_edit_panel.segment_component
+                if hasattr(sc, 'region_assign_dropdown'):
+                    sc.region_assign_dropdown.value = str(segment.region_id)
+                    sc.region_assign_dropdown.update()
+        except Exception as e:
+            AppLogger.error(f"Error handling segment {event.param} change: {e}")
+            
     def export_current_data(self) -> Dict[str, Any]:
         """Export current cache data"""
         try:
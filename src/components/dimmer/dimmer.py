@@ -3,6 +3,7 @@ import flet_datatable2 as fdt
 from typing import Optional
 from .dimmer_action import DimmerActionHandler
 from services.data_cache import data_cache
+from services.cache_events import ChangeBatch, SegmentParamChanged, SelectionChanged, StructureChanged
 from utils.logger import AppLogger
 
 
@@ -18,7 +19,8 @@ class DimmerComponent(ft.Container):
         self.is_editing = False
         self.current_segment_id: Optional[str] = None
         
-        data_cache.add_change_listener(self._on_cache_changed)
+        data_cache.subscribe(self._on_cache_changed, (StructureChanged, SelectionChanged, ChangeBatch))
+        data_cache.subscribe(self._on_dimmer_changed, SegmentParamChanged)
         
         self.content = self.build_content()
         self.expand = True
@@ -327,7 +329,7 @@ class DimmerComponent(ft.Container):
             initial = int(self.initial_brightness_field.value or 0)
             final = int(self.final_brightness_field.value or 100)
 
-            success = data_cache.add_dimmer_element(self.current_segment_id, duration, initial, final)
+            success = data_cache.add_dimmer_element(self.current_segment_id, [duration, initial, final])
 
             if success:
                 self.clear_input_fields()
@@ -396,7 +398,12 @@ class DimmerComponent(ft.Container):
             AppLogger.error(f"Error refreshing table from cache: {e}")
             self._build_empty_table()
 
-    def _on_cache_changed(self):
+    def _on_dimmer_changed(self, event: SegmentParamChanged):
+        """Refresh table when the shown segment's dimmer sequence changes"""
+        if event.param == "dimmer_time" and str(event.segment_id) == str(self.current_segment_id):
+            self._on_cache_changed(event)
+
+    def _on_cache_changed(self, event=None):
         """Handle cache change notifications"""
         try:
             
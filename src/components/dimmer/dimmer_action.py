@@ -18,7 +18,7 @@ class DimmerActionHandler:
                 duration_val = int(duration)
                 initial_val = int(initial_brightness)
                 final_val = int(final_brightness)
-                success = data_cache.add_dimmer_element(segment_id, duration_val, initial_val, final_val)
+                success = data_cache.add_dimmer_element(segment_id, [duration_val, initial_val, final_val])
                 
                 if success:
                     self.toast_manager.show_success_sync("Dimmer element added")
@@ -108,7 +108,7 @@ class DimmerActionHandler:
     def create_dimmer_sequence(self, segment_id: str, duration_ms: int, initial_brightness: int, final_brightness: int):
         """Create dimmer sequence for segment"""
         if self._validate_brightness_values(initial_brightness, final_brightness):
-            success = data_cache.add_dimmer_element(segment_id, duration_ms, initial_brightness, final_brightness)
+            success = data_cache.add_dimmer_element(segment_id, [duration_ms, initial_brightness, final_brightness])
             if success:
                 self.toast_manager.show_success_sync(f"Dimmer created for segment {segment_id}")
                 return True
@@ -209,15 +209,10 @@ class DimmerActionHandler:
                 self.toast_manager.show_error_sync(f"Source segment {source_segment_id} has no dimmer data")
                 return False
                 
-            target_segment = data_cache.get_segment(target_segment_id)
-            if target_segment and hasattr(target_segment, 'dimmer_time'):
-                target_segment.dimmer_time.clear()
-                
-            for duration, initial, final in source_segment.dimmer_time:
-                success = data_cache.add_dimmer_element(target_segment_id, duration, initial, final)
-                if not success:
-                    self.toast_manager.show_error_sync("Failed to clone dimmer sequence")
-                    return False
+            dimmer_time = [list(element) for element in source_segment.dimmer_time]
+            if not data_cache.update_segment_parameter(target_segment_id, "dimmer_time", dimmer_time):
+                self.toast_manager.show_error_sync("Failed to clone dimmer sequence")
+                return False
                     
             self.toast_manager.show_success_sync(f"Dimmer sequence cloned from segment {source_segment_id} to {target_segment_id}")
             return True
@@ -233,9 +228,7 @@ class DimmerActionHandler:
             segment = data_cache.get_segment(segment_id)
             if segment and hasattr(segment, 'dimmer_time'):
                 element_count = len(segment.dimmer_time)
-                segment.dimmer_time.clear()
-                
-                data_cache._notify_change()
+                data_cache.update_segment_parameter(segment_id, "dimmer_time", [])
                 
                 self.toast_manager.show_warning_sync(f"Cleared {element_count} dimmer elements")
                 return True
@@ -259,15 +252,13 @@ class DimmerActionHandler:
         half_duration = cycle_duration_ms // 2
         
         try:
-            success1 = data_cache.add_dimmer_element(segment_id, half_duration, 0, 100)
-            success2 = data_cache.add_dimmer_element(segment_id, half_duration, 100, 0)
+            with data_cache.transaction():
+                for initial, final in ((0, 100), (100, 0)):
+                    if not data_cache.add_dimmer_element(segment_id, [half_duration, initial, final]):
+                        raise RuntimeError(f"Failed to add dimmer element to segment {segment_id}")
             
-            if success1 and success2:
-                self.toast_manager.show_success_sync(f"Breathing sequence created ({cycle_duration_ms}ms cycle)")
-                return True
-            else:
-                AppLogger.error("Failed to create breathing sequence")
-                return False
+            self.toast_manager.show_success_sync(f"Breathing sequence created ({cycle_duration_ms}ms cycle)")
+            return True
                 
         except Exception as e:
             AppLogger.error(f"Error creating breathing sequence: {e}")
@@ -276,15 +267,15 @@ class DimmerActionHandler:
     def create_strobe_sequence(self, segment_id: str, flash_count: int, flash_duration_ms: int) -> bool:
         """Create a strobe effect sequence"""
         try:
-            for i in range(flash_count):
-                # Flash on
-                success1 = data_cache.add_dimmer_element(segment_id, flash_duration_ms, 0, 100)
-                # Flash off
-                success2 = data_cache.add_dimmer_element(segment_id, flash_duration_ms, 100, 0)
+            with data_cache.transaction():
+                for i in range(flash_count):
+                    # Flash on
+                    success1 = data_cache.add_dimmer_element(segment_id, [flash_duration_ms, 0, 100])
+                    # Flash off
+                    success2 = data_cache.add_dimmer_element(segment_id, [flash_duration_ms, 100, 0])
                 
-                if not (success1 and success2):
-                    AppLogger.error(f"Failed to create strobe flash {i}")
-                    return False
+                    if not (success1 and success2):
+                        raise RuntimeError(f"Failed to create strobe flash {i}")
                     
             self.toast_manager.show_success_sync(f"Strobe sequence created ({flash_count} flashes)")
             return True
@@ -296,7 +287,7 @@ class DimmerActionHandler:
     def create_dimmer_sequence(self, segment_id: str, duration_ms: int, initial_brightness: int, final_brightness: int):
         """Create dimmer sequence for segment"""
         if self._validate_brightness_values(initial_brightness, final_brightness):
-            success = data_cache.add_dimmer_element(segment_id, duration_ms, initial_brightness, final_brightness)
+            success = data_cache.add_dimmer_element(segment_id, [duration_ms, initial_brightness, final_brightness])
             if success:
                 self.toast_manager.show_success_sync(f"Dimmer created for segment {segment_id}")
                 AppLogger.success(f"Dimmer sequence created for segment {segment_id}")
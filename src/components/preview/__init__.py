@@ -0,0 +1,4 @@
+from .preview import LEDPreviewComponent
+from .preview_action import PreviewActionHandler
+
+__all__ = ['LEDPreviewComponent', 'PreviewActionHandler']
@@ -0,0 +1,65 @@
+import flet as ft
+import numpy as np
+from .preview_action import PreviewActionHandler
+from engine.png import encode_png_base64
+from utils.helpers import safe_component_update
+
+
+class LEDPreviewComponent(ft.Container):
+    """Animated LED strip preview of current effect, shown as one scaled image per frame"""
+
+    def __init__(self, page: ft.Page, height: int = 24):
+        super().__init__()
+        self.page = page
+        self.strip_height = height
+        self.action_handler = PreviewActionHandler(page, self._show_frame)
+        self.content = self.build_content()
+
+    def build_content(self):
+        """Build preview strip and playback button"""
+
+        self.strip_image = ft.Image(
+            src_base64=encode_png_base64(np.zeros((1, 3), dtype=np.uint8)),
+            height=self.strip_height,
+            expand=True,
+            fit=ft.ImageFit.FILL,
+            filter_quality=ft.FilterQuality.NONE,
+            gapless_playback=True
+        )
+
+        self.play_button = ft.IconButton(
+            icon=ft.Icons.PAUSE,
+            icon_color=ft.Colors.BLACK,
+            tooltip="Play/Pause Preview",
+            on_click=self._on_play_click
+        )
+
+        return ft.Row([
+            ft.Text("Preview:", size=12, weight=ft.FontWeight.W_500, width=80),
+            ft.Container(
+                content=self.strip_image,
+                expand=True,
+                bgcolor=ft.Colors.BLACK,
+                border=ft.border.all(1, ft.Colors.GREY_400)
+            ),
+            self.play_button
+        ], spacing=5)
+
+    def did_mount(self):
+        """Start playback once preview is on the page"""
+        self.action_handler.start()
+
+    def will_unmount(self):
+        """Stop playback when preview leaves the page"""
+        self.action_handler.stop()
+
+    def _on_play_click(self, e):
+        """Handle play/pause button click"""
+        self.action_handler.toggle_playback(e)
+        self.play_button.icon = ft.Icons.PAUSE if self.action_handler.is_playing else ft.Icons.PLAY_ARROW
+        safe_component_update(self.play_button, "preview_play_button_update")
+
+    def _show_frame(self, image: str):
+        """Push encoded frame to strip image"""
+        self.strip_image.src_base64 = image
+        safe_component_update(self.strip_image, "preview_frame_update")
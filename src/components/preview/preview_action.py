@@ -0,0 +1,117 @@
+import asyncio
+import time
+import flet as ft
+from typing import Callable, Dict, Optional
+from engine.png import encode_png_base64
+from engine.renderer import FrameRenderer
+from services.data_cache import data_cache
+from utils.logger import AppLogger
+
+
+class PreviewActionHandler:
+    """Drive live LED strip preview of current effect from the frame renderer
+
+    Frame index is derived from the wall clock, so when the UI falls behind
+    the intermediate frames are skipped instead of queued. Every tick yields
+    to the event loop, and a frame is only pushed to Flet when its encoded
+    image differs from the previous one.
+    """
+
+    def __init__(self, page: ft.Page, on_frame: Callable[[str], None]):
+        self.page = page
+        self.on_frame = on_frame
+        self.is_playing = False
+        self._generation = 0
+        self._renderer: Optional[FrameRenderer] = None
+        self._start_time = 0.0
+        self._last_frame_time: Optional[float] = None
+        self._last_image: Optional[str] = None
+        self.frames_pushed = 0
+        self.frames_skipped = 0
+        self.frames_unchanged = 0
+
+    def start(self):
+        """Start preview playback from time zero"""
+        if self.is_playing:
+            return
+        self.is_playing = True
+        self._generation += 1
+        self._start_time = time.perf_counter()
+        self._last_frame_time = None
+        self.page.run_task(self._play_loop, self._generation)
+
+    def stop(self):
+        """Stop preview playback"""
+        self.is_playing = False
+
+    def toggle_playback(self, e):
+        """Handle play/pause button"""
+        if self.is_playing:
+            self.stop()
+        else:
+            self.start()
+
+    def get_renderer(self) -> Optional[FrameRenderer]:
+        """Get renderer for current scene, recreating it when scene changes"""
+        scene = data_cache.get_current_scene()
+        if scene is None:
+            return None
+        if self._renderer is None or self._renderer.scene is not scene:
+            self._renderer = FrameRenderer(scene)
+        return self._renderer
+
+    def render_image(self, t: float) -> Optional[str]:
+        """Render current effect at time t (seconds) as base64 PNG strip"""
+        renderer = self.get_renderer()
+        if renderer is None:
+            return None
+        return encode_png_base64(renderer.render(renderer.scene.current_effect_id, t))
+
+    def step(self, now: float) -> bool:
+        """Render and push frame due at perf_counter time now, returning whether one was pushed"""
+        renderer = self.get_renderer()
+        if renderer is None:
+            return False
+
+        fps = max(renderer.scene.fps, 1)
+        frame_time = int((now - self._start_time) * fps) / fps
+        if self._last_frame_time is not None:
+            if frame_time <= self._last_frame_time:
+                return False
+            self.frames_skipped += max(0, round((frame_time - self._last_frame_time) * fps) - 1)
+        self._last_frame_time = frame_time
+
+        image = self.render_image(frame_time)
+        if image is None or image == self._last_image:
+            self.frames_unchanged += 1
+            return False
+        self._last_image = image
+        self.on_frame(image)
+        self.frames_pushed += 1
+        return True
+
+    def next_frame_delay(self, now: float) -> float:
+        """Get seconds until next frame is due"""
+        renderer = self._renderer
+        fps = max(renderer.scene.fps, 1) if renderer else 30
+        elapsed = now - self._start_time
+        return max(0.0, (int(elapsed * fps) + 1) / fps - elapsed)
+
+    async def _play_loop(self, generation: int):
+        """Render frames at scene fps until stopped or superseded by a newer loop"""
+        while self.is_playing and generation == self._generation:
+            try:
+                self.step(time.perf_counter())
+            except Exception as e:
+                AppLogger.error(f"Error rendering preview frame: {e}")
+                self.is_playing = False
+                return
+            await asyncio.sleep(self.next_frame_delay(time.perf_counter()))
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get preview frame counters"""
+        return {
+            'frames_pushed': self.frames_pushed,
+            'frames_skipped': self.frames_skipped,
+            'frames_unchanged': self.frames_unchanged
+        }
@@ -87,10 +87,12 @@ class SceneActionHandler:
             return
             
         try:
-            new_scene_id = data_cache.duplicate_scene(current_scene.scene_id)
+            with data_cache.transaction():
+                new_scene_id = data_cache.duplicate_scene(current_scene.scene_id)
+                if new_scene_id:
+                    data_cache.set_current_scene(new_scene_id)
             
             if new_scene_id:
-                data_cache.set_current_scene(new_scene_id)
                 self._sync_color_service()
                 self.toast_manager.show_success_sync(
                     f"Scene {current_scene.scene_id} duplicated as Scene {new_scene_id} (now current)"
@@ -0,0 +1,22 @@
+from .renderer import FrameRenderer, apply_palette, render_frame
+from .motion import MotionSolver, segment_positions
+from .dimmer import CompiledDimmer, DimmerBank, compile_dimmer
+from .strip_cache import StripCache, strip_cache
+from .offline import render_scene_to_file
+from .parallel import PackedEffect, render_scenes_parallel
+
+__all__ = [
+    'FrameRenderer',
+    'apply_palette',
+    'render_frame',
+    'MotionSolver',
+    'segment_positions',
+    'CompiledDimmer',
+    'DimmerBank',
+    'compile_dimmer',
+    'StripCache',
+    'strip_cache',
+    'render_scene_to_file',
+    'PackedEffect',
+    'render_scenes_parallel'
+]
@@ -0,0 +1,121 @@
+import numpy as np
+from typing import List, Optional, Union
+from models.segment import Segment
+
+
+TimeLike = Union[float, np.ndarray]
+
+
+class CompiledDimmer:
+    """Dimmer sequence compiled to cumulative ramp end times and interpolation coefficients"""
+
+    __slots__ = ('source', 'ends', 'starts', 'levels', 'slopes', 'total', 'final')
+
+    def __init__(self, dimmer_time: List[List[int]]):
+        ramps = np.asarray(dimmer_time, dtype=np.float64).reshape(-1, 3)
+        durations = np.maximum(ramps[:, 0], 0.0)
+
+        self.source = dimmer_time
+        self.ends = np.cumsum(durations)
+        self.starts = self.ends - durations
+        self.levels = ramps[:, 1] / 100.0
+        self.slopes = np.divide(ramps[:, 2] - ramps[:, 1], durations * 100.0,
+                                out=np.zeros_like(durations), where=durations > 0)
+        self.total = float(self.ends[-1]) if len(ramps) else 0.0
+        self.final = float(ramps[-1, 2] / 100.0) if len(ramps) else 1.0
+
+    def __len__(self) -> int:
+        return len(self.ends)
+
+    def brightness(self, t: TimeLike) -> np.ndarray:
+        """Get brightness (0.0-1.0) at time t (seconds), looping over the sequence"""
+        return DimmerBank([self]).levels_at(t)[..., 0]
+
+
+class DimmerBank:
+    """Compiled dimmers of many segments packed for single-call evaluation
+
+    Ramp end times of every segment are laid out back to back on one
+    timeline, so brightness for all segments and all requested timestamps is
+    resolved with one `np.searchsorted` call regardless of ramp count.
+    """
+
+    def __init__(self, compiled: List[CompiledDimmer]):
+        counts = np.array([len(c) for c in compiled], dtype=np.intp)
+        self.totals = np.array([c.total for c in compiled], dtype=np.float64)
+        self.finals = np.clip(np.array([c.final for c in compiled], dtype=np.float64), 0.0, 1.0)
+        self.base = np.cumsum(self.totals) - self.totals
+        top = max(int(counts.sum()) - 1, 0)
+        self.first = np.minimum(np.cumsum(counts) - counts, top)
+        self.last = np.maximum(self.first + counts - 1, self.first)
+        self.has_ramps = counts > 0
+        self.looping = self.totals > 0
+
+        if counts.any():
+            owner = np.repeat(np.arange(len(compiled)), counts)
+            self.ends = np.concatenate([c.ends for c in compiled]) + self.base[owner]
+            self.starts = np.concatenate([c.starts for c in compiled]) + self.base[owner]
+            self.levels = np.concatenate([c.levels for c in compiled])
+            self.slopes = np.concatenate([c.slopes for c in compiled])
+        else:
+            self.ends = self.starts = self.levels = self.slopes = np.zeros(0)
+
+    @classmethod
+    def from_segments(cls, segments: List[Segment]) -> 'DimmerBank':
+        """Build bank from segments, reusing each segment's cached compiled dimmer"""
+        return cls([compile_dimmer(segment) for segment in segments])
+
+    def __len__(self) -> int:
+        return len(self.totals)
+
+    def levels_at(self, t: TimeLike) -> np.ndarray:
+        """Get brightness of every segment at time t (seconds)
+
+        Scalar t returns shape (segments,); an array of timestamps returns
+        shape t.shape + (segments,).
+        """
+        t_ms = np.asarray(t, dtype=np.float64)[..., None] * 1000.0
+        levels = np.broadcast_to(np.where(self.has_ramps, self.finals, 1.0), t_ms.shape[:-1] + (len(self),)).copy()
+        if not self.looping.any():
+            return levels
+
+        local = np.mod(t_ms, np.where(self.looping, self.totals, 1.0))
+        query = self.base + local
+        index = np.clip(np.searchsorted(self.ends, query, side='right'), self.first, self.last)
+        ramped = self.levels[index] + self.slopes[index] * (query - self.starts[index])
+        return np.clip(np.where(self.looping, ramped, levels), 0.0, 1.0)
+
+
+class DimmerBankCache:
+    """Keeps packed dimmer bank while the compiled dimmers of its segments are unchanged"""
+
+    def __init__(self):
+        self._compiled: List[CompiledDimmer] = []
+        self._bank: Optional[DimmerBank] = None
+
+    def get(self, segments: List[Segment]) -> DimmerBank:
+        """Get bank for segments, repacking only when a segment's dimmer was recompiled"""
+        compiled = [compile_dimmer(segment) for segment in segments]
+        stale = (
+            self._bank is None
+            or len(compiled) != len(self._compiled)
+            or any(new is not old for new, old in zip(compiled, self._compiled))
+        )
+        if stale:
+            self._compiled = compiled
+            self._bank = DimmerBank(compiled)
+        return self._bank
+
+
+def compile_dimmer(segment: Segment) -> CompiledDimmer:
+    """Get compiled dimmer of segment, compiling and caching it on first use"""
+    compiled = segment.compiled_dimmer
+    if compiled is None or compiled.source is not segment.dimmer_time:
+        compiled = CompiledDimmer(segment.dimmer_time)
+        segment.compiled_dimmer = compiled
+    return compiled
+
+
+def dimmer_brightness(dimmer_time: List[List[int]], t: float) -> float:
+    """Get brightness (0.0-1.0) of single dimmer sequence at time t (seconds)"""
+    return float(CompiledDimmer(dimmer_time).brightness(t))
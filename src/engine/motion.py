@@ -0,0 +1,68 @@
+import numpy as np
+from typing import List, Union
+from models.segment import Segment
+
+
+TimeLike = Union[float, np.ndarray]
+
+
+class MotionSolver:
+    """Closed-form position solver for segment movement
+
+    Segment heads start at `initial_position` and travel `move_speed` LEDs per
+    second inside `move_range`. With edge reflect the path is a triangle wave
+    bouncing between both ends; without it the head wraps from end back to
+    start. Positions are evaluated directly from t, so seeking anywhere in a
+    show costs the same as evaluating the first frame.
+    """
+
+    def __init__(self, segments: List[Segment]):
+        params = np.array(
+            [(s.move_range[0], s.move_range[1], s.initial_position, s.move_speed, s.is_edge_reflect) for s in segments],
+            dtype=np.float64,
+        ).reshape(-1, 5)
+        self.start = params[:, 0]
+        self.span = np.maximum(params[:, 1] - params[:, 0], 0.0)
+        self.offset = params[:, 2] - params[:, 0]
+        self.speed = params[:, 3]
+        self.reflect = params[:, 4] > 0
+
+        self._moving = self.span > 0
+        self._period = np.where(self.reflect, 2 * self.span, self.span + 1)
+        self._period[~self._moving] = 1.0
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    def positions(self, t: TimeLike) -> np.ndarray:
+        """Get head positions at time t (seconds)
+
+        Scalar t returns shape (segments,); an array of timestamps returns
+        shape t.shape + (segments,) so a whole timeline is solved at once.
+        """
+        t = np.asarray(t, dtype=np.float64)[..., None]
+        phase = np.mod(self.offset + self.speed * t, self._period)
+        travelled = np.where(self.reflect, self.span - np.abs(phase - self.span), phase)
+        return self.start + np.where(self._moving, travelled, 0.0)
+
+    def heads(self, t: TimeLike) -> np.ndarray:
+        """Get integer LED index of each segment head at time t (seconds)"""
+        return np.floor(self.positions(t)).astype(np.intp)
+
+    def cycle_durations(self) -> np.ndarray:
+        """Get seconds after which each segment's motion repeats (inf when not moving)"""
+        speed = np.abs(self.speed)
+        durations = np.full(len(self), np.inf)
+        repeating = self._moving & (speed > 0)
+        durations[repeating] = self._period[repeating] / speed[repeating]
+        return durations
+
+
+def segment_positions(segments: List[Segment], t: TimeLike) -> np.ndarray:
+    """Get head positions of segments at time t (seconds)"""
+    return MotionSolver(segments).positions(t)
+
+
+def position_at(segment: Segment, t: float) -> float:
+    """Get head position of single segment at time t (seconds)"""
+    return float(MotionSolver([segment]).positions(t)[0])
@@ -0,0 +1,71 @@
+import numpy as np
+from functools import partial
+from typing import Callable, Optional
+from models.scene import Scene
+from utils.logger import AppLogger
+from .renderer import FrameRenderer, apply_palette
+
+
+DEFAULT_CHUNK_FRAMES = 120
+
+
+def frame_count(scene: Scene, duration: float) -> int:
+    """Get number of frames covering duration (seconds) at scene fps"""
+    return max(0, int(round(duration * scene.fps)))
+
+
+def open_frame_file(path: str, frames: int, led_count: int, mode: str = 'w+') -> np.memmap:
+    """Open (frames, led_count, 3) uint8 memory-mapped frame file
+
+    Paths ending in `.npy` get an NPY header so the file loads with
+    `np.load(path, mmap_mode='r')`; any other path is written as raw RGB bytes.
+    """
+    shape = (frames, led_count, 3)
+    if path.lower().endswith('.npy'):
+        if mode == 'w+':
+            return np.lib.format.open_memmap(path, mode='w+', dtype=np.uint8, shape=shape)
+        return np.load(path, mmap_mode=mode)
+    return np.memmap(path, dtype=np.uint8, mode=mode, shape=shape)
+
+
+def render_chunk(render_index: Callable[[float], np.ndarray], palette: np.ndarray, fps: int,
+                 out: np.ndarray, start: int, stop: int):
+    """Render frames [start, stop) of render_index(t) into out, resolving palette once for the whole chunk
+
+    Serial and parallel rendering both go through here, so they write the same bytes.
+    """
+    index_frames = np.empty((stop - start, out.shape[1], palette.shape[0]), dtype=np.float32)
+    for frame in range(start, stop):
+        index_frames[frame - start] = render_index(frame / fps)
+    out[start:stop] = apply_palette(index_frames, palette)
+
+
+def render_scene_to_file(scene: Scene, path: str, duration: float, effect_id: Optional[int] = None,
+                         palette_id: Optional[int] = None, chunk_frames: int = DEFAULT_CHUNK_FRAMES) -> bool:
+    """Render duration (seconds) of scene effect at scene fps into memory-mapped frame file
+
+    Frames are produced chunk_frames at a time and flushed to disk after each
+    chunk, so memory use stays bounded by one chunk regardless of show length.
+    """
+    try:
+        if effect_id is None:
+            effect_id = scene.current_effect_id
+        frames = frame_count(scene, duration)
+        if frames == 0:
+            raise ValueError("Duration must cover at least one frame")
+        chunk_frames = max(1, chunk_frames)
+
+        out = open_frame_file(path, frames, scene.led_count)
+        renderer = FrameRenderer(scene)
+        render_index, palette = partial(renderer.render_index, effect_id), renderer.get_palette(palette_id)
+        for start in range(0, frames, chunk_frames):
+            render_chunk(render_index, palette, scene.fps, out, start, min(start + chunk_frames, frames))
+            out.flush()
+        del out
+
+        AppLogger.success(f"Rendered {frames} frames of scene {scene.scene_id} to {path}")
+        return True
+
+    except Exception as e:
+        AppLogger.error(f"Error rendering scene {scene.scene_id} to {path}: {e}")
+        return False
@@ -0,0 +1,100 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from models.scene import Scene
+from utils.logger import AppLogger
+from .dimmer import DimmerBank
+from .motion import MotionSolver
+from .offline import DEFAULT_CHUNK_FRAMES, frame_count, open_frame_file, render_chunk
+from .renderer import FrameRenderer, composite_segments
+from .strip_cache import PALETTE_SIZE, build_effect_strips
+
+
+class PackedEffect:
+    """Scene effect reduced to the numpy arrays needed to render it
+
+    Holds rasterised strips, motion and dimmer coefficients and the palette
+    LUT, so render workers receive a few flat arrays instead of pickled
+    Scene, Effect and Segment dataclasses.
+    """
+
+    def __init__(self, scene: Scene, effect_id: Optional[int] = None, palette_id: Optional[int] = None):
+        if effect_id is None:
+            effect_id = scene.current_effect_id
+        effect = scene.get_effect(effect_id)
+        segments = list(effect.segments.values()) if effect else []
+
+        self.led_count = scene.led_count
+        self.fps = scene.fps
+        self.palette = FrameRenderer(scene).get_palette(palette_id)
+        self.strips = build_effect_strips(segments)
+        self.motion = MotionSolver(segments)
+        self.dimmers = DimmerBank.from_segments(segments)
+
+    def render_index(self, t: float) -> np.ndarray:
+        """Render effect at time t (seconds) as (led_count, PALETTE_SIZE) float32 index frame"""
+        if len(self.motion) == 0:
+            return np.zeros((self.led_count, PALETTE_SIZE), dtype=np.float32)
+        return composite_segments(self.led_count, self.strips, self.motion.heads(t), self.dimmers.levels_at(t))
+
+
+_worker_jobs: List[Tuple[PackedEffect, str, int]] = []
+_worker_outputs: Dict[int, np.memmap] = {}
+
+
+def _init_worker(jobs: List[Tuple[PackedEffect, str, int]]):
+    """Receive packed effects once per worker process"""
+    global _worker_jobs
+    _worker_jobs = jobs
+    _worker_outputs.clear()
+
+
+def _render_task(job_index: int, start: int, stop: int) -> int:
+    """Render one time chunk of one job straight into its shared output file"""
+    packed, path, frames = _worker_jobs[job_index]
+    out = _worker_outputs.get(job_index)
+    if out is None:
+        out = open_frame_file(path, frames, packed.led_count, mode='r+')
+        _worker_outputs[job_index] = out
+    render_chunk(packed.render_index, packed.palette, packed.fps, out, start, stop)
+    out.flush()
+    return stop - start
+
+
+def render_scenes_parallel(scenes: List[Scene], paths: List[str], duration: float,
+                           effect_id: Optional[int] = None, palette_id: Optional[int] = None,
+                           chunk_frames: int = DEFAULT_CHUNK_FRAMES, max_workers: Optional[int] = None) -> bool:
+    """Render effect of every scene into its own frame file using a process pool
+
+    effect_id and palette_id default to each scene's current ones.
+
+    Work is split by scene and by time chunk. Output files are created up
+    front and every worker maps them and writes its chunks in place, so no
+    frame data travels back to the parent process.
+    """
+    try:
+        if len(scenes) != len(paths):
+            raise ValueError("Need one output path per scene")
+        chunk_frames = max(1, chunk_frames)
+
+        jobs = []
+        tasks = []
+        for job_index, (scene, path) in enumerate(zip(scenes, paths)):
+            frames = frame_count(scene, duration)
+            if frames == 0:
+                raise ValueError("Duration must cover at least one frame")
+            open_frame_file(path, frames, scene.led_count).flush()
+            jobs.append((PackedEffect(scene, effect_id, palette_id), path, frames))
+            tasks.extend((job_index, start, min(start + chunk_frames, frames)) for start in range(0, frames, chunk_frames))
+
+        workers = max_workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(jobs,)) as executor:
+            rendered = sum(executor.map(_render_task, *zip(*tasks)))
+
+        AppLogger.success(f"Rendered {rendered} frames of {len(scenes)} scenes with {workers} workers")
+        return True
+
+    except Exception as e:
+        AppLogger.error(f"Error rendering scenes in parallel: {e}")
+        return False
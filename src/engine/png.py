@@ -0,0 +1,35 @@
+import base64
+import struct
+import zlib
+import numpy as np
+
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def _chunk(kind: bytes, data: bytes) -> bytes:
+    """Build length-prefixed, CRC-terminated PNG chunk"""
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+
+def encode_png(frame: np.ndarray, compression: int = 1) -> bytes:
+    """Encode (height, width, 3) or (width, 3) uint8 RGB frame as PNG"""
+    rgb = np.ascontiguousarray(frame, dtype=np.uint8)
+    if rgb.ndim == 2:
+        rgb = rgb[None]
+    height, width = rgb.shape[:2]
+
+    rows = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    rows[:, 1:] = rgb.reshape(height, width * 3)
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return b''.join((
+        PNG_SIGNATURE,
+        _chunk(b'IHDR', header),
+        _chunk(b'IDAT', zlib.compress(rows.tobytes(), compression)),
+        _chunk(b'IEND', b''),
+    ))
+
+
+def encode_png_base64(frame: np.ndarray) -> str:
+    """Encode RGB frame as base64 PNG string for Flet Image.src_base64"""
+    return base64.b64encode(encode_png(frame)).decode('ascii')
@@ -0,0 +1,116 @@
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from models.scene import Scene
+from .motion import MotionSolver
+from .dimmer import DimmerBankCache
+from .strip_cache import PALETTE_SIZE, StripCache, pack_strips, strip_cache
+
+
+def palette_to_array(palette: List[List[int]], size: int = PALETTE_SIZE) -> np.ndarray:
+    """Convert scene palette [[r, g, b], ...] to float32 LUT of shape (size, 3), padding with black"""
+    lut = np.zeros((size, 3), dtype=np.float32)
+    if palette:
+        colors = np.asarray(palette, dtype=np.float32).reshape(-1, 3)[:size]
+        lut[:len(colors)] = colors
+    return lut
+
+
+def apply_palette(index_frame: np.ndarray, palette: np.ndarray) -> np.ndarray:
+    """Resolve (led_count, PALETTE_SIZE) index frame against palette LUT into uint8 RGB frame"""
+    rgb = index_frame @ palette[:index_frame.shape[1]]
+    return np.clip(rgb + 0.5, 0, 255).astype(np.uint8)
+
+
+def composite_layers(led_count: int, leds: np.ndarray, values: np.ndarray, alpha: np.ndarray) -> np.ndarray:
+    """Alpha-composite pixel values onto black, later pixels drawn over earlier ones
+
+    Equivalent to applying `out = out * (1 - a) + value * a` layer by layer, but
+    computed for all pixels at once: each pixel is weighted by its alpha times
+    the transmittance of every pixel above it on the same LED.
+    """
+    inside = np.flatnonzero((leds >= 0) & (leds < led_count))
+    if len(inside) == 0:
+        return np.zeros((led_count, values.shape[1]), dtype=np.float64)
+
+    leds = leds[inside]
+    order = np.argsort(leds, kind='stable')
+    sorted_leds = leds[order]
+    alpha = alpha[inside].astype(np.float64)
+    sorted_alpha = alpha[order]
+
+    clear = 1.0 - sorted_alpha
+    blocked = clear <= 0.0
+    log_clear = np.log(np.where(blocked, 1.0, clear))
+
+    run_break = np.empty(len(sorted_leds), dtype=bool)
+    run_break[-1] = True
+    np.not_equal(sorted_leds[1:], sorted_leds[:-1], out=run_break[:-1])
+    run_last = np.flatnonzero(run_break)
+    run_last = np.repeat(run_last, np.diff(np.concatenate(([-1], run_last))))
+
+    cum_log = np.cumsum(log_clear)
+    cum_blocked = np.cumsum(blocked)
+    above_blocked = cum_blocked[run_last] - cum_blocked
+    weight = np.empty_like(alpha)
+    weight[order] = sorted_alpha * np.exp(cum_log[run_last] - cum_log) * (above_blocked == 0)
+
+    frame = np.empty((led_count, values.shape[1]), dtype=np.float64)
+    contributions = values[inside] * weight[:, None]
+    for channel in range(values.shape[1]):
+        frame[:, channel] = np.bincount(leds, weights=contributions[:, channel], minlength=led_count)
+    return frame
+
+
+def composite_segments(led_count: int, strips: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+                       heads: np.ndarray, brightness: np.ndarray) -> np.ndarray:
+    """Composite packed segment strips placed at heads and scaled by brightness into float32 index frame"""
+    weights, alpha, owner, offset = strips
+    frame = composite_layers(led_count, heads[owner] + offset, weights * brightness[owner, None], alpha)
+    return frame.astype(np.float32)
+
+
+class FrameRenderer:
+    """Vectorized renderer turning scene effects into LED frames
+
+    Rendering happens in two stages: `render_index` composites all segments
+    into a palette-independent index frame holding, per LED, the weight of
+    each palette color; `apply_palette` resolves that frame to RGB with one
+    matrix product. Palette swaps and live color edits only need the second
+    stage when the index frame is kept.
+    """
+
+    def __init__(self, scene: Scene, strips: Optional[StripCache] = None):
+        self.scene = scene
+        self.strips = strips or strip_cache
+        self._dimmer_banks: Dict[int, DimmerBankCache] = {}
+
+    def get_palette(self, palette_id: Optional[int] = None) -> np.ndarray:
+        """Get palette LUT, defaulting to scene's current palette"""
+        if palette_id is None:
+            palette_id = self.scene.current_palette_id
+        if 0 <= palette_id < len(self.scene.palettes):
+            return palette_to_array(self.scene.palettes[palette_id])
+        return palette_to_array([])
+
+    def render_index(self, effect_id: int, t: float) -> np.ndarray:
+        """Render effect at time t (seconds) as (led_count, PALETTE_SIZE) float32 index frame"""
+        led_count = self.scene.led_count
+        effect = self.scene.get_effect(effect_id)
+        if effect is None or not effect.segments:
+            return np.zeros((led_count, PALETTE_SIZE), dtype=np.float32)
+
+        segments = list(effect.segments.values())
+        strips = pack_strips(self.strips.get_many(segments))
+        heads = MotionSolver(segments).heads(t)
+        dimmers = self._dimmer_banks.setdefault(effect_id, DimmerBankCache())
+        brightness = dimmers.get(segments).levels_at(t)
+        return composite_segments(led_count, strips, heads, brightness)
+
+    def render(self, effect_id: int, t: float, palette_id: Optional[int] = None) -> np.ndarray:
+        """Render effect at time t (seconds) as (led_count, 3) uint8 frame"""
+        return apply_palette(self.render_index(effect_id, t), self.get_palette(palette_id))
+
+
+def render_frame(scene: Scene, effect_id: int, t: float, palette_id: Optional[int] = None) -> np.ndarray:
+    """Render single frame of scene effect at time t (seconds)"""
+    return FrameRenderer(scene).render(effect_id, t, palette_id)
@@ -0,0 +1,187 @@
+import numpy as np
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, List, Tuple
+from models.segment import Segment
+
+
+StripKey = Tuple[Tuple[int, ...], Tuple[float, ...], Tuple[int, ...]]
+Strip = Tuple[np.ndarray, np.ndarray]
+
+STRIP_PARAMS = ("color", "transparency", "length")
+DEFAULT_SLOT_LENGTH = 10
+PALETTE_SIZE = 6
+
+
+def _padded(values: List, size: int, fill) -> List:
+    """Return values truncated or padded with fill to exactly size entries"""
+    if len(values) >= size:
+        return list(values[:size])
+    return list(values) + [fill] * (size - len(values))
+
+
+def build_effect_strips(segments: List[Segment]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Rasterise color composition of all segments in one pass
+
+    Color slots are placed at cumulative `length` offsets and interpolated
+    linearly in between; transparency 0.0 is fully opaque, 1.0 fully transparent.
+    Colors are kept as palette weights so the result does not depend on palette
+    contents. Returns flat per-pixel arrays (weights, alpha, owner segment
+    index, offset from head).
+    """
+    slot_counts = np.array([len(segment.color) for segment in segments], dtype=np.intp)
+    max_slots = int(slot_counts.max()) if len(segments) else 0
+    if max_slots == 0:
+        empty = np.zeros(0, dtype=np.intp)
+        return np.zeros((0, PALETTE_SIZE), dtype=np.float32), np.zeros(0, dtype=np.float32), empty, empty
+
+    colors = np.array([_padded(s.color, max_slots, 0) for s in segments], dtype=np.intp)
+    transparency = np.array([_padded(s.transparency, max_slots, 1.0) for s in segments], dtype=np.float32)
+    lengths = np.array(
+        [_padded(s.length, max_slots - 1, DEFAULT_SLOT_LENGTH) for s in segments], dtype=np.intp
+    ).reshape(len(segments), max_slots - 1)
+
+    colors = np.clip(colors, 0, PALETTE_SIZE - 1)
+    opacity = 1.0 - np.clip(transparency, 0.0, 1.0)
+    lengths = np.maximum(lengths, 1)
+
+    last_gap = np.maximum(slot_counts - 1, 0)
+    gap_mask = np.arange(max_slots - 1) < last_gap[:, None]
+    stops = np.zeros((len(segments), max_slots), dtype=np.intp)
+    np.cumsum(lengths * gap_mask, axis=1, out=stops[:, 1:])
+    widths = np.where(slot_counts > 0, stops[np.arange(len(segments)), last_gap] + 1, 0)
+
+    owner = np.repeat(np.arange(len(segments)), widths)
+    offset = np.arange(len(owner)) - np.repeat(np.cumsum(widths) - widths, widths)
+
+    slot = (stops[owner] <= offset[:, None]).sum(axis=1) - 1
+    slot = np.minimum(slot, np.maximum(slot_counts[owner] - 2, 0))
+    next_slot = np.minimum(slot + 1, slot_counts[owner] - 1)
+    gap = lengths[owner, np.minimum(slot, max_slots - 2)] if max_slots > 1 else np.ones_like(slot)
+    frac = np.where(next_slot > slot, (offset - stops[owner, slot]) / gap, 0.0).astype(np.float32)
+    inv = 1.0 - frac
+
+    pixels = np.arange(len(owner))
+    weights = np.zeros((len(owner), PALETTE_SIZE), dtype=np.float32)
+    weights[pixels, colors[owner, slot]] = inv
+    weights[pixels, colors[owner, next_slot]] += frac
+    alpha = opacity[owner, slot] * inv + opacity[owner, next_slot] * frac
+    return weights, alpha, owner, offset
+
+
+def build_segment_strip(segment: Segment, palette: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Rasterise single segment color composition into (width, 3) RGB and (width,) alpha arrays"""
+    weights, alpha, _, _ = build_effect_strips([segment])
+    return weights @ palette, alpha
+
+
+class StripCache:
+    """Bounded LRU cache of rasterised segment strips keyed by color composition
+
+    A strip only depends on a segment's `color`, `transparency` and `length`
+    (palette colors are applied later from the index frame), so segments that
+    are just moving or dimming reuse their cached strip every frame.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._strips: "OrderedDict[StripKey, Strip]" = OrderedDict()
+        self._bytes = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key_for(segment: Segment) -> StripKey:
+        """Get cache key from segment color composition"""
+        return tuple(segment.color), tuple(segment.transparency), tuple(segment.length)
+
+    def get(self, segment: Segment) -> Strip:
+        """Get (weights, alpha) strip of segment"""
+        return self.get_many([segment])[0]
+
+    def get_many(self, segments: List[Segment]) -> List[Strip]:
+        """Get strips of segments, rasterising all misses in one batch"""
+        keys = [self.key_for(segment) for segment in segments]
+        strips: List[Any] = [None] * len(segments)
+        missing: Dict[StripKey, List[int]] = {}
+
+        with self._lock:
+            for index, key in enumerate(keys):
+                strip = self._strips.get(key)
+                if strip is None:
+                    missing.setdefault(key, []).append(index)
+                else:
+                    self._strips.move_to_end(key)
+                    strips[index] = strip
+            self.hits += len(segments) - sum(len(indices) for indices in missing.values())
+            self.misses += len(missing)
+
+        if missing:
+            sources = [segments[indices[0]] for indices in missing.values()]
+            weights, alpha, owner, _ = build_effect_strips(sources)
+            bounds = np.searchsorted(owner, np.arange(len(sources) + 1))
+            with self._lock:
+                for source, (key, indices) in enumerate(missing.items()):
+                    part = slice(bounds[source], bounds[source + 1])
+                    strip = (weights[part].copy(), alpha[part].copy())
+                    strip[0].flags.writeable = False
+                    strip[1].flags.writeable = False
+                    self._store(key, strip)
+                    for index in indices:
+                        strips[index] = strip
+
+        return strips
+
+    def _store(self, key: StripKey, strip: Strip):
+        """Insert strip and evict least recently used entries over the byte budget"""
+        if key in self._strips:
+            return
+        self._strips[key] = strip
+        self._bytes += strip[0].nbytes + strip[1].nbytes
+        while self._bytes > self.max_bytes and len(self._strips) > 1:
+            _, (weights, alpha) = self._strips.popitem(last=False)
+            self._bytes -= weights.nbytes + alpha.nbytes
+            self.evictions += 1
+
+    def evict(self, key: StripKey) -> bool:
+        """Remove single strip from cache"""
+        with self._lock:
+            strip = self._strips.pop(key, None)
+            if strip is None:
+                return False
+            self._bytes -= strip[0].nbytes + strip[1].nbytes
+            return True
+
+    def clear(self):
+        """Remove all strips and reset counters"""
+        with self._lock:
+            self._strips.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get cache counters and memory use"""
+        with self._lock:
+            return {
+                'entries': len(self._strips),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+
+def pack_strips(strips: List[Strip]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Concatenate strips into flat (weights, alpha, owner, offset) pixel arrays"""
+    widths = np.array([len(alpha) for _, alpha in strips], dtype=np.intp)
+    weights = np.concatenate([w for w, _ in strips])
+    alpha = np.concatenate([a for _, a in strips])
+    owner = np.repeat(np.arange(len(strips)), widths)
+    offset = np.arange(len(owner)) - np.repeat(np.cumsum(widths) - widths, widths)
+    return weights, alpha, owner, offset
+
+
+strip_cache = StripCache()
@@ -1,4 +1,4 @@
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Set, Tuple
 from dataclasses import dataclass, field
 from models.segment import Segment
 
@@ -8,12 +8,63 @@ class Effect:
     
     effect_id: int
     segments: Dict[str, 'Segment'] = field(default_factory=dict)
+    content_hash: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _segment_ids: Optional[Tuple[int, ...]] = field(default=None, init=False, repr=False, compare=False)
+    _shared: Set[str] = field(default_factory=set, init=False, repr=False, compare=False)
+    _in_snapshot: Set[str] = field(default_factory=set, init=False, repr=False, compare=False)
     
     def __post_init__(self):
         """Validate effect data after initialization"""
         if self.effect_id < 0:
             raise ValueError("Effect ID must be non-negative")
             
+    def invalidate_hash(self):
+        """Drop cached content hash after a segment or the segment order changes"""
+        self.content_hash = None
+        
+    def invalidate_index(self):
+        """Drop cached segment ID list; the segment methods call this, so change segments only through them"""
+        self._segment_ids = None
+        
+    def clone(self, effect_id: int) -> 'Effect':
+        """Copy sharing segment objects with this effect until either side writes to one"""
+        effect = Effect(effect_id=effect_id, segments=dict(self.segments))
+        if effect_id == self.effect_id:
+            effect.content_hash = self.content_hash
+        effect._shared = set(self.segments)
+        self._shared.update(self.segments)
+        return effect
+        
+    def detach(self) -> 'Effect':
+        """Copy to change in place of this effect, which stays unchanged in a transaction snapshot
+
+        Segments shared with other effects stay marked shared; the others
+        are shared only with the snapshot and unmarked by release_snapshot.
+        """
+        effect = Effect(effect_id=self.effect_id, segments=dict(self.segments))
+        effect.content_hash = self.content_hash
+        effect._shared = set(self._shared)
+        effect._in_snapshot = set(self.segments) - self._shared
+        return effect
+        
+    def release_snapshot(self):
+        """Forget sharing with a committed transaction's snapshot"""
+        self._in_snapshot.clear()
+        
+    def own_segment(self, segment_id: str) -> Optional['Segment']:
+        """Get segment for changing, first replacing it by a copy if it is shared with another effect or a snapshot"""
+        segment = self.segments.get(segment_id)
+        if segment is not None and segment_id in self._shared:
+            segment = segment.clone(segment.segment_id)
+        elif segment is not None and segment_id in self._in_snapshot:
+            segment = segment.detach()
+        else:
+            return segment
+        self.segments[segment_id] = segment
+        self._shared.discard(segment_id)
+        self._in_snapshot.discard(segment_id)
+        return segment
+            
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Effect':
         """Create Effect from dictionary"""
@@ -40,21 +91,53 @@ class Effect:
         """Get segment by ID"""
         return self.segments.get(segment_id)
         
-    def get_segment_ids(self) -> List[int]:
-        """Get all segment IDs as integers"""
-        return [int(seg_id) for seg_id in self.segments.keys()]
+    def get_segment_ids(self) -> Tuple[int, ...]:
+        """Get all segment IDs as integers, in segment order"""
+        if self._segment_ids is None:
+            self._segment_ids = tuple(int(seg_id) for seg_id in self.segments)
+        return self._segment_ids
         
     def add_segment(self, segment: 'Segment'):
         """Add segment to effect"""
         self.segments[str(segment.segment_id)] = segment
+        self.invalidate_index()
+        
+    def insert_segment(self, segment: 'Segment', position: int):
+        """Insert segment at position in segment order"""
+        items = list(self.segments.items())
+        items.insert(position, (str(segment.segment_id), segment))
+        self.segments = dict(items)
+        self.invalidate_index()
+        
+    def rename_segment(self, segment_id: str, new_id: int) -> Optional['Segment']:
+        """Change segment ID, moving the segment to the end of the segment order"""
+        if str(new_id) in self.segments:
+            return None
+        segment = self.own_segment(segment_id)
+        if segment is None:
+            return None
+        del self.segments[segment_id]
+        segment.segment_id = new_id
+        self.segments[str(new_id)] = segment
+        self.invalidate_index()
+        return segment
         
     def remove_segment(self, segment_id: str) -> bool:
         """Remove segment by ID"""
         if segment_id in self.segments:
             del self.segments[segment_id]
+            self.invalidate_index()
             return True
         return False
         
+    def reorder_segments(self, segment_order: List[str]) -> bool:
+        """Reorder segments to match given list of all segment IDs"""
+        if sorted(segment_order) != sorted(self.segments.keys()):
+            return False
+        self.segments = {seg_id: self.segments[seg_id] for seg_id in segment_order}
+        self.invalidate_index()
+        return True
+        
     def get_segment_count(self) -> int:
         """Get number of segments in this effect"""
         return len(self.segments)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Set, Tuple
 from dataclasses import dataclass, field
 from models.effect import Effect
 
@@ -13,6 +13,11 @@ class Scene:
     current_palette_id: int
     palettes: List[List[List[int]]] = field(default_factory=list)
     effects: List['Effect'] = field(default_factory=list)
+    content_hash: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _effect_index: Optional[Dict[int, 'Effect']] = field(default=None, init=False, repr=False, compare=False)
+    _effect_ids: Optional[Tuple[int, ...]] = field(default=None, init=False, repr=False, compare=False)
+    _shared: Set[int] = field(default_factory=set, init=False, repr=False, compare=False)
+    _in_snapshot: Set[int] = field(default_factory=set, init=False, repr=False, compare=False)
     
     def __post_init__(self):
         """Validate scene data after initialization"""
@@ -23,6 +28,78 @@ class Scene:
         if self.scene_id < 0:
             raise ValueError("Scene ID must be non-negative")
             
+    def invalidate_hash(self):
+        """Drop cached content hash after scene fields, palettes or effects change"""
+        self.content_hash = None
+        
+    def invalidate_index(self):
+        """Drop effect lookup index; the effect methods call this, so change effects only through them"""
+        self._effect_index = None
+        self._effect_ids = None
+        
+    def clone(self, scene_id: int) -> 'Scene':
+        """Copy sharing effect objects with this scene until either side writes to one
+
+        Palettes are copied, sharing their colors, which are replaced on
+        edit and never changed in place.
+        """
+        scene = self._copy(scene_id)
+        shared = {effect.effect_id for effect in self.effects}
+        scene._shared = set(shared)
+        self._shared.update(shared)
+        return scene
+        
+    def snapshot(self) -> 'Scene':
+        """Copy for rolling back a transaction, sharing effect objects with this scene
+
+        This scene copies an effect before changing it, as for a clone, but
+        the marks are kept apart and dropped by release_snapshot, so after
+        commit the next change does not copy again.
+        """
+        scene = self._copy(self.scene_id)
+        scene._shared = set(self._shared)
+        self._in_snapshot.update(effect.effect_id for effect in self.effects)
+        return scene
+        
+    def release_snapshot(self):
+        """Forget sharing with a committed transaction's snapshot"""
+        self._in_snapshot.clear()
+        for effect in self.effects:
+            effect.release_snapshot()
+        
+    def own_effect(self, effect_id: int) -> Optional['Effect']:
+        """Get effect for changing, first replacing it by a clone if it is shared with another scene or a snapshot"""
+        effect = self.get_effect(effect_id)
+        if effect is not None and (effect_id in self._shared or effect_id in self._in_snapshot):
+            clone = effect.clone(effect_id) if effect_id in self._shared else effect.detach()
+            self.effects[:] = [clone if other is effect else other for other in self.effects]
+            self.invalidate_index()
+            self._shared.discard(effect_id)
+            self._in_snapshot.discard(effect_id)
+            effect = clone
+        return effect
+        
+    def _copy(self, scene_id: int) -> 'Scene':
+        return Scene(
+            scene_id=scene_id,
+            led_count=self.led_count,
+            fps=self.fps,
+            current_effect_id=self.current_effect_id,
+            current_palette_id=self.current_palette_id,
+            palettes=[list(palette) for palette in self.palettes],
+            effects=list(self.effects)
+        )
+        
+    def _index(self) -> Dict[int, 'Effect']:
+        """Get effect ID index, rebuilding it after invalidate_index"""
+        if self._effect_index is None:
+            index = {}
+            for effect in self.effects:
+                index.setdefault(effect.effect_id, effect)
+            self._effect_index = index
+            self._effect_ids = tuple(effect.effect_id for effect in self.effects)
+        return self._effect_index
+            
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Scene':
         """Create Scene from dictionary"""
@@ -56,14 +133,12 @@ class Scene:
         
     def get_effect(self, effect_id: int) -> Optional['Effect']:
         """Get effect by ID"""
-        for effect in self.effects:
-            if effect.effect_id == effect_id:
-                return effect
-        return None
+        return self._index().get(effect_id)
         
-    def get_effect_ids(self) -> List[int]:
+    def get_effect_ids(self) -> Tuple[int, ...]:
         """Get all effect IDs in this scene"""
-        return [effect.effect_id for effect in self.effects]
+        self._index()
+        return self._effect_ids
         
     def get_palette_colors(self, palette_id: int) -> List[str]:
         """Get palette colors as hex strings"""
@@ -79,11 +154,18 @@ class Scene:
     def add_effect(self, effect: 'Effect'):
         """Add effect to scene"""
         self.effects.append(effect)
+        self.invalidate_index()
+        
+    def insert_effect(self, effect: 'Effect', position: int):
+        """Insert effect at position in effect order"""
+        self.effects.insert(position, effect)
+        self.invalidate_index()
         
     def remove_effect(self, effect_id: int) -> bool:
         """Remove effect by ID"""
-        for i, effect in enumerate(self.effects):
-            if effect.effect_id == effect_id:
-                del self.effects[i]
-                return True
-        return False
\ No newline at end of file
+        effect = self._index().get(effect_id)
+        if effect is None:
+            return False
+        self.effects[:] = [other for other in self.effects if other is not effect]
+        self.invalidate_index()
+        return True
\ No newline at end of file
@@ -1,5 +1,9 @@
-from typing import List, Dict, Any
-from dataclasses import dataclass
+import copy
+from typing import List, Dict, Any, Optional, Set
+from dataclasses import dataclass, field
+
+
+LIST_FIELDS = ("color", "transparency", "length", "move_range", "dimmer_time")
 
 
 @dataclass
@@ -17,6 +21,9 @@ class Segment:
     is_edge_reflect: bool
     region_id: int
     dimmer_time: List[List[int]]
+    compiled_dimmer: Optional[Any] = field(default=None, init=False, repr=False, compare=False)
+    content_hash: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _shared: Set[str] = field(default_factory=set, init=False, repr=False, compare=False)
     
     def __post_init__(self):
         """Validate and auto-fix segment data after initialization"""
@@ -44,6 +51,43 @@ class Segment:
                 self.length = self.length[:expected_length_size]
 
         self.length = [max(1, value) for value in self.length]
+        
+    def invalidate_dimmer_cache(self):
+        """Drop compiled dimmer envelope after dimmer_time changes"""
+        self.compiled_dimmer = None
+        
+    def invalidate_hash(self):
+        """Drop cached content hash after any field changes"""
+        self.content_hash = None
+        
+    def clone(self, segment_id: int) -> 'Segment':
+        """Copy sharing list fields with this segment until either side changes them in place"""
+        segment = copy.copy(self)
+        segment.segment_id = segment_id
+        if segment_id != self.segment_id:
+            segment.content_hash = None
+        segment._shared = set(LIST_FIELDS)
+        self._shared = set(LIST_FIELDS)
+        return segment
+        
+    def detach(self) -> 'Segment':
+        """Copy with its own list fields, to change in place of this segment kept in a transaction snapshot"""
+        segment = copy.copy(self)
+        for name in LIST_FIELDS:
+            setattr(segment, name, list(getattr(self, name)))
+        segment._shared = set()
+        return segment
+        
+    def own(self, *names: str):
+        """Copy named list fields still shared with a clone, before changing them in place
+
+        Copies are one level deep: dimmer elements are replaced on edit,
+        never changed in place, so they stay shared.
+        """
+        for name in names:
+            if name in self._shared:
+                setattr(self, name, list(getattr(self, name)))
+                self._shared.discard(name)
             
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Segment':
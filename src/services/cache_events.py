@@ -0,0 +1,136 @@
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Tuple, Type, Union
+
+
+EntityPath = Tuple[int, ...]
+
+
+@dataclass(frozen=True)
+class CacheEvent:
+    """Change of cached show data, located by (scene, effect, segment) path"""
+
+    scene_id: Optional[int] = None
+
+    @property
+    def path(self) -> EntityPath:
+        return () if self.scene_id is None else (self.scene_id,)
+
+
+@dataclass(frozen=True)
+class StructureChanged(CacheEvent):
+    """Entities of a kind were created, deleted, duplicated, renumbered or reordered
+
+    kind is 'show' (whole show replaced), 'scene', 'effect', 'palette',
+    'segment' or 'region'. effect_id is set for segment changes.
+    """
+
+    kind: str = "show"
+    effect_id: Optional[int] = None
+
+    @property
+    def path(self) -> EntityPath:
+        return _path(self.scene_id, self.effect_id)
+
+
+@dataclass(frozen=True)
+class SelectionChanged(CacheEvent):
+    """Current scene, effect or palette changed"""
+
+    effect_id: Optional[int] = None
+    palette_id: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class SceneSettingsChanged(CacheEvent):
+    """Scene properties such as led_count or fps changed"""
+
+    keys: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class PaletteColorChanged(CacheEvent):
+    """One color of a scene palette changed"""
+
+    palette_id: int = 0
+    color_index: int = 0
+
+
+@dataclass(frozen=True)
+class SegmentParamChanged(CacheEvent):
+    """One segment parameter, including its dimmer sequence, changed"""
+
+    effect_id: Optional[int] = None
+    segment_id: Optional[int] = None
+    param: str = ""
+
+    @property
+    def path(self) -> EntityPath:
+        return _path(self.scene_id, self.effect_id, self.segment_id)
+
+
+@dataclass(frozen=True)
+class ChangeBatch(CacheEvent):
+    """Several changes committed together by DataCacheService.transaction"""
+
+    events: Tuple[CacheEvent, ...] = ()
+
+    @property
+    def path(self) -> EntityPath:
+        paths = [event.path for event in self.events]
+        common = min((len(path) for path in paths), default=0)
+        while common and any(path[:common] != paths[0][:common] for path in paths):
+            common -= 1
+        return paths[0][:common] if paths else ()
+
+
+def merge_events(events: List[CacheEvent]) -> Optional[CacheEvent]:
+    """Merge events of a transaction into one, dropping repeats and anything a whole-show change covers"""
+    if any(isinstance(event, StructureChanged) and event.kind == "show" for event in events):
+        return StructureChanged()
+    unique = list(dict.fromkeys(events))
+    if len(unique) <= 1:
+        return unique[0] if unique else None
+    return ChangeBatch(events=tuple(unique))
+
+
+def _path(*ids: Optional[int]) -> EntityPath:
+    path = []
+    for entity_id in ids:
+        if entity_id is None:
+            break
+        path.append(int(entity_id))
+    return tuple(path)
+
+
+EventTypes = Union[Type[CacheEvent], Tuple[Type[CacheEvent], ...]]
+
+
+class Subscription:
+    """Listener receiving events of given types on, above or below an entity path"""
+
+    __slots__ = ("callback", "event_types", "path")
+
+    def __init__(self, callback: Callable[[CacheEvent], Any], event_types: Optional[EventTypes] = None,
+                 path: EntityPath = ()):
+        self.callback = callback
+        self.event_types = event_types or CacheEvent
+        self.path = tuple(path)
+
+    def matches(self, event: CacheEvent) -> bool:
+        """Check type, and that event path and subscribed path lie on one branch
+
+        An event on an ancestor (a segment deleted from the subscribed
+        segment's effect) or a descendant (a parameter of a segment in the
+        subscribed effect) of the subscribed path is delivered. A ChangeBatch
+        only reaches subscribers whose types include it, when any of its
+        events lies on their branch.
+        """
+        if not isinstance(event, self.event_types):
+            return False
+        if isinstance(event, ChangeBatch):
+            return any(self._on_branch(inner.path) for inner in event.events)
+        return self._on_branch(event.path)
+
+    def _on_branch(self, event_path: EntityPath) -> bool:
+        common = min(len(event_path), len(self.path))
+        return event_path[:common] == self.path[:common]
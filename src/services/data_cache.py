@@ -1,10 +1,18 @@
 import json
 import copy
-from typing import Dict, Any, List, Optional, Callable
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional, Callable, Tuple
 from models.scene import Scene
 from models.effect import Effect
 from models.segment import Segment
 from models.region import Region
+from engine.strip_cache import STRIP_PARAMS, StripCache, strip_cache
+from .cache_events import (CacheEvent, EntityPath, EventTypes, PaletteColorChanged, SceneSettingsChanged,
+                           SegmentParamChanged, SelectionChanged, StructureChanged, Subscription, merge_events)
+from .edit_history import (EditHistory, EditOp, EffectAdded, HistoryStep, Inverse, PaletteAdded, PaletteColorEdit,
+                           SceneAdded, SceneSettingsEdit, SegmentAdded, SegmentParamEdit, SegmentRenamed,
+                           SegmentsReordered, SLOT_FIELDS, Selection, capture_fields)
+from .state_hash import hash_node
 from utils.logger import AppLogger
 
 
@@ -13,12 +21,18 @@ class DataCacheService:
     
     def __init__(self):
         self.scenes: Dict[int, Scene] = {}
+        self._scene_ids: Optional[Tuple[int, ...]] = None
         self.regions: Dict[int, Region] = {}
         self.current_scene_id: Optional[int] = None
         self.current_effect_id: Optional[int] = None
         self.current_palette_id: Optional[int] = None
         self.is_loaded: bool = False
         self._change_listeners: List[Callable] = []
+        self._subscriptions: List[Subscription] = []
+        self._pending_events: Optional[List[CacheEvent]] = None
+        self.history = EditHistory()
+        self._staged_scenes: Dict[int, Scene] = {}
+        self._staged_header: Dict[str, Any] = {}
         self._initialize_default_data()
         
     def _initialize_default_data(self):
@@ -61,13 +75,15 @@ class DataCacheService:
             )
             
             self.scenes[0] = default_scene
+            self._scene_ids = None
+            self.history.clear()
             self.current_scene_id = 0
             self.current_effect_id = 0
             self.current_palette_id = 0
             
             self._create_initial_regions()
             self.is_loaded = True
-            self._notify_change()
+            self._notify_change(StructureChanged())
             
         except Exception as e:
             AppLogger.error(f"Error initializing default data: {e}")
@@ -114,6 +130,8 @@ class DataCacheService:
             for scene_data in fixed_json_data.get('scenes', []):
                 scene = Scene.from_dict(scene_data)
                 self.scenes[scene.scene_id] = scene
+            self._scene_ids = None
+            self.history.clear()
                 
             self._create_initial_regions()
             
@@ -124,7 +142,7 @@ class DataCacheService:
                 self.current_palette_id = first_scene.current_palette_id
                 
             self.is_loaded = True
-            self._notify_change()
+            self._notify_change(StructureChanged())
             return True
             
         except Exception as e:
@@ -187,8 +205,55 @@ class DataCacheService:
         except Exception as e:
             raise Exception(f"Failed to load file {file_path}: {str(e)}")
 
+    def begin_state_load(self):
+        """Start staging a streamed show; current data stays visible until finish_state_load"""
+        self.abort_state_load()
+
+    def apply_state_record(self, record: Dict[str, Any]):
+        """Apply one header, scene or effect record from a streamed state transfer"""
+        record_type = record.get('type')
+        if record_type == 'header':
+            self._staged_header = record
+        elif record_type == 'scene':
+            scene = Scene.from_dict(dict(record['scene'], effects=[]))
+            self._staged_scenes[scene.scene_id] = scene
+        elif record_type == 'effect':
+            effect_data = copy.deepcopy(record['effect'])
+            for segment_data in effect_data.get('segments', {}).values():
+                self._fix_segment_arrays(segment_data)
+            self._staged_scenes[record['scene_id']].add_effect(Effect.from_dict(effect_data))
+        else:
+            raise ValueError(f"Unknown state record type: {record_type}")
+
+    def finish_state_load(self):
+        """Replace cached show with staged scenes and notify listeners once"""
+        scenes, header = self._staged_scenes, self._staged_header
+        self.abort_state_load()
+
+        self.scenes = scenes
+        self._scene_ids = None
+        self.history.clear()
+        self.regions.clear()
+        self._create_initial_regions()
+
+        scene = self.scenes.get(header.get('current_scene_id'))
+        if scene is None and self.scenes:
+            scene = next(iter(self.scenes.values()))
+        if scene is not None:
+            self.current_scene_id = scene.scene_id
+            self.current_effect_id = header.get('current_effect_id', scene.current_effect_id)
+            self.current_palette_id = header.get('current_palette_id', scene.current_palette_id)
+
+        self.is_loaded = True
+        self._notify_change(StructureChanged())
+
+    def abort_state_load(self):
+        """Discard staged scenes"""
+        self._staged_scenes = {}
+        self._staged_header = {}
+
     def add_change_listener(self, callback: Callable):
-        """Add listener for cache changes"""
+        """Add listener called without arguments on every cache change"""
         if callback not in self._change_listeners:
             self._change_listeners.append(callback)
             
@@ -197,8 +262,159 @@ class DataCacheService:
         if callback in self._change_listeners:
             self._change_listeners.remove(callback)
             
-    def _notify_change(self):
-        """Notify all listeners about cache changes"""
+    def subscribe(self, callback: Callable[[CacheEvent], Any], event_types: Optional[EventTypes] = None,
+                  path: EntityPath = ()) -> Subscription:
+        """Call callback with each event of event_types on the branch through (scene, effect, segment) path"""
+        subscription = Subscription(callback, event_types, path)
+        self._subscriptions.append(subscription)
+        return subscription
+        
+    def unsubscribe(self, callback: Callable[[CacheEvent], Any]):
+        """Remove every subscription of callback"""
+        self._subscriptions = [subscription for subscription in self._subscriptions if subscription.callback != callback]
+            
+    @contextmanager
+    def transaction(self):
+        """Apply changes made in the block as one, with a single notification on exit
+
+        Events are held back and merged into one event (a ChangeBatch when
+        they differ) delivered when the outermost block exits, and the changes
+        form one undo step. If the block raises, the show and selection are
+        restored, nothing is notified and the edit history is cleared, since
+        its entries reference objects the restore replaced. The rollback copy
+        shares effects copy-on-write, so entering a transaction costs
+        O(scenes + effects), not a copy of the show; the sharing ends on
+        commit, so later changes do not copy again. Nested transactions join
+        the outermost one.
+        """
+        if self._pending_events is not None:
+            yield
+            return
+            
+        snapshot = self._snapshot()
+        self._pending_events = []
+        self.history.begin(self._selection())
+        try:
+            yield
+            events = self._pending_events
+            self.history.commit(self._selection())
+            for scene in self.scenes.values():
+                scene.release_snapshot()
+        except Exception:
+            self._restore(snapshot)
+            self.history.clear()
+            AppLogger.warning(f"Cache transaction rolled back: {len(self._pending_events)} changes discarded")
+            raise
+        finally:
+            self._pending_events = None
+            
+        event = merge_events(events)
+        if event is not None:
+            self._notify_change(event)
+            
+    def _snapshot(self) -> Dict[str, Any]:
+        """Capture show for rollback, sharing effects with the live scenes until either is changed"""
+        return {
+            'scenes': {scene_id: scene.snapshot() for scene_id, scene in self.scenes.items()},
+            'regions': copy.deepcopy(self.regions),
+            'current_scene_id': self.current_scene_id,
+            'current_effect_id': self.current_effect_id,
+            'current_palette_id': self.current_palette_id,
+            'is_loaded': self.is_loaded
+        }
+        
+    def _restore(self, snapshot: Dict[str, Any]):
+        for key, value in snapshot.items():
+            setattr(self, key, value)
+        self._scene_ids = None
+        
+    # ===== Edit History =====
+    
+    def undo(self) -> Optional[HistoryStep]:
+        """Revert last recorded change or transaction with one merged notification
+
+        Returns the step with the OSC commands that revert it on the backend,
+        or None when there is nothing to undo.
+        """
+        return self._apply_history(self.history.undo)
+        
+    def redo(self) -> Optional[HistoryStep]:
+        """Reapply last undone change or transaction"""
+        return self._apply_history(self.history.redo)
+        
+    def _apply_history(self, step: Callable[['DataCacheService'], Optional[HistoryStep]]) -> Optional[HistoryStep]:
+        if self._pending_events is not None:
+            AppLogger.warning("Cannot undo or redo inside a cache transaction")
+            return None
+            
+        self._pending_events = []
+        try:
+            result = step(self)
+            events = self._pending_events
+        finally:
+            self._pending_events = None
+            
+        event = merge_events(events)
+        if event is not None:
+            self._notify_change(event)
+        return result
+        
+    def _record(self, op: EditOp, before: Optional[Selection] = None):
+        """Add reversible operation to history; before is the selection if the change moved it"""
+        selection = self._selection()
+        self.history.record(op, before or selection, selection)
+        
+    def _selection(self) -> Selection:
+        return self.current_scene_id, self.current_effect_id, self.current_palette_id
+        
+    def restore_selection(self, selection: Selection):
+        """Select (scene, effect, palette) again as it was around a recorded change"""
+        if selection == self._selection():
+            return
+        self.current_scene_id, self.current_effect_id, self.current_palette_id = selection
+        scene = self.scenes.get(self.current_scene_id)
+        if scene:
+            if self.current_effect_id is not None:
+                scene.current_effect_id = self.current_effect_id
+            if self.current_palette_id is not None:
+                scene.current_palette_id = self.current_palette_id
+        self._notify_change(self._selection_changed())
+        
+    def mark_changed(self, event: CacheEvent, scene: Scene, effect: Optional[Effect] = None, segment: Optional[Segment] = None):
+        """Drop cached hashes from segment up to scene after an edit history operation changed models directly, then notify event"""
+        for node in (segment, effect, scene):
+            if node is not None:
+                node.invalidate_hash()
+        self._notify_change(event)
+        
+    def insert_scene(self, scene: Scene, position: int):
+        """Put scene object back at position in scene order without recording history"""
+        items = list(self.scenes.items())
+        items.insert(position, (scene.scene_id, scene))
+        self.scenes.clear()
+        self.scenes.update(items)
+        self._scene_ids = None
+        self._notify_change(StructureChanged(scene.scene_id, "scene"))
+        
+    def remove_scene(self, scene_id: int):
+        """Take scene out of the show without recording history or changing the selection"""
+        del self.scenes[scene_id]
+        self._scene_ids = None
+        self._notify_change(StructureChanged(scene_id, "scene"))
+        
+    def _notify_change(self, event: CacheEvent):
+        """Deliver event to matching subscribers, then notify all change listeners"""
+        if self._pending_events is not None:
+            self._pending_events.append(event)
+            return
+            
+        for subscription in self._subscriptions[:]:
+            if subscription.matches(event):
+                try:
+                    subscription.callback(event)
+                except Exception as e:
+                    AppLogger.error(f"Error in {type(event).__name__} subscriber: {e}")
+                    
         for callback in self._change_listeners[:]:
             try:
                 if callable(callback):
@@ -210,9 +426,47 @@ class DataCacheService:
                 if callback in self._change_listeners:
                     self._change_listeners.remove(callback)
                     
-    def get_scene_ids(self) -> List[int]:
-        """Get all available scene IDs"""
-        return sorted(self.scenes.keys())
+    def _resolve_ids(self, scene_id: Optional[int] = None, effect_id: Optional[int] = None) -> Tuple[Optional[int], Optional[int]]:
+        """Get scene and effect IDs a call defaulting to the current ones addresses"""
+        return scene_id or self.current_scene_id, effect_id or self.current_effect_id
+        
+    def _segment_changed(self, segment: Segment, param: str, scene_id: Optional[int] = None,
+                         effect_id: Optional[int] = None) -> SegmentParamChanged:
+        scene_id, effect_id = self._resolve_ids(scene_id, effect_id)
+        return SegmentParamChanged(scene_id, effect_id, segment.segment_id, param)
+        
+    def _segments_changed(self, scene_id: Optional[int] = None, effect_id: Optional[int] = None) -> StructureChanged:
+        scene_id, effect_id = self._resolve_ids(scene_id, effect_id)
+        return StructureChanged(scene_id, "segment", effect_id)
+        
+    def _selection_changed(self) -> SelectionChanged:
+        return SelectionChanged(self.current_scene_id, self.current_effect_id, self.current_palette_id)
+                    
+    def _invalidate_effect_hash(self, scene_id: Optional[int] = None, effect_id: Optional[int] = None, segment: Optional[Segment] = None):
+        """Drop cached hashes from changed segment or effect up to its scene"""
+        if segment:
+            segment.invalidate_hash()
+        effect = self.get_effect(scene_id, effect_id)
+        if effect:
+            effect.invalidate_hash()
+        scene = self.get_scene(scene_id or self.current_scene_id)
+        if scene:
+            scene.invalidate_hash()
+        
+    def get_state_hash(self, *path: int) -> Optional[str]:
+        """Get content hash of show, scene, effect or segment at path"""
+        node = hash_node(self.scenes, path)
+        return node['hash'] if node else None
+        
+    def get_state_hash_node(self, *path: int) -> Optional[Dict[str, Any]]:
+        """Get content hash at path with the hashes of its children, for drift queries"""
+        return hash_node(self.scenes, tuple(path))
+                    
+    def get_scene_ids(self) -> Tuple[int, ...]:
+        """Get all available scene IDs, sorted"""
+        if self._scene_ids is None:
+            self._scene_ids = tuple(sorted(self.scenes))
+        return self._scene_ids
         
     def get_scene(self, scene_id: int) -> Optional[Scene]:
         """Get scene by ID from cache"""
@@ -224,12 +478,12 @@ class DataCacheService:
             return self.scenes.get(self.current_scene_id)
         return None
         
-    def get_effect_ids(self, scene_id: Optional[int] = None) -> List[int]:
+    def get_effect_ids(self, scene_id: Optional[int] = None) -> Tuple[int, ...]:
         """Get effect IDs for scene"""
         scene = self.get_scene(scene_id or self.current_scene_id)
         if scene:
             return scene.get_effect_ids()
-        return []
+        return ()
         
     def get_effect(self, scene_id: Optional[int] = None, effect_id: Optional[int] = None) -> Optional[Effect]:
         """Get effect from scene"""
@@ -265,12 +519,12 @@ class DataCacheService:
         """Get current palette colors as hex strings"""
         return self.get_palette_colors()
         
-    def get_segment_ids(self, scene_id: Optional[int] = None, effect_id: Optional[int] = None) -> List[int]:
+    def get_segment_ids(self, scene_id: Optional[int] = None, effect_id: Optional[int] = None) -> Tuple[int, ...]:
         """Get segment IDs for effect"""
         effect = self.get_effect(scene_id, effect_id)
         if effect:
             return effect.get_segment_ids()
-        return []
+        return ()
         
     def get_segment(self, segment_id: str, scene_id: Optional[int] = None, effect_id: Optional[int] = None) -> Optional[Segment]:
         """Get segment from effect"""
@@ -279,6 +533,20 @@ class DataCacheService:
             return effect.get_segment(segment_id)
         return None
         
+    def _writable_effect(self, scene_id: Optional[int] = None, effect_id: Optional[int] = None) -> Optional[Effect]:
+        """Get effect for changing, first unsharing it from any duplicated scene"""
+        scene = self.get_scene(scene_id or self.current_scene_id)
+        if scene:
+            return scene.own_effect(effect_id or self.current_effect_id)
+        return None
+        
+    def _writable_segment(self, segment_id: str, scene_id: Optional[int] = None, effect_id: Optional[int] = None) -> Optional[Segment]:
+        """Get segment for changing, first unsharing it and its effect from any duplicate"""
+        effect = self._writable_effect(scene_id, effect_id)
+        if effect:
+            return effect.own_segment(segment_id)
+        return None
+        
     def get_region_ids(self) -> List[int]:
         """Get all region IDs"""
         return sorted(self.regions.keys())
@@ -290,40 +558,48 @@ class DataCacheService:
     def create_scene(self, scene_data: Dict[str, Any]) -> Optional[int]:
         """Create new scene"""
         try:
-            existing_ids = list(self.scenes.keys())
-            new_id = max(existing_ids) + 1 if existing_ids else 0
-            
-            scene_data['scene_id'] = new_id
-            new_scene = Scene.from_dict(scene_data)
-            self.scenes[new_id] = new_scene
-            
-            self._notify_change()
-            return new_id
+            scene_data['scene_id'] = self._next_scene_id()
+            return self._add_scene(Scene.from_dict(scene_data))
         except Exception as e:
             AppLogger.error(f"Error creating scene: {e}")
             return None
             
+    def _next_scene_id(self) -> int:
+        existing_ids = self.get_scene_ids()
+        return max(existing_ids) + 1 if existing_ids else 0
+        
+    def _add_scene(self, new_scene: Scene) -> int:
+        self.scenes[new_scene.scene_id] = new_scene
+        self._scene_ids = None
+        
+        self._record(SceneAdded(new_scene, len(self.scenes) - 1))
+        self._notify_change(StructureChanged(new_scene.scene_id, "scene"))
+        return new_scene.scene_id
+            
     def delete_scene(self, scene_id: int) -> bool:
         """Delete scene"""
         try:
             if scene_id in self.scenes:
-                del self.scenes[scene_id]
+                before = self._selection()
+                position = list(self.scenes).index(scene_id)
+                scene = self.scenes.pop(scene_id)
+                self._scene_ids = None
                 if self.current_scene_id == scene_id:
                     remaining_ids = list(self.scenes.keys())
                     self.current_scene_id = remaining_ids[0] if remaining_ids else None
-                self._notify_change()
+                self._record(Inverse(SceneAdded(scene, position)), before)
+                self._notify_change(StructureChanged(scene_id, "scene"))
                 return True
         except Exception as e:
             AppLogger.error(f"Error deleting scene: {e}")
         return False
         
     def duplicate_scene(self, source_scene_id: int) -> Optional[int]:
-        """Duplicate scene"""
+        """Duplicate scene, sharing its effects with the source until either is edited"""
         try:
             source_scene = self.get_scene(source_scene_id)
             if source_scene:
-                scene_data = source_scene.to_dict()
-                return self.create_scene(scene_data)
+                return self._add_scene(source_scene.clone(self._next_scene_id()))
         except Exception as e:
             AppLogger.error(f"Error duplicating scene: {e}")
         return None
@@ -333,10 +609,13 @@ class DataCacheService:
         try:
             scene = self.get_scene(scene_id)
             if scene:
-                for key, value in updates.items():
-                    if hasattr(scene, key):
-                        setattr(scene, key, value)
-                self._notify_change()
+                keys = [key for key in updates if hasattr(scene, key)]
+                before = {key: getattr(scene, key) for key in keys}
+                for key in keys:
+                    setattr(scene, key, updates[key])
+                scene.invalidate_hash()
+                self._record(SceneSettingsEdit(scene.scene_id, before, {key: updates[key] for key in keys}))
+                self._notify_change(SceneSettingsChanged(scene.scene_id, tuple(updates)))
                 return True
         except Exception as e:
             AppLogger.error(f"Error updating scene: {e}")
@@ -351,9 +630,11 @@ class DataCacheService:
                 new_id = max(existing_ids) + 1 if existing_ids else 0
                 
                 new_effect = Effect(effect_id=new_id)
-                scene.effects.append(new_effect)
+                scene.add_effect(new_effect)
+                scene.invalidate_hash()
+                self._record(EffectAdded(scene.scene_id, new_effect, len(scene.effects) - 1))
                 
-                self._notify_change()
+                self._notify_change(StructureChanged(scene.scene_id, "effect"))
                 return new_id
         except Exception as e:
             AppLogger.error(f"Error creating effect: {e}")
@@ -364,19 +645,24 @@ class DataCacheService:
         try:
             scene = self.get_scene(scene_id or self.current_scene_id)
             if scene:
+                before = self._selection()
+                effect = scene.get_effect(effect_id)
+                position = next((index for index, other in enumerate(scene.effects) if other is effect), None)
                 success = scene.remove_effect(effect_id)
                 if success:
+                    scene.invalidate_hash()
                     if self.current_effect_id == effect_id:
                         remaining_ids = scene.get_effect_ids()
                         self.current_effect_id = remaining_ids[0] if remaining_ids else None
-                    self._notify_change()
+                    self._record(Inverse(EffectAdded(scene.scene_id, effect, position)), before)
+                    self._notify_change(StructureChanged(scene.scene_id, "effect"))
                 return success
         except Exception as e:
             AppLogger.error(f"Error deleting effect: {e}")
         return False
         
     def duplicate_effect(self, source_effect_id: int, scene_id: Optional[int] = None) -> Optional[int]:
-        """Duplicate effect in scene"""
+        """Duplicate effect in scene, sharing its segments with the source until either is edited"""
         try:
             source_effect = self.get_effect(scene_id, source_effect_id)
             if source_effect:
@@ -385,13 +671,12 @@ class DataCacheService:
                     existing_ids = scene.get_effect_ids()
                     new_id = max(existing_ids) + 1 if existing_ids else 0
                     
-                    effect_data = source_effect.to_dict()
-                    effect_data['effect_id'] = new_id
-                    
-                    new_effect = Effect.from_dict(effect_data)
-                    scene.effects.append(new_effect)
+                    new_effect = source_effect.clone(new_id)
+                    scene.add_effect(new_effect)
+                    scene.invalidate_hash()
+                    self._record(EffectAdded(scene.scene_id, new_effect, len(scene.effects) - 1))
                     
-                    self._notify_change()
+                    self._notify_change(StructureChanged(scene.scene_id, "effect"))
                     return new_id
         except Exception as e:
             AppLogger.error(f"Error duplicating effect: {e}")
@@ -403,8 +688,10 @@ class DataCacheService:
             scene = self.get_scene(scene_id or self.current_scene_id)
             if scene:
                 scene.palettes.append(palette_data)
+                scene.invalidate_hash()
                 new_id = len(scene.palettes) - 1
-                self._notify_change()
+                self._record(PaletteAdded(scene.scene_id, new_id, palette_data))
+                self._notify_change(StructureChanged(scene.scene_id, "palette"))
                 return new_id
         except Exception as e:
             AppLogger.error(f"Error creating palette: {e}")
@@ -415,24 +702,26 @@ class DataCacheService:
         try:
             scene = self.get_scene(scene_id or self.current_scene_id)
             if scene and 0 <= palette_id < len(scene.palettes):
-                del scene.palettes[palette_id]
+                before = self._selection()
+                palette = scene.palettes.pop(palette_id)
+                scene.invalidate_hash()
                 if self.current_palette_id == palette_id:
                     self.current_palette_id = 0 if scene.palettes else None
                 elif self.current_palette_id > palette_id:
                     self.current_palette_id -= 1
-                self._notify_change()
+                self._record(Inverse(PaletteAdded(scene.scene_id, palette_id, palette)), before)
+                self._notify_change(StructureChanged(scene.scene_id, "palette"))
                 return True
         except Exception as e:
             AppLogger.error(f"Error deleting palette: {e}")
         return False
         
     def duplicate_palette(self, source_palette_id: int, scene_id: Optional[int] = None) -> Optional[int]:
-        """Duplicate palette in scene"""
+        """Duplicate palette in scene, sharing its colors which are replaced on edit"""
         try:
-            source_palette = self.get_palette_colors(source_palette_id, scene_id)
-            if source_palette:
-                palette_copy = copy.deepcopy(source_palette)
-                return self.create_palette(palette_copy, scene_id)
+            scene = self.get_scene(scene_id or self.current_scene_id)
+            if scene and 0 <= source_palette_id < len(scene.palettes):
+                return self.create_palette(list(scene.palettes[source_palette_id]), scene_id)
         except Exception as e:
             AppLogger.error(f"Error duplicating palette: {e}")
         return None
@@ -442,8 +731,11 @@ class DataCacheService:
         try:
             scene = self.get_scene(scene_id or self.current_scene_id)
             if scene and 0 <= palette_id < len(scene.palettes) and 0 <= color_index < len(scene.palettes[palette_id]):
+                previous = scene.palettes[palette_id][color_index]
                 scene.palettes[palette_id][color_index] = color
-                self._notify_change()
+                scene.invalidate_hash()
+                self._record(PaletteColorEdit(scene.scene_id, palette_id, color_index, previous, list(color)))
+                self._notify_change(PaletteColorChanged(scene.scene_id, palette_id, color_index))
                 return True
         except Exception as e:
             AppLogger.error(f"Error updating palette color: {e}")
@@ -459,7 +751,7 @@ class DataCacheService:
             new_region = Region.from_dict(region_data)
             self.regions[new_id] = new_region
             
-            self._notify_change()
+            self._notify_change(StructureChanged(kind="region"))
             return new_id
         except Exception as e:
             AppLogger.error(f"Error creating region: {e}")
@@ -470,7 +762,7 @@ class DataCacheService:
         try:
             if region_id in self.regions and region_id != 0:
                 del self.regions[region_id]
-                self._notify_change()
+                self._notify_change(StructureChanged(kind="region"))
                 return True
         except Exception as e:
             AppLogger.error(f"Error deleting region: {e}")
@@ -484,7 +776,7 @@ class DataCacheService:
                 for key, value in updates.items():
                     if hasattr(region, key):
                         setattr(region, key, value)
-                self._notify_change()
+                self._notify_change(StructureChanged(kind="region"))
                 return True
         except Exception as e:
             AppLogger.error(f"Error updating region: {e}")
@@ -492,7 +784,7 @@ class DataCacheService:
         
     def create_segment(self, scene_id: Optional[int] = None, effect_id: Optional[int] = None, custom_id: Optional[int] = None) -> Optional[int]:
         """Create new segment in effect"""
-        effect = self.get_effect(scene_id, effect_id)
+        effect = self._writable_effect(scene_id, effect_id)
         
         if effect:
             existing_ids = effect.get_segment_ids()
@@ -516,49 +808,60 @@ class DataCacheService:
             )
 
             effect.add_segment(new_segment)
-            self._notify_change()
+            self._invalidate_effect_hash(scene_id, effect_id)
+            self._record(SegmentAdded(*self._resolve_ids(scene_id, effect_id), new_segment, len(effect.segments) - 1))
+            self._notify_change(self._segments_changed(scene_id, effect_id))
             return new_id
 
         return None
         
     def delete_segment(self, segment_id: str, scene_id: Optional[int] = None, effect_id: Optional[int] = None) -> bool:
         """Delete segment from effect"""
-        effect = self.get_effect(scene_id, effect_id)
+        effect = self._writable_effect(scene_id, effect_id)
         
         if effect:
+            segment = effect.get_segment(segment_id)
+            position = list(effect.segments).index(segment_id) if segment else None
             success = effect.remove_segment(segment_id)
             if success:
-                self._notify_change()
+                self._invalidate_effect_hash(scene_id, effect_id)
+                self._record(Inverse(SegmentAdded(*self._resolve_ids(scene_id, effect_id), segment, position)))
+                self._notify_change(self._segments_changed(scene_id, effect_id))
             return success
         return False
         
     def duplicate_segment(self, source_segment_id: str, scene_id: Optional[int] = None, effect_id: Optional[int] = None) -> Optional[int]:
-        """Duplicate segment and return new segment ID"""
-        effect = self.get_effect(scene_id, effect_id)
+        """Duplicate segment sharing its color, transparency, length and dimmer lists until either is edited"""
+        effect = self._writable_effect(scene_id, effect_id)
         source_segment = self.get_segment(source_segment_id, scene_id, effect_id)
         
         if effect and source_segment:
             existing_ids = effect.get_segment_ids()
             new_id = max(existing_ids) + 1 if existing_ids else 0
             
-            segment_data = source_segment.to_dict()
-            segment_data['segment_id'] = new_id
-            
-            new_segment = Segment.from_dict(segment_data)
+            new_segment = source_segment.clone(new_id)
             effect.add_segment(new_segment)
+            self._invalidate_effect_hash(scene_id, effect_id)
+            self._record(SegmentAdded(*self._resolve_ids(scene_id, effect_id), new_segment, len(effect.segments) - 1))
             
-            self._notify_change()
+            self._notify_change(self._segments_changed(scene_id, effect_id))
             return new_id
         return None
         
     def reorder_segments(self, segment_order: List[str], scene_id: Optional[int] = None, effect_id: Optional[int] = None) -> bool:
-        """Reorder segments in effect"""
+        """Reorder segments in effect; keeping the current order changes and records nothing"""
         try:
             effect = self.get_effect(scene_id, effect_id)
+            if effect and list(effect.segments) == list(segment_order):
+                return True
+            effect = self._writable_effect(scene_id, effect_id)
             if effect:
+                before = list(effect.segments)
                 success = effect.reorder_segments(segment_order)
                 if success:
-                    self._notify_change()
+                    self._invalidate_effect_hash(scene_id, effect_id)
+                    self._record(SegmentsReordered(*self._resolve_ids(scene_id, effect_id), before, list(segment_order)))
+                    self._notify_change(self._segments_changed(scene_id, effect_id))
                 return success
         except Exception as e:
             AppLogger.error(f"Error reordering segments: {e}")
@@ -567,10 +870,15 @@ class DataCacheService:
     def add_dimmer_element(self, segment_id: str, dimmer_element: List[int], scene_id: Optional[int] = None, effect_id: Optional[int] = None) -> bool:
         """Add dimmer element to segment"""
         try:
-            segment = self.get_segment(segment_id, scene_id, effect_id)
+            segment = self._writable_segment(segment_id, scene_id, effect_id)
             if segment:
+                before = capture_fields(segment, "dimmer_time")
+                segment.own("dimmer_time")
                 segment.dimmer_time.append(dimmer_element)
-                self._notify_change()
+                segment.invalidate_dimmer_cache()
+                self._invalidate_effect_hash(scene_id, effect_id, segment)
+                self._record_segment_edit(segment, "dimmer_time", before, scene_id, effect_id)
+                self._notify_change(self._segment_changed(segment, "dimmer_time", scene_id, effect_id))
                 return True
         except Exception as e:
             AppLogger.error(f"Error adding dimmer element: {e}")
@@ -579,10 +887,15 @@ class DataCacheService:
     def delete_dimmer_element(self, segment_id: str, element_index: int, scene_id: Optional[int] = None, effect_id: Optional[int] = None) -> bool:
         """Delete dimmer element from segment"""
         try:
-            segment = self.get_segment(segment_id, scene_id, effect_id)
+            segment = self._writable_segment(segment_id, scene_id, effect_id)
             if segment and 0 <= element_index < len(segment.dimmer_time):
+                before = capture_fields(segment, "dimmer_time")
+                segment.own("dimmer_time")
                 del segment.dimmer_time[element_index]
-                self._notify_change()
+                segment.invalidate_dimmer_cache()
+                self._invalidate_effect_hash(scene_id, effect_id, segment)
+                self._record_segment_edit(segment, "dimmer_time", before, scene_id, effect_id)
+                self._notify_change(self._segment_changed(segment, "dimmer_time", scene_id, effect_id))
                 return True
         except Exception as e:
             AppLogger.error(f"Error deleting dimmer element: {e}")
@@ -591,10 +904,15 @@ class DataCacheService:
     def update_dimmer_element(self, segment_id: str, element_index: int, dimmer_element: List[int], scene_id: Optional[int] = None, effect_id: Optional[int] = None) -> bool:
         """Update dimmer element in segment"""
         try:
-            segment = self.get_segment(segment_id, scene_id, effect_id)
+            segment = self._writable_segment(segment_id, scene_id, effect_id)
             if segment and 0 <= element_index < len(segment.dimmer_time):
+                before = capture_fields(segment, "dimmer_time")
+                segment.own("dimmer_time")
                 segment.dimmer_time[element_index] = dimmer_element
-                self._notify_change()
+                segment.invalidate_dimmer_cache()
+                self._invalidate_effect_hash(scene_id, effect_id, segment)
+                self._record_segment_edit(segment, "dimmer_time", before, scene_id, effect_id)
+                self._notify_change(self._segment_changed(segment, "dimmer_time", scene_id, effect_id))
                 return True
         except Exception as e:
             AppLogger.error(f"Error updating dimmer element: {e}")
@@ -607,17 +925,17 @@ class DataCacheService:
             scene = self.scenes[scene_id]
             self.current_effect_id = scene.current_effect_id
             self.current_palette_id = scene.current_palette_id
-            self._notify_change()
+            self._notify_change(self._selection_changed())
             return True
         return False
         
     def set_current_effect(self, effect_id: int, scene_id: Optional[int] = None) -> bool:
         """Set current active effect"""
         scene = self.get_scene(scene_id or self.current_scene_id)
-        if scene and effect_id in [e.effect_id for e in scene.effects]:
+        if scene and scene.get_effect(effect_id) is not None:
             self.current_effect_id = effect_id
             scene.current_effect_id = effect_id
-            self._notify_change()
+            self._notify_change(self._selection_changed())
             return True
         return False
         
@@ -627,28 +945,34 @@ class DataCacheService:
         if scene and 0 <= palette_id < len(scene.palettes):
             self.current_palette_id = palette_id
             scene.current_palette_id = palette_id
-            self._notify_change()
+            self._notify_change(self._selection_changed())
             return True
         return False
         
     def update_segment_parameter(self, segment_id: str, param: str, value: Any, scene_id: Optional[int] = None, effect_id: Optional[int] = None) -> bool:
         """Update segment parameter in cache"""
-        segment = self.get_segment(segment_id, scene_id, effect_id)
+        segment = self._writable_segment(segment_id, scene_id, effect_id)
         
         if segment:
             try:
+                strip_key = StripCache.key_for(segment) if param in STRIP_PARAMS else None
+                before = capture_fields(segment, param)
+
                 if param == "segment_id":
                     new_id = int(value)
                     effect = self.get_effect(scene_id, effect_id)
                     if effect and str(new_id) not in effect.segments:
-                        effect.segments[str(new_id)] = effect.segments.pop(segment_id)
-                        segment.segment_id = new_id
-                        self._notify_change()
+                        order = list(effect.segments)
+                        effect.rename_segment(segment_id, new_id)
+                        self._invalidate_effect_hash(scene_id, effect_id, segment)
+                        self._record(SegmentRenamed(*self._resolve_ids(scene_id, effect_id), int(segment_id), new_id, order))
+                        self._notify_change(self._segments_changed(scene_id, effect_id))
                         return True
                     return False
 
                 if param == "color":
                     if isinstance(value, dict) and "index" in value and "color_index" in value:
+                        segment.own(*SLOT_FIELDS)
                         index = value["index"]
                         color_index = value["color_index"]
                         if index >= 0:
@@ -665,6 +989,7 @@ class DataCacheService:
 
                 elif param == "transparency":
                     if isinstance(value, dict) and "index" in value and "transparency" in value:
+                        segment.own(*SLOT_FIELDS)
                         index = value["index"]
                         transparency = value["transparency"]
                         if index >= 0:
@@ -681,6 +1006,7 @@ class DataCacheService:
 
                 elif param == "length":
                     if isinstance(value, dict) and "index" in value and "length" in value:
+                        segment.own(*SLOT_FIELDS)
                         index = value["index"]
                         length = value["length"]
                         if index >= 0:
@@ -710,10 +1036,16 @@ class DataCacheService:
                     segment.region_id = int(value)
                 elif param == "dimmer_time":
                     segment.dimmer_time = value
+                    segment.invalidate_dimmer_cache()
                 else:
                     return False
                     
-                self._notify_change()
+                if strip_key is not None and strip_key != StripCache.key_for(segment):
+                    strip_cache.evict(strip_key)
+                    
+                self._invalidate_effect_hash(scene_id, effect_id, segment)
+                self._record_segment_edit(segment, param, before, scene_id, effect_id)
+                self._notify_change(self._segment_changed(segment, param, scene_id, effect_id))
                 return True
                 
             except Exception as e:
@@ -721,6 +1053,13 @@ class DataCacheService:
                 return False
         return False
         
+    def _record_segment_edit(self, segment: Segment, param: str, before: Dict[str, Any],
+                             scene_id: Optional[int] = None, effect_id: Optional[int] = None):
+        after = capture_fields(segment, param)
+        if after != before:
+            scene_id, effect_id = self._resolve_ids(scene_id, effect_id)
+            self._record(SegmentParamEdit(scene_id, effect_id, segment.segment_id, param, before, after))
+            
     def export_to_dict(self) -> Dict[str, Any]:
         """Export cache data to dictionary structure"""
         try:
@@ -740,6 +1079,7 @@ class DataCacheService:
     def clear(self):
         """Clear all cached data and reinitialize"""
         self.scenes.clear()
+        self._scene_ids = None
         self.regions.clear()
         self.current_scene_id = None
         self.current_effect_id = None
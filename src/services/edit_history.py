@@ -0,0 +1,522 @@
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+from models.effect import Effect
+from models.scene import Scene
+from models.segment import Segment
+from engine.strip_cache import STRIP_PARAMS, StripCache, strip_cache
+from utils.logger import AppLogger
+from .cache_events import (EntityPath, PaletteColorChanged, SceneSettingsChanged, SegmentParamChanged,
+                           StructureChanged)
+from .osc_bundle import Message
+from .state_diff import diff_states
+
+
+Selection = Tuple[Optional[int], Optional[int], Optional[int]]
+
+SLOT_FIELDS = ("color", "transparency", "length")
+SEGMENT_FIELDS = {
+    "color": SLOT_FIELDS,
+    "transparency": SLOT_FIELDS,
+    "length": SLOT_FIELDS,
+    "move_speed": ("move_speed",),
+    "move_range": ("move_range",),
+    "initial_position": ("initial_position",),
+    "current_position": ("current_position",),
+    "is_edge_reflect": ("is_edge_reflect",),
+    "region_id": ("region_id",),
+    "dimmer_time": ("dimmer_time",)
+}
+
+
+def capture_fields(segment: Segment, param: str) -> Optional[Dict[str, Any]]:
+    """Get the segment fields an update of param can change
+
+    Lists are copied one level deep, sharing their elements: dimmer
+    elements and colors are replaced on edit, never changed in place.
+    """
+    names = SEGMENT_FIELDS.get(param)
+    if names is None:
+        return None
+    return {name: _share(getattr(segment, name)) for name in names}
+
+
+def _share(value: Any) -> Any:
+    return list(value) if isinstance(value, list) else value
+
+
+def _locate(cache, scene_id: int, effect_id: Optional[int] = None) -> Tuple[Scene, Optional[Effect]]:
+    """Get scene and effect to change, unsharing the effect from duplicates"""
+    scene = cache.get_scene(scene_id)
+    if scene is None:
+        raise KeyError(f"scene {scene_id} not found")
+    if effect_id is None:
+        return scene, None
+    effect = scene.own_effect(effect_id)
+    if effect is None:
+        raise KeyError(f"effect {effect_id} not found in scene {scene_id}")
+    return scene, effect
+
+
+# ===== Operations =====
+
+class EditOp(ABC):
+    """Reversible cache change keeping the values it replaced
+
+    scope is the path of the entity the backend must be brought in line with
+    after applying the change: (scene,) or (scene, effect) for structural
+    changes, (scene, effect, segment) for segment edits, None when scene
+    headers and palettes, which are always compared, cover it.
+    """
+
+    scope: Optional[EntityPath] = None
+
+    @abstractmethod
+    def undo(self, cache):
+        """Revert the change on cache"""
+
+    @abstractmethod
+    def redo(self, cache):
+        """Apply the change to cache again"""
+
+
+@dataclass
+class Inverse(EditOp):
+    """Operation applied backwards, e.g. a deletion recorded as an inverted addition"""
+
+    op: EditOp
+
+    @property
+    def scope(self) -> Optional[EntityPath]:
+        return self.op.scope
+
+    def undo(self, cache):
+        self.op.redo(cache)
+
+    def redo(self, cache):
+        self.op.undo(cache)
+
+
+@dataclass
+class SegmentParamEdit(EditOp):
+    """Segment parameter edit holding the before and after values of the fields it changed"""
+
+    scene_id: int
+    effect_id: int
+    segment_id: int
+    param: str
+    before: Dict[str, Any]
+    after: Dict[str, Any]
+
+    @property
+    def scope(self) -> EntityPath:
+        # Backends cannot drop color slots, so a slot count change recreates and repositions the segment
+        if len(self.before.get("color", ())) != len(self.after.get("color", ())):
+            return (self.scene_id, self.effect_id)
+        return (self.scene_id, self.effect_id, self.segment_id)
+
+    def undo(self, cache):
+        self._apply(cache, self.before)
+
+    def redo(self, cache):
+        self._apply(cache, self.after)
+
+    def _apply(self, cache, values: Dict[str, Any]):
+        scene, effect = _locate(cache, self.scene_id, self.effect_id)
+        segment = effect.own_segment(str(self.segment_id))
+        if segment is None:
+            raise KeyError(f"segment {self.segment_id} not found")
+        strip_key = StripCache.key_for(segment) if any(name in STRIP_PARAMS for name in values) else None
+        for name, value in values.items():
+            setattr(segment, name, _share(value))
+        if "dimmer_time" in values:
+            segment.invalidate_dimmer_cache()
+        if strip_key is not None and strip_key != StripCache.key_for(segment):
+            strip_cache.evict(strip_key)
+        cache.mark_changed(SegmentParamChanged(self.scene_id, self.effect_id, self.segment_id, self.param),
+                     scene, effect, segment)
+
+
+@dataclass
+class SegmentAdded(EditOp):
+    """Segment created or duplicated at position; the segment object removed by undo is kept for redo"""
+
+    scene_id: int
+    effect_id: int
+    segment: Segment
+    position: int
+    segment_id: str = field(init=False)
+
+    def __post_init__(self):
+        self.segment_id = str(self.segment.segment_id)
+
+    @property
+    def scope(self) -> EntityPath:
+        return (self.scene_id, self.effect_id)
+
+    def undo(self, cache):
+        scene, effect = _locate(cache, self.scene_id, self.effect_id)
+        # Later edits may have replaced the object with an unshared copy
+        self.segment = effect.get_segment(self.segment_id) or self.segment
+        effect.remove_segment(self.segment_id)
+        cache.mark_changed(StructureChanged(self.scene_id, "segment", self.effect_id), scene, effect)
+
+    def redo(self, cache):
+        scene, effect = _locate(cache, self.scene_id, self.effect_id)
+        effect.insert_segment(self.segment, self.position)
+        cache.mark_changed(StructureChanged(self.scene_id, "segment", self.effect_id), scene, effect)
+
+
+@dataclass
+class SegmentsReordered(EditOp):
+    """Segment order changed"""
+
+    scene_id: int
+    effect_id: int
+    before: List[str]
+    after: List[str]
+
+    @property
+    def scope(self) -> EntityPath:
+        return (self.scene_id, self.effect_id)
+
+    def undo(self, cache):
+        self._apply(cache, self.before)
+
+    def redo(self, cache):
+        self._apply(cache, self.after)
+
+    def _apply(self, cache, order: List[str]):
+        scene, effect = _locate(cache, self.scene_id, self.effect_id)
+        if not effect.reorder_segments(order):
+            raise KeyError(f"segments of effect {self.effect_id} changed")
+        cache.mark_changed(StructureChanged(self.scene_id, "segment", self.effect_id), scene, effect)
+
+
+@dataclass
+class SegmentRenamed(EditOp):
+    """Segment ID changed, which also moved the segment to the end of the effect"""
+
+    scene_id: int
+    effect_id: int
+    old_id: int
+    new_id: int
+    order: List[str]
+
+    @property
+    def scope(self) -> EntityPath:
+        return (self.scene_id, self.effect_id)
+
+    def undo(self, cache):
+        effect = self._rename(cache, self.new_id, self.old_id)
+        effect.reorder_segments(self.order)
+
+    def redo(self, cache):
+        self._rename(cache, self.old_id, self.new_id)
+
+    def _rename(self, cache, from_id: int, to_id: int) -> Effect:
+        scene, effect = _locate(cache, self.scene_id, self.effect_id)
+        segment = effect.rename_segment(str(from_id), to_id)
+        if segment is None:
+            raise KeyError(f"cannot rename segment {from_id} to {to_id}")
+        cache.mark_changed(StructureChanged(self.scene_id, "segment", self.effect_id), scene, effect, segment)
+        return effect
+
+
+@dataclass
+class EffectAdded(EditOp):
+    """Effect created or duplicated at position; the effect object removed by undo is kept for redo"""
+
+    scene_id: int
+    effect: Effect
+    position: int
+
+    @property
+    def scope(self) -> EntityPath:
+        return (self.scene_id, self.effect.effect_id)
+
+    def undo(self, cache):
+        scene, _ = _locate(cache, self.scene_id)
+        self.effect = scene.get_effect(self.effect.effect_id) or self.effect
+        scene.remove_effect(self.effect.effect_id)
+        cache.mark_changed(StructureChanged(self.scene_id, "effect"), scene)
+
+    def redo(self, cache):
+        scene, _ = _locate(cache, self.scene_id)
+        scene.insert_effect(self.effect, self.position)
+        cache.mark_changed(StructureChanged(self.scene_id, "effect"), scene)
+
+
+@dataclass
+class SceneAdded(EditOp):
+    """Scene created or duplicated at position in scene order"""
+
+    scene: Scene
+    position: int
+
+    @property
+    def scope(self) -> EntityPath:
+        return (self.scene.scene_id,)
+
+    def undo(self, cache):
+        cache.remove_scene(self.scene.scene_id)
+
+    def redo(self, cache):
+        cache.insert_scene(self.scene, self.position)
+
+
+@dataclass
+class SceneSettingsEdit(EditOp):
+    """Scene properties changed by update_scene"""
+
+    scene_id: int
+    before: Dict[str, Any]
+    after: Dict[str, Any]
+
+    def undo(self, cache):
+        self._apply(cache, self.before)
+
+    def redo(self, cache):
+        self._apply(cache, self.after)
+
+    def _apply(self, cache, values: Dict[str, Any]):
+        scene, _ = _locate(cache, self.scene_id)
+        for key, value in values.items():
+            setattr(scene, key, value)
+        cache.mark_changed(SceneSettingsChanged(self.scene_id, tuple(values)), scene)
+
+
+@dataclass
+class PaletteAdded(EditOp):
+    """Palette created or duplicated at palette_id"""
+
+    scene_id: int
+    palette_id: int
+    palette: List[List[int]]
+
+    def undo(self, cache):
+        scene, _ = _locate(cache, self.scene_id)
+        del scene.palettes[self.palette_id]
+        cache.mark_changed(StructureChanged(self.scene_id, "palette"), scene)
+
+    def redo(self, cache):
+        scene, _ = _locate(cache, self.scene_id)
+        scene.palettes.insert(self.palette_id, self.palette)
+        cache.mark_changed(StructureChanged(self.scene_id, "palette"), scene)
+
+
+@dataclass
+class PaletteColorEdit(EditOp):
+    """One palette color replaced"""
+
+    scene_id: int
+    palette_id: int
+    color_index: int
+    before: List[int]
+    after: List[int]
+
+    def undo(self, cache):
+        self._apply(cache, self.before)
+
+    def redo(self, cache):
+        self._apply(cache, self.after)
+
+    def _apply(self, cache, color: List[int]):
+        scene, _ = _locate(cache, self.scene_id)
+        scene.palettes[self.palette_id][self.color_index] = list(color)
+        cache.mark_changed(PaletteColorChanged(self.scene_id, self.palette_id, self.color_index), scene)
+
+
+# ===== History =====
+
+@dataclass
+class HistoryEntry:
+    """One undo step: operations recorded by one mutation or one transaction"""
+
+    ops: List[EditOp] = field(default_factory=list)
+    before: Selection = (None, None, None)
+    after: Selection = (None, None, None)
+
+
+@dataclass
+class HistoryStep:
+    """Undone or redone entry with the OSC commands that replay it on the backend
+
+    commands is None when the backend cannot follow incrementally, e.g. a
+    deleted effect restored under an ID the backend would not assign; the
+    caller should fall back to a full sync.
+    """
+
+    entry: HistoryEntry
+    commands: Optional[List[Message]]
+
+
+class EditHistory:
+    """Bounded undo/redo stacks of reversible operations
+
+    Entries hold the replaced values and references to removed objects, so
+    memory grows with the size of the edits, not of the show. The oldest
+    entries are dropped beyond max_depth entries or max_ops operations.
+    """
+
+    def __init__(self, max_depth: int = 100, max_ops: int = 50000):
+        self.max_depth = max_depth
+        self.max_ops = max_ops
+        self._undo: Deque[HistoryEntry] = deque()
+        self._redo: List[HistoryEntry] = []
+        self._group: Optional[HistoryEntry] = None
+        self._op_count = 0
+        self._suspended = False
+
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def __len__(self) -> int:
+        return len(self._undo)
+
+    # ===== Recording =====
+
+    @contextmanager
+    def suspended(self):
+        """Ignore operations recorded in the block"""
+        previous, self._suspended = self._suspended, True
+        try:
+            yield
+        finally:
+            self._suspended = previous
+
+    def record(self, op: EditOp, before: Selection, after: Selection):
+        """Add operation to the open group, or as an entry of its own"""
+        if self._suspended or self.max_depth <= 0:
+            return
+        self._redo.clear()
+        if self._group is not None:
+            self._group.ops.append(op)
+        else:
+            self._push(HistoryEntry([op], before, after))
+
+    def begin(self, selection: Selection):
+        """Collect operations into one entry until commit"""
+        if not self._suspended:
+            self._group = HistoryEntry(before=selection)
+
+    def commit(self, selection: Selection):
+        group, self._group = self._group, None
+        if group is not None and group.ops:
+            group.after = selection
+            self._push(group)
+
+    def clear(self):
+        """Drop all entries, e.g. after a load or a rolled back transaction replaced the objects they reference"""
+        self._undo.clear()
+        self._redo.clear()
+        self._group = None
+        self._op_count = 0
+
+    def _push(self, entry: HistoryEntry):
+        self._undo.append(entry)
+        self._op_count += len(entry.ops)
+        while len(self._undo) > 1 and (len(self._undo) > self.max_depth or self._op_count > self.max_ops):
+            self._op_count -= len(self._undo.popleft().ops)
+
+    # ===== Undo / Redo =====
+
+    def undo(self, cache) -> Optional[HistoryStep]:
+        """Revert last entry on cache; None when there is nothing to undo or reverting failed"""
+        if not self._undo:
+            return None
+        entry = self._undo.pop()
+        self._op_count -= len(entry.ops)
+        step = self._apply(cache, entry, reversed(entry.ops), True, entry.before)
+        if step is not None:
+            self._redo.append(entry)
+        return step
+
+    def redo(self, cache) -> Optional[HistoryStep]:
+        """Reapply last undone entry on cache"""
+        if not self._redo:
+            return None
+        entry = self._redo.pop()
+        step = self._apply(cache, entry, entry.ops, False, entry.after)
+        if step is not None:
+            self._undo.append(entry)
+            self._op_count += len(entry.ops)
+        return step
+
+    def _apply(self, cache, entry: HistoryEntry, ops: Iterable[EditOp], undo: bool,
+               selection: Selection) -> Optional[HistoryStep]:
+        scopes = [op.scope for op in entry.ops]
+        current = project(cache, scopes)
+        try:
+            with self.suspended():
+                for op in ops:
+                    if undo:
+                        op.undo(cache)
+                    else:
+                        op.redo(cache)
+                cache.restore_selection(selection)
+        except Exception as e:
+            AppLogger.error(f"Edit history no longer matches the show, cleared: {e}")
+            self.clear()
+            return None
+        return HistoryStep(entry, diff_states(current, project(cache, scopes)))
+
+
+def project(cache, scopes: Iterable[Optional[EntityPath]]) -> Dict[str, Any]:
+    """Export show in export_to_dict format with segments only where scopes reach
+
+    Every scene keeps its header and palettes, and scenes a scope reaches
+    keep all effect IDs, so diff_states sees the IDs a backend would assign.
+    Segment data is exported for covered effects and segments only, which
+    keeps planning a parameter undo independent of the show's size. Palettes
+    are copied since palette operations change them in place.
+    """
+    paths = {scope for scope in scopes if scope is not None}
+    covered = [path for path in paths if not any(path[:depth] in paths for depth in range(1, len(path)))]
+    by_scene: Dict[int, List[EntityPath]] = {}
+    for path in covered:
+        by_scene.setdefault(path[0], []).append(path)
+
+    scenes = []
+    for scene_id in cache.get_scene_ids():
+        scene = cache.get_scene(scene_id)
+        scene_paths = by_scene.get(scene_id, [])
+        if (scene_id,) in scene_paths:
+            scenes.append(dict(scene.to_dict(), palettes=[list(palette) for palette in scene.palettes]))
+            continue
+        effects = []
+        if scene_paths:
+            for effect in scene.effects:
+                effects.append(_project_effect(effect, [path for path in scene_paths if path[1] == effect.effect_id]))
+        scenes.append({
+            'scene_id': scene.scene_id,
+            'led_count': scene.led_count,
+            'fps': scene.fps,
+            'current_effect_id': scene.current_effect_id,
+            'current_palette_id': scene.current_palette_id,
+            'palettes': [list(palette) for palette in scene.palettes],
+            'effects': effects
+        })
+
+    return {
+        'scenes': scenes,
+        'current_scene_id': cache.current_scene_id,
+        'current_effect_id': cache.current_effect_id,
+        'current_palette_id': cache.current_palette_id
+    }
+
+
+def _project_effect(effect: Effect, paths: List[EntityPath]) -> Dict[str, Any]:
+    if any(len(path) == 2 for path in paths):
+        return effect.to_dict()
+    segments = {}
+    for seg_id in sorted(str(path[2]) for path in paths):
+        segment = effect.get_segment(seg_id)
+        if segment is not None:
+            segments[seg_id] = segment.to_dict()
+    return {'effect_id': effect.effect_id, 'segments': segments}
@@ -0,0 +1,407 @@
+import json
+import random
+import socket
+import time
+from collections import OrderedDict
+from threading import Lock, Thread
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from pythonosc.osc_packet import OscPacket, ParseError
+from utils.logger import AppLogger
+from .data_cache import DataCacheService
+from .osc_bundle import build_message
+from .osc_reliable import ACK_ADDRESS, SEQUENCE_ADDRESS, ReorderBuffer
+from .osc_transport import CORRELATION_ADDRESS
+from .state_diff import DEFAULT_PALETTE, new_scene_dict
+from .state_hash import STATE_HASH_ADDRESS
+from .state_stream import QUERY_CHUNKED_ADDRESS, RESEND_ADDRESS, STATE_CHUNK_ADDRESS, chunk_stream, encode_state_records
+
+
+MAX_RETAINED_TRANSFERS = 4
+
+
+class CommandError(Exception):
+    """Command could not be applied to engine state"""
+
+
+class MockPlaybackEngine:
+    """Local stand-in for the LED playback engine speaking the documented OSC protocol
+
+    Applies every command to its own DataCacheService and answers with
+    `/response/success|error|state`, echoing correlation ids as described in
+    docs/osc_command_20250805.md. Real-time palette updates are only answered
+    when correlated. With render enabled a background thread renders the
+    current effect at scene fps. Binding port 0 picks a free port.
+    chunk_loss drops that fraction of first-time state chunks and
+    packet_loss that fraction of incoming packets and outgoing acks, so
+    clients' resend handling can be exercised. Sequenced commands are applied
+    once, in sequence order per session, and acked when applied, however
+    often and in whatever order they arrive.
+    """
+
+    def __init__(self, ip: str = "127.0.0.1", port: int = 8001, reply_address: Optional[Tuple[str, int]] = None, render: bool = False,
+                 chunk_loss: float = 0.0, packet_loss: float = 0.0, seed: Optional[int] = None):
+        self.ip = ip
+        self.port = port
+        self.reply_address = reply_address
+        self.render = render
+        self.chunk_loss = chunk_loss
+        self.packet_loss = packet_loss
+        self._sequenced = ReorderBuffer()
+        self._random = random.Random(seed)
+        self._transfers: "OrderedDict[int, List[bytes]]" = OrderedDict()
+
+        self.data_cache = DataCacheService()
+        self.master_brightness = 255
+        self.speed_percent = 100
+        self.dissolve_file: Optional[str] = None
+        self.dissolve_pattern: Optional[int] = None
+        self.solo: Dict[int, bool] = {}
+        self.mute: Dict[int, bool] = {}
+
+        self.commands_received = 0
+        self.errors = 0
+        self.address_counts: Dict[str, int] = {}
+        self.frames_rendered = 0
+        self.chunks_dropped = 0
+        self.packets_dropped = 0
+
+        self._lock = Lock()
+        self._socket: Optional[socket.socket] = None
+        self._threads: List[Thread] = []
+        self.is_running = False
+        self._handlers = self._build_handlers()
+
+    # ===== Lifecycle =====
+
+    def start(self) -> bool:
+        """Bind UDP socket and start receive (and render) threads"""
+        try:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+            self._socket.bind((self.ip, self.port))
+            self._socket.settimeout(0.1)
+            self.port = self._socket.getsockname()[1]
+            self.is_running = True
+
+            self._threads = [Thread(target=self._receive_loop, daemon=True)]
+            if self.render:
+                self._threads.append(Thread(target=self._render_loop, daemon=True))
+            for thread in self._threads:
+                thread.start()
+
+            AppLogger.success(f"Mock playback engine listening on {self.ip}:{self.port}")
+            return True
+        except Exception as e:
+            AppLogger.error(f"Failed to start mock playback engine: {e}")
+            return False
+
+    def stop(self):
+        """Stop threads and close socket"""
+        self.is_running = False
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        self._threads = []
+        if self._socket:
+            self._socket.close()
+            self._socket = None
+        AppLogger.info("Mock playback engine stopped")
+
+    def export_state(self) -> Dict[str, Any]:
+        """Get engine state in show JSON format"""
+        with self._lock:
+            return self.data_cache.export_to_dict()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get command and frame counters"""
+        with self._lock:
+            return {
+                'commands_received': self.commands_received,
+                'errors': self.errors,
+                'frames_rendered': self.frames_rendered,
+                'chunks_dropped': self.chunks_dropped,
+                'packets_dropped': self.packets_dropped,
+                'duplicates_suppressed': self._sequenced.duplicates,
+                'reordered': self._sequenced.reordered,
+                'by_address': dict(self.address_counts)
+            }
+
+    # ===== Packet Handling =====
+
+    def _receive_loop(self):
+        """Receive datagrams until stopped"""
+        while self.is_running:
+            try:
+                data, sender = self._socket.recvfrom(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            self.handle_packet(data, sender)
+
+    def handle_packet(self, data: bytes, sender: Tuple[str, int]):
+        """Apply every command in packet, replying to sender or configured reply address"""
+        try:
+            messages = [timed.message for timed in OscPacket(data).messages]
+        except ParseError as e:
+            AppLogger.warning(f"Mock engine dropped malformed packet: {e}")
+            return
+
+        if self._lose_packet():
+            return
+
+        correlation_id = None
+        for index, message in enumerate(messages):
+            if message.address == CORRELATION_ADDRESS:
+                correlation_id = message.params[0] if message.params else None
+                continue
+            if message.address == SEQUENCE_ADDRESS:
+                self._handle_sequenced(message.params, messages[index + 1:], correlation_id, sender)
+                return
+            for reply in self.handle_command(message.address, list(message.params), correlation_id):
+                self._reply(reply, sender)
+
+    def _handle_sequenced(self, header: List[Any], messages: list, correlation_id: Optional[int], sender: Tuple[str, int]):
+        """Apply sequenced commands that are now in order, acking each once applied"""
+        session_id, seq = header[:2]
+        base = header[2] if len(header) > 2 else None
+        with self._lock:
+            ready = self._sequenced.accept(session_id, seq, (messages, correlation_id), base)
+        if ready is None:
+            ready, acked = [], [seq]
+        else:
+            acked = [ready_seq for ready_seq, _ in ready]
+        for _, (commands, command_correlation_id) in ready:
+            for message in commands:
+                for reply in self.handle_command(message.address, list(message.params), command_correlation_id):
+                    self._reply(reply, sender)
+        for acked_seq in acked:
+            if not self._lose_packet():
+                self._reply((ACK_ADDRESS, [session_id, acked_seq]), sender)
+
+    def _lose_packet(self) -> bool:
+        """Decide whether to simulate losing a packet"""
+        if self.packet_loss and self._random.random() < self.packet_loss:
+            with self._lock:
+                self.packets_dropped += 1
+            return True
+        return False
+
+    def handle_command(self, address: str, args: List[Any], correlation_id: Optional[int] = None) -> List[Tuple[str, list]]:
+        """Apply single command, returning response messages"""
+        prefix = [correlation_id] if correlation_id is not None else []
+        with self._lock:
+            self.commands_received += 1
+            self.address_counts[address] = self.address_counts.get(address, 0) + 1
+            try:
+                if address.startswith("/palette/"):
+                    self._palette_color(address, args)
+                    return [("/response/success", prefix + [address])] if prefix else []
+
+                handler = self._handlers.get(address)
+                if handler is None:
+                    raise CommandError("unknown command")
+                result = handler(*args)
+            except (CommandError, TypeError, ValueError, IndexError) as e:
+                self.errors += 1
+                return [("/response/error", prefix + [address, str(e) or type(e).__name__])]
+
+        if address in (QUERY_CHUNKED_ADDRESS, RESEND_ADDRESS):
+            return result
+        if address.startswith("/query"):
+            return [("/response/state", prefix + [json.dumps(result)])]
+        return [("/response/success", prefix + [address] + ([] if result is None else [result]))]
+
+    def _reply(self, reply: Tuple[str, list], sender: Tuple[str, int]):
+        """Send response message"""
+        address, args = reply
+        try:
+            self._socket.sendto(build_message(address, args).dgram, self.reply_address or sender)
+        except OSError as e:
+            AppLogger.warning(f"Mock engine failed to reply {address}: {e}")
+
+    # ===== Rendering =====
+
+    def _render_loop(self):
+        """Render current effect at scene fps while running"""
+        from engine.renderer import FrameRenderer
+
+        renderer = None
+        start = time.perf_counter()
+        while self.is_running:
+            with self._lock:
+                scene = self.data_cache.get_current_scene()
+                if scene is not None:
+                    if renderer is None or renderer.scene is not scene:
+                        renderer = FrameRenderer(scene)
+                    renderer.render(scene.current_effect_id, time.perf_counter() - start)
+                    self.frames_rendered += 1
+                fps = scene.fps if scene else 30
+            time.sleep(1.0 / max(fps, 1))
+
+    # ===== Command Handlers =====
+
+    def _build_handlers(self) -> Dict[str, Callable]:
+        """Map OSC addresses to handlers"""
+        return {
+            "/ping": lambda: None,
+            "/load_json": self._load_json,
+            "/load_dissolve_json": self._load_dissolve_json,
+            "/set_dissolve_pattern": self._set_dissolve_pattern,
+            "/change_scene": lambda scene_id: self._check(self.data_cache.set_current_scene(int(scene_id))),
+            "/change_effect": lambda effect_id: self._check(self.data_cache.set_current_effect(int(effect_id))),
+            "/change_palette": lambda palette_id: self._check(self.data_cache.set_current_palette(int(palette_id))),
+            "/master_brightness": self._master_brightness,
+            "/set_speed_percent": self._set_speed_percent,
+            "/query_full_state": self.data_cache.export_to_dict,
+            "/query_current_state": self._current_state,
+            STATE_HASH_ADDRESS: self._query_state_hash,
+            QUERY_CHUNKED_ADDRESS: self._query_full_state_chunked,
+            RESEND_ADDRESS: self._resend_state_chunks,
+            "/create_scene": self._create_scene,
+            "/delete_scene": lambda scene_id: self._check(self.data_cache.delete_scene(int(scene_id))),
+            "/duplicate_scene": lambda source_id: self._check_id(self.data_cache.duplicate_scene(int(source_id))),
+            "/update_scene": self._update_scene,
+            "/create_effect": lambda: self._check_id(self.data_cache.create_effect()),
+            "/delete_effect": self._delete_effect,
+            "/duplicate_effect": lambda source_id: self._check_id(self.data_cache.duplicate_effect(int(source_id))),
+            "/create_palette": lambda: self._check_id(self.data_cache.create_palette([list(c) for c in DEFAULT_PALETTE])),
+            "/delete_palette": lambda palette_id: self._check(self.data_cache.delete_palette(int(palette_id))),
+            "/duplicate_palette": lambda source_id: self._check_id(self.data_cache.duplicate_palette(int(source_id))),
+            "/create_segment": lambda custom_id: self._check_id(self.data_cache.create_segment(custom_id=int(custom_id))),
+            "/delete_segment": lambda segment_id: self._check(self.data_cache.delete_segment(str(segment_id))),
+            "/duplicate_segment": lambda source_id: self._check_id(self.data_cache.duplicate_segment(str(source_id))),
+            "/reorder_segment": self._reorder_segment,
+            "/update_segment": self._update_segment,
+            "/create_dimmer": self._create_dimmer,
+            "/delete_dimmer": lambda segment_id, index: self._check(self.data_cache.delete_dimmer_element(str(segment_id), int(index))),
+            "/update_dimmer": self._update_dimmer,
+        }
+
+    @staticmethod
+    def _check(success: bool):
+        """Raise CommandError when cache operation failed"""
+        if not success:
+            raise CommandError("operation failed")
+
+    @staticmethod
+    def _check_id(new_id: Optional[int]) -> int:
+        """Return new ID, raising CommandError when cache operation failed"""
+        if new_id is None:
+            raise CommandError("operation failed")
+        return new_id
+
+    def _load_json(self, file_path: str):
+        try:
+            self.data_cache.load_from_file(file_path)
+        except Exception as e:
+            raise CommandError(str(e))
+
+    def _load_dissolve_json(self, file_path: str):
+        self.dissolve_file = file_path
+
+    def _set_dissolve_pattern(self, pattern_id: int):
+        self.dissolve_pattern = int(pattern_id)
+
+    def _master_brightness(self, brightness: int):
+        self.master_brightness = max(0, min(255, int(brightness)))
+
+    def _set_speed_percent(self, speed: int):
+        self.speed_percent = max(0, min(1023, int(speed)))
+
+    def _palette_color(self, address: str, args: List[Any]):
+        parts = address.strip("/").split("/")
+        palette_id = "ABCDE".index(parts[1]) if parts[1] in "ABCDE" else int(parts[1])
+        self._check(self.data_cache.update_palette_color(palette_id, int(parts[2]), [int(v) for v in args[:3]]))
+
+    def _query_state_hash(self, *path) -> Dict[str, Any]:
+        node = self.data_cache.get_state_hash_node(*[int(key) for key in path])
+        if node is None:
+            raise CommandError("path not found")
+        return node
+
+    def _query_full_state_chunked(self, transfer_id: int, chunk_size: int) -> List[Tuple[str, list]]:
+        if int(chunk_size) <= 0:
+            raise CommandError("chunk size must be positive")
+        chunks = chunk_stream(encode_state_records(self.data_cache), int(chunk_size))
+        self._transfers[int(transfer_id)] = chunks
+        while len(self._transfers) > MAX_RETAINED_TRANSFERS:
+            self._transfers.popitem(last=False)
+
+        replies = []
+        for seq in range(len(chunks)):
+            if self.chunk_loss and self._random.random() < self.chunk_loss:
+                self.chunks_dropped += 1
+                continue
+            replies.append(self._state_chunk(int(transfer_id), seq, chunks))
+        return replies
+
+    def _resend_state_chunks(self, transfer_id: int, *seqs) -> List[Tuple[str, list]]:
+        chunks = self._transfers.get(int(transfer_id))
+        if chunks is None:
+            raise CommandError("unknown transfer")
+        return [self._state_chunk(int(transfer_id), int(seq), chunks) for seq in seqs if 0 <= int(seq) < len(chunks)]
+
+    @staticmethod
+    def _state_chunk(transfer_id: int, seq: int, chunks: List[bytes]) -> Tuple[str, list]:
+        return (STATE_CHUNK_ADDRESS, [transfer_id, seq, len(chunks), chunks[seq]])
+
+    def _current_state(self) -> Dict[str, Any]:
+        effect = self.data_cache.get_current_effect()
+        return {
+            'scene_id': self.data_cache.current_scene_id,
+            'effect_id': self.data_cache.current_effect_id,
+            'palette_id': self.data_cache.current_palette_id,
+            'segment_ids': list(effect.get_segment_ids()) if effect else []
+        }
+
+    def _create_scene(self, led_count: int, fps: int) -> int:
+        return self._check_id(self.data_cache.create_scene(new_scene_dict(0, int(led_count), int(fps))))
+
+    def _update_scene(self, scene_id: int, param: str, value: Any):
+        if param not in ("led_count", "fps") or int(value) <= 0:
+            raise CommandError(f"invalid scene parameter {param}")
+        self._check(self.data_cache.update_scene(int(scene_id), {param: int(value)}))
+
+    def _delete_effect(self, effect_id: int):
+        scene = self.data_cache.get_current_scene()
+        if scene is None or len(scene.effects) <= 1:
+            raise CommandError("cannot delete last effect")
+        self._check(self.data_cache.delete_effect(int(effect_id)))
+
+    def _reorder_segment(self, segment_id: int, new_position: int):
+        effect = self.data_cache.get_current_effect()
+        if effect is None or str(segment_id) not in effect.segments:
+            raise CommandError("segment not found")
+        order = [seg_id for seg_id in effect.segments if seg_id != str(segment_id)]
+        order.insert(max(0, min(int(new_position), len(order))), str(segment_id))
+        self._check(self.data_cache.reorder_segments(order))
+
+    def _update_segment(self, segment_id: int, param: str, *values):
+        seg_id = str(segment_id)
+        if self.data_cache.get_segment(seg_id) is None:
+            raise CommandError("segment not found")
+
+        if param in ("solo", "mute"):
+            getattr(self, param)[int(segment_id)] = bool(values[0])
+            return
+        if param == "move_range":
+            update = ("move_range", [int(values[0]), int(values[1])])
+        elif param == "edge_reflect":
+            update = ("is_edge_reflect", bool(values[0]))
+        elif param in ("move_speed", "initial_position"):
+            update = (param, values[0])
+        elif param == "color_slot":
+            update = ("color", {"index": int(values[0]), "color_index": int(values[2])})
+        elif param == "transparency":
+            update = ("transparency", {"index": int(values[0]), "transparency": float(values[1])})
+        elif param == "length":
+            update = ("length", {"index": int(values[0]), "length": int(values[1])})
+        else:
+            raise CommandError(f"unknown segment parameter {param}")
+        self._check(self.data_cache.update_segment_parameter(seg_id, *update))
+
+    def _create_dimmer(self, segment_id: int, duration_ms: int, initial: int, final: int):
+        self._check(self.data_cache.add_dimmer_element(str(segment_id), [int(duration_ms), int(initial), int(final)]))
+
+    def _update_dimmer(self, segment_id: int, index: int, duration_ms: int, initial: int, final: int):
+        self._check(self.data_cache.update_dimmer_element(str(segment_id), int(index), [int(duration_ms), int(initial), int(final)]))
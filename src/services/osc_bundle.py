@@ -0,0 +1,48 @@
+from typing import Iterable, List, Optional, Tuple
+from pythonosc.osc_bundle import OscBundle
+from pythonosc.osc_bundle_builder import IMMEDIATELY, OscBundleBuilder
+from pythonosc.osc_message import OscMessage
+from pythonosc.osc_message_builder import OscMessageBuilder
+
+
+DEFAULT_MTU = 1472
+BUNDLE_HEADER_SIZE = 16
+ELEMENT_SIZE_PREFIX = 4
+
+Message = Tuple[str, tuple]
+
+
+def build_message(address: str, args: Iterable) -> OscMessage:
+    """Build OSC message, inferring argument types like SimpleUDPClient does"""
+    builder = OscMessageBuilder(address=address)
+    for arg in args:
+        builder.add_arg(arg)
+    return builder.build()
+
+
+def pack_bundles(messages: List[Message], timetag: Optional[float] = None, mtu: int = DEFAULT_MTU) -> List[OscBundle]:
+    """Pack messages into as few bundles as fit the UDP payload size, all sharing one timetag
+
+    timetag is seconds since the epoch (time.time()), or None to execute
+    immediately. A single message larger than mtu still gets its own bundle.
+    """
+    timestamp = IMMEDIATELY if timetag is None else timetag
+    bundles = []
+    builder = None
+    size = 0
+
+    for address, args in messages:
+        message = build_message(address, args)
+        element_size = ELEMENT_SIZE_PREFIX + message.size
+        if builder is not None and size + element_size > mtu:
+            bundles.append(builder.build())
+            builder = None
+        if builder is None:
+            builder = OscBundleBuilder(timestamp)
+            size = BUNDLE_HEADER_SIZE
+        builder.add_content(message)
+        size += element_size
+
+    if builder is not None:
+        bundles.append(builder.build())
+    return bundles
@@ -0,0 +1,149 @@
+import time
+from collections import OrderedDict
+from threading import Condition, Lock, Thread
+from typing import Any, Callable, Dict, Optional, Tuple
+from utils.logger import AppLogger
+
+
+CoalesceKey = Tuple[Any, ...]
+
+SLOT_PARAMS = ("color_slot", "transparency", "length")
+
+KEY_ARGS = {
+    "/update_segment": 2,
+    "/update_dimmer": 2,
+    "/update_scene": 2,
+}
+
+
+def coalesce_key(address: str, args: tuple) -> CoalesceKey:
+    """Get key identifying which parameter a message sets
+
+    Palette colors carry their target in the address; segment updates are keyed
+    by segment id and parameter, plus slot index for per-slot parameters.
+    """
+    lead = KEY_ARGS.get(address, 0)
+    if address == "/update_segment" and len(args) > 1 and args[1] in SLOT_PARAMS:
+        lead = 3
+    return (address,) + tuple(args[:lead])
+
+
+def supersede_key(address: str, args: tuple) -> Optional[CoalesceKey]:
+    """Get coalesce key of a real-time parameter update a later one makes redundant, None for other commands"""
+    if address.startswith("/palette/") or address in KEY_ARGS:
+        return coalesce_key(address, args)
+    return None
+
+
+class OSCCoalescer:
+    """Latest-value-wins send queue flushed at a bounded rate
+
+    Messages submitted for the same parameter before the next flush replace
+    each other, so the backend receives at most one update per parameter per
+    flush interval. Flushes are serialized, so a batch taken later is never
+    sent before one taken earlier.
+    """
+
+    def __init__(self, send: Callable[[str, tuple], bool], max_rate: float = 60.0):
+        self._send = send
+        self.max_rate = max_rate
+        self._pending: "OrderedDict[CoalesceKey, Tuple[str, tuple]]" = OrderedDict()
+        self._condition = Condition()
+        self._send_lock = Lock()
+        self._thread: Optional[Thread] = None
+        self._running = False
+        self._last_flush = 0.0
+        self.submitted = 0
+        self.coalesced = 0
+        self.sent = 0
+        self.failed = 0
+
+    def set_max_rate(self, max_rate: float):
+        """Set maximum flushes per second (e.g. scene fps)"""
+        with self._condition:
+            self.max_rate = max(max_rate, 1e-3)
+            self._condition.notify()
+
+    def submit(self, address: str, *args) -> bool:
+        """Queue message, replacing any pending message for the same parameter"""
+        key = coalesce_key(address, args)
+        with self._condition:
+            self.submitted += 1
+            if key in self._pending:
+                self.coalesced += 1
+            self._pending[key] = (address, args)
+            self._ensure_thread()
+            self._condition.notify()
+        return True
+
+    def flush(self) -> int:
+        """Send all pending messages now, returning number sent
+
+        Waits for a flush already in progress, so messages sent after this
+        returns go out after every update submitted before it.
+        """
+        with self._send_lock:
+            with self._condition:
+                batch = list(self._pending.values())
+                self._pending.clear()
+                self._last_flush = time.monotonic()
+
+            sent = 0
+            for address, args in batch:
+                if self._send(address, args):
+                    sent += 1
+            with self._condition:
+                self.sent += sent
+                self.failed += len(batch) - sent
+            return sent
+
+    def has_pending(self) -> bool:
+        """Check whether messages are waiting for next flush"""
+        with self._condition:
+            return bool(self._pending)
+
+    def _ensure_thread(self):
+        """Start flush thread on first submit"""
+        if self._thread is None or not self._thread.is_alive():
+            self._running = True
+            self._thread = Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        """Flush pending messages no more often than max_rate"""
+        while True:
+            with self._condition:
+                while self._running and not self._pending:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                delay = self._last_flush + 1.0 / self.max_rate - time.monotonic()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+            try:
+                self.flush()
+            except Exception as e:
+                AppLogger.error(f"Error flushing coalesced OSC messages: {e}")
+
+    def stop(self, flush: bool = True):
+        """Stop flush thread, optionally sending what is still pending"""
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if flush:
+            self.flush()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get submitted, coalesced (dropped), sent and failed message counters"""
+        with self._condition:
+            return {
+                'submitted': self.submitted,
+                'coalesced': self.coalesced,
+                'sent': self.sent,
+                'failed': self.failed,
+                'pending': len(self._pending)
+            }
@@ -0,0 +1,223 @@
+import socket
+from collections import deque
+from dataclasses import dataclass
+from threading import Condition, Thread
+from typing import Any, Deque, Dict, Hashable, List, Optional, Tuple
+from pythonosc.osc_bundle import OscBundle
+from pythonosc.osc_bundle_builder import OscBundleBuilder
+from pythonosc.osc_message import OscMessage
+from utils.logger import AppLogger
+from .osc_bundle import build_message
+from .osc_coalescer import CoalesceKey, supersede_key
+from .osc_stats import OSCStats
+from .osc_template import TemplateCache
+
+
+DEFAULT_QUEUE_SIZE = 4096
+DEFAULT_OVERFLOW_SIZE = 16384
+
+
+@dataclass
+class OSCTarget:
+    """Playback engine address, optionally driving only LEDs led_start..led_start+led_count-1 of the GUI strip"""
+
+    ip: str
+    port: int
+    name: Optional[str] = None
+    led_start: int = 0
+    led_count: Optional[int] = None
+
+    @property
+    def label(self) -> str:
+        return self.name or f"{self.ip}:{self.port}"
+
+    @property
+    def is_split(self) -> bool:
+        return self.led_start != 0 or self.led_count is not None
+
+
+def translate_args(address: str, args: tuple, target: OSCTarget) -> Optional[tuple]:
+    """Map LED positions in a command to target's part of the strip, or None if unchanged
+
+    Positions are shifted, not clipped, so segments moving across a boundary
+    leave one engine's strip and enter the next.
+    """
+    if address == "/update_segment" and len(args) >= 3:
+        if args[1] == "move_range" and len(args) >= 4:
+            return args[:2] + (args[2] - target.led_start, args[3] - target.led_start) + args[4:]
+        if args[1] == "initial_position":
+            return args[:2] + (args[2] - target.led_start,) + args[3:]
+    if target.led_count is not None:
+        if address == "/create_scene" and args:
+            return (target.led_count,) + args[1:]
+        if address == "/update_scene" and len(args) >= 3 and args[1] == "led_count":
+            return args[:2] + (target.led_count,) + args[3:]
+    return None
+
+
+class _TargetQueue:
+    """Send queue drained by one thread per target
+
+    When more than max_queue packets are waiting, the oldest parameter update
+    superseded by a newer one for the same parameter is dropped. Other
+    packets (structural and reliable commands) are kept in order in up to
+    max_overflow extra places and sent by the same thread. put never waits,
+    so a stalled target cannot hold up the caller or the other targets; past
+    the overflow the packet is reported as overflowed, and reliable commands
+    are resent when they stay unacknowledged.
+    """
+
+    def __init__(self, target: OSCTarget, max_queue: int, max_overflow: int = DEFAULT_OVERFLOW_SIZE):
+        self.target = target
+        self.address = (target.ip, target.port)
+        self.stats = OSCStats()
+        self.dropped = 0
+        self.overflowed = 0
+        self._queue: Deque[Tuple[str, bytes, Optional[CoalesceKey]]] = deque()
+        self._max_queue = max_queue
+        self._max_overflow = max_overflow
+        self._condition = Condition()
+        self._running = True
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._thread = Thread(target=self._run, name=f"osc-target-{target.label}", daemon=True)
+        self._thread.start()
+
+    def put(self, address: str, dgram: bytes, key: Optional[CoalesceKey] = None):
+        with self._condition:
+            if len(self._queue) >= self._max_queue and not self._drop_superseded(key):
+                if len(self._queue) >= self._max_queue + self._max_overflow:
+                    self.overflowed += 1
+                    AppLogger.error(f"OSC target {self.target.label} queue full, {address} not sent")
+                    return
+            self._queue.append((address, dgram, key))
+            self._condition.notify()
+
+    def _drop_superseded(self, key: Optional[CoalesceKey]) -> bool:
+        """Drop oldest queued update made redundant by key or a later queued update"""
+        later = {key} if key is not None else set()
+        superseded = None
+        for index in range(len(self._queue) - 1, -1, -1):
+            queued_key = self._queue[index][2]
+            if queued_key is None:
+                continue
+            if queued_key in later:
+                superseded = index
+            later.add(queued_key)
+        if superseded is None:
+            return False
+        del self._queue[superseded]
+        self.dropped += 1
+        return True
+
+    def queued(self) -> int:
+        with self._condition:
+            return len(self._queue)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._running and not self._queue:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                address, dgram, _ = self._queue.popleft()
+            self.stats.start_send(address)
+            try:
+                self._sock.sendto(dgram, self.address)
+                self.stats.record_send(address, len(dgram), started=True)
+            except OSError as e:
+                self.stats.record_error(address, started=True)
+                AppLogger.warning(f"OSC target {self.target.label} send failed: {e}")
+
+    def close(self, drain: bool = True):
+        with self._condition:
+            self._running = False
+            if not drain:
+                self._queue.clear()
+            self._condition.notify_all()
+        self._thread.join(timeout=1.0)
+        self._sock.close()
+
+
+class FanoutClient:
+    """OSC client sending every packet to several playback engines
+
+    Packets are encoded once and queued per target, so a slow or unreachable
+    engine only backs up its own queue. Commands carrying LED positions are
+    re-encoded for targets with an LED range. Offers the same send, send_fast
+    and close methods as TemplateUDPClient.
+    """
+
+    def __init__(self, targets: List[OSCTarget], max_queue: int = DEFAULT_QUEUE_SIZE,
+                 max_overflow: int = DEFAULT_OVERFLOW_SIZE):
+        if not targets:
+            raise ValueError("At least one OSC target is required")
+        self.targets = list(targets)
+        self._queues = [_TargetQueue(target, max_queue, max_overflow) for target in self.targets]
+        self.templates = TemplateCache()
+
+    def send(self, content, targets: Optional[List[Hashable]] = None):
+        """Queue built OscMessage or OscBundle for every target, or only those whose (ip, port) is in targets"""
+        if isinstance(content, OscMessage):
+            address, key = content.address, supersede_key(content.address, tuple(content.params))
+        else:
+            address, key = "#bundle", None
+        dgram = content.dgram
+        for queue in self._queues:
+            if targets is not None and queue.address not in targets:
+                continue
+            translated = self._translate_packet(content, queue.target) if queue.target.is_split else None
+            queue.put(address, dgram if translated is None else translated, key)
+
+    def send_fast(self, address: str, args: tuple) -> Optional[int]:
+        """Encode message once through the template cache and queue it for every target"""
+        dgram = self.templates.encode(address, args)
+        if dgram is None:
+            return None
+        key = supersede_key(address, args)
+        for queue in self._queues:
+            translated = translate_args(address, args, queue.target) if queue.target.is_split else None
+            queue.put(address, dgram if translated is None else build_message(address, translated).dgram, key)
+        return len(dgram)
+
+    def record_response(self, sender: Tuple[str, int], success: bool, args: List[Any]):
+        """Attribute backend response to the target it came from"""
+        for queue in self._queues:
+            if queue.address == tuple(sender[:2]):
+                queue.stats.record_response(success, args)
+                return
+
+    def close(self, drain: bool = True):
+        """Stop target threads, by default after sending what is queued"""
+        for queue in self._queues:
+            queue.close(drain)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-target traffic, latency, queue depth, superseded (dropped) and overflowed packet counters"""
+        stats = {}
+        for queue in self._queues:
+            target_stats = queue.stats.get_stats()
+            target_stats['queued'] = queue.queued()
+            target_stats['dropped'] = queue.dropped
+            target_stats['overflowed'] = queue.overflowed
+            stats[queue.target.label] = target_stats
+        return stats
+
+    def _translate_packet(self, content, target: OSCTarget) -> Optional[bytes]:
+        """Re-encode packet with target's LED positions, or None if nothing changes"""
+        if isinstance(content, OscMessage):
+            translated = translate_args(content.address, tuple(content.params), target)
+            return None if translated is None else build_message(content.address, translated).dgram
+
+        changed = False
+        builder = OscBundleBuilder(content.timestamp)
+        for element in content:
+            if isinstance(element, OscBundle):
+                dgram = self._translate_packet(element, target)
+                builder.add_content(element if dgram is None else OscBundle(dgram))
+            else:
+                translated = translate_args(element.address, tuple(element.params), target)
+                builder.add_content(element if translated is None else build_message(element.address, translated))
+                dgram = translated
+            changed = changed or dgram is not None
+        return builder.build().dgram if changed else None
@@ -0,0 +1,152 @@
+import socket
+import struct
+import time
+from threading import Lock, Thread
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Tuple
+from pythonosc.osc_server import BlockingOSCUDPServer
+from utils.logger import AppLogger
+
+
+LOG_MAGIC = b"OSCLOG1\0"
+OUTGOING = 0
+INCOMING = 1
+
+_HEADER = struct.Struct("<8sd")
+_RECORD = struct.Struct("<BQH")
+
+LogRecord = Tuple[int, float, bytes]
+
+
+class OSCRecorder:
+    """Append every OSC packet with its monotonic time to a binary log
+
+    The file starts with a magic and the wall-clock start time, followed by
+    records of direction byte, microseconds since start and packet length,
+    each followed by the raw datagram.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file: BinaryIO = open(path, "wb")
+        self._file.write(_HEADER.pack(LOG_MAGIC, time.time()))
+        self._start = time.monotonic()
+        self._lock = Lock()
+        self.records = 0
+        self.bytes = 0
+
+    def record(self, direction: int, dgram: bytes):
+        """Append packet sent (OUTGOING) or received (INCOMING) now"""
+        micros = int((time.monotonic() - self._start) * 1_000_000)
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(_RECORD.pack(direction, micros, len(dgram)))
+            self._file.write(dgram)
+            self.records += 1
+            self.bytes += len(dgram)
+
+    def close(self):
+        """Flush and close log file"""
+        with self._lock:
+            self._file.close()
+        AppLogger.info(f"OSC recording saved: {self.path} ({self.records} packets)")
+
+
+class RecordingOSCUDPServer(BlockingOSCUDPServer):
+    """OSC server passing every received datagram to an optional recorder before dispatch"""
+
+    recorder: Optional[OSCRecorder] = None
+
+    def verify_request(self, request, client_address) -> bool:
+        recorder = self.recorder
+        if recorder:
+            recorder.record(INCOMING, request[0])
+        return super().verify_request(request, client_address)
+
+
+def read_log(path: str) -> Iterator[LogRecord]:
+    """Yield (direction, seconds since start, datagram) for every record in log"""
+    with open(path, "rb") as log:
+        header = log.read(_HEADER.size)
+        if len(header) < _HEADER.size or _HEADER.unpack(header)[0] != LOG_MAGIC:
+            raise ValueError(f"{path} is not an OSC session log")
+        while True:
+            record = log.read(_RECORD.size)
+            if len(record) < _RECORD.size:
+                return
+            direction, micros, size = _RECORD.unpack(record)
+            dgram = log.read(size)
+            if len(dgram) < size:
+                return
+            yield direction, micros / 1_000_000, dgram
+
+
+def replay_log(path: str, address: Tuple[str, int], speed: float = 1.0, settle: float = 0.5) -> Dict[str, Any]:
+    """Send outgoing packets of a log to address, keeping recorded timing divided by speed
+
+    speed <= 0 sends as fast as possible. Responses are collected for settle
+    seconds after the last send; responses the recording got but the replay
+    did not are reported as dropped.
+    """
+    records = list(read_log(path))
+    outgoing = [(at, dgram) for direction, at, dgram in records if direction == OUTGOING]
+    recorded_responses = sum(1 for direction, _, _ in records if direction == INCOMING)
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("", 0))
+    sock.settimeout(0.05)
+    responses = [0]
+    receiving = [True]
+
+    def receive():
+        while receiving[0]:
+            try:
+                sock.recvfrom(65535)
+                responses[0] += 1
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+
+    receiver = Thread(target=receive, daemon=True)
+    receiver.start()
+
+    sent = sent_bytes = errors = 0
+    max_lag = 0.0
+    first = outgoing[0][0] if outgoing else 0.0
+    start = time.monotonic()
+    for at, dgram in outgoing:
+        if speed > 0:
+            due = start + (at - first) / speed
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                max_lag = max(max_lag, -delay)
+        try:
+            sock.sendto(dgram, address)
+            sent += 1
+            sent_bytes += len(dgram)
+        except OSError:
+            errors += 1
+    elapsed = time.monotonic() - start
+
+    time.sleep(settle)
+    receiving[0] = False
+    receiver.join(timeout=1.0)
+    sock.close()
+
+    recorded = outgoing[-1][0] - first if outgoing else 0.0
+    return {
+        'packets': sent,
+        'bytes': sent_bytes,
+        'send_errors': errors,
+        'elapsed_s': elapsed,
+        'recorded_s': recorded,
+        'packets_per_s': sent / elapsed if elapsed > 0 else 0.0,
+        'recorded_packets_per_s': len(outgoing) / recorded if recorded > 0 else 0.0,
+        'max_lag_ms': max_lag * 1000,
+        'responses': responses[0],
+        'recorded_responses': recorded_responses,
+        'dropped': max(0, recorded_responses - responses[0])
+    }
@@ -0,0 +1,263 @@
+import itertools
+import random
+import time
+from collections import OrderedDict
+from threading import Condition, Thread
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+from utils.logger import AppLogger
+from .osc_bundle import Message
+
+
+SEQUENCE_ADDRESS = "/reliable_seq"
+ACK_ADDRESS = "/ack"
+
+RELIABLE_ADDRESSES = frozenset({
+    "/load_json",
+    "/load_dissolve_json",
+    "/set_dissolve_pattern",
+    "/change_scene",
+    "/change_effect",
+    "/change_palette",
+    "/create_scene",
+    "/delete_scene",
+    "/duplicate_scene",
+    "/update_scene",
+    "/create_effect",
+    "/delete_effect",
+    "/duplicate_effect",
+    "/create_palette",
+    "/delete_palette",
+    "/duplicate_palette",
+    "/create_segment",
+    "/delete_segment",
+    "/duplicate_segment",
+    "/reorder_segment",
+    "/update_segment",
+    "/create_dimmer",
+    "/delete_dimmer",
+    "/update_dimmer",
+})
+
+
+class _Outstanding:
+    """Sent command waiting for the ack of every target in pending"""
+
+    __slots__ = ("address", "args", "deadline", "timeout", "attempts", "pending")
+
+    def __init__(self, address: str, args: tuple, deadline: float, timeout: float, pending: Set[Hashable]):
+        self.address = address
+        self.args = args
+        self.deadline = deadline
+        self.timeout = timeout
+        self.attempts = 1
+        self.pending = pending
+
+
+class ReliableSender:
+    """Retransmit structural commands until the backend acknowledges their sequence number
+
+    Each command is sent in a bundle led by `/reliable_seq <session> <seq>
+    <base>`, base being the lowest sequence number not yet acked or given up.
+    The backend applies each session's commands in sequence order, holding
+    ones that arrive early, answers `/ack <session> <seq>` once a command is
+    applied and ignores sequence numbers it has already applied, so
+    retransmits are safe for non-idempotent commands. Unacked commands are
+    resent with doubling timeout up to max_retries times, then dropped and
+    counted as failed; the next base tells the backend to stop waiting for them.
+
+    With several targets (see set_targets) every target must ack a command,
+    and retransmits go only to targets that have not. send is called with
+    the messages and the targets to send to, None meaning all of them.
+    """
+
+    def __init__(self, send: Callable[[List[Message], Optional[List[Hashable]]], bool], initial_timeout: float = 0.05,
+                 max_timeout: float = 1.0, max_retries: int = 6):
+        self._send = send
+        self.initial_timeout = initial_timeout
+        self.max_timeout = max_timeout
+        self.max_retries = max_retries
+        self.session_id = random.getrandbits(31)
+
+        self._seq = itertools.count(1)
+        self._outstanding: "OrderedDict[int, _Outstanding]" = OrderedDict()
+        self._targets: Tuple[Hashable, ...] = (None,)
+        self._condition = Condition()
+        self._thread: Optional[Thread] = None
+        self._running = False
+        self.sent = 0
+        self.acked = 0
+        self.retransmits = 0
+        self.failed = 0
+
+    def set_targets(self, targets: Optional[List[Hashable]]):
+        """Require an ack from each target address for commands sent from now on, or from one backend with None"""
+        with self._condition:
+            self._targets = tuple(targets) if targets else (None,)
+
+    def send(self, address: str, args: tuple) -> bool:
+        """Send command and keep it for retransmit until acked"""
+        with self._condition:
+            seq = next(self._seq)
+            self._outstanding[seq] = _Outstanding(address, args, time.monotonic() + self.initial_timeout,
+                                                  self.initial_timeout, set(self._targets))
+            base = next(iter(self._outstanding))
+            self.sent += 1
+            self._ensure_thread()
+            self._condition.notify()
+        return self._transmit(seq, base, address, args, None)
+
+    def acknowledge(self, session_id: int, seq: int, target: Hashable = None):
+        """Handle ack for a sequence number from target, the backend's address when there are several"""
+        if session_id != self.session_id:
+            return
+        with self._condition:
+            item = self._outstanding.get(seq)
+            if item is None:
+                return
+            if None in item.pending:
+                target = None
+            if target not in item.pending:
+                return
+            item.pending.discard(target)
+            if not item.pending:
+                del self._outstanding[seq]
+                self.acked += 1
+                self._condition.notify_all()
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every sent command is acked or given up, returning False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._outstanding:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            return True
+
+    def stop(self):
+        """Stop retransmit thread, abandoning unacked commands"""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get sent, acked, retransmitted, failed and outstanding command counters"""
+        with self._condition:
+            return {
+                'sent': self.sent,
+                'acked': self.acked,
+                'retransmits': self.retransmits,
+                'failed': self.failed,
+                'outstanding': len(self._outstanding)
+            }
+
+    def _transmit(self, seq: int, base: int, address: str, args: tuple, targets: Optional[List[Hashable]]) -> bool:
+        return self._send([(SEQUENCE_ADDRESS, (self.session_id, seq, base)), (address, args)], targets)
+
+    def _ensure_thread(self):
+        """Start retransmit thread on first send"""
+        if self._thread is None or not self._thread.is_alive():
+            self._running = True
+            self._thread = Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        """Resend commands whose ack is overdue"""
+        while True:
+            with self._condition:
+                while self._running and not self._outstanding:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                now = time.monotonic()
+                next_deadline = min(item.deadline for item in self._outstanding.values())
+                if next_deadline > now:
+                    self._condition.wait(next_deadline - now)
+                    continue
+                due = self._collect_due(now)
+            for seq, base, address, args, targets in due:
+                self._transmit(seq, base, address, args, targets)
+
+    def _collect_due(self, now: float) -> List[tuple]:
+        """Get overdue commands to resend, dropping those out of retries"""
+        due = []
+        for seq, item in list(self._outstanding.items()):
+            if item.deadline > now:
+                continue
+            if item.attempts > self.max_retries:
+                del self._outstanding[seq]
+                self.failed += 1
+                unacked = "" if None in item.pending else f" by {sorted(item.pending)}"
+                AppLogger.error(f"OSC command {item.address} {item.args} not acknowledged{unacked} after {item.attempts} attempts")
+                continue
+            item.attempts += 1
+            item.timeout = min(item.timeout * 2, self.max_timeout)
+            item.deadline = now + item.timeout
+            self.retransmits += 1
+            targets = None if None in item.pending else list(item.pending)
+            due.append((seq, item.address, item.args, targets))
+        if not self._outstanding:
+            self._condition.notify_all()
+        base = next(iter(self._outstanding), None)
+        return [(seq, base, address, args, targets) for seq, address, args, targets in due]
+
+
+class ReorderBuffer:
+    """Receiver-side buffer releasing each sender session's commands once, in sequence order
+
+    Sequence numbers start at 1 per session. Commands arriving ahead of a gap
+    are held until the missing ones arrive or the sender's base passes the
+    gap, meaning it gave up on them. If more than window commands are held,
+    the oldest gap is skipped.
+    """
+
+    def __init__(self, window: int = 4096):
+        self.window = window
+        self._next: Dict[int, int] = {}
+        self._held: Dict[int, Dict[int, Any]] = {}
+        self.duplicates = 0
+        self.reordered = 0
+        self.skipped = 0
+
+    def accept(self, session_id: int, seq: int, command: Any, base: Optional[int] = None) -> Optional[List[tuple]]:
+        """Record command, returning (seq, command) pairs now ready to apply in order
+
+        Returns None for a command already applied, which should be acked
+        again, and an empty list while the command waits for a gap to fill.
+        """
+        expected = self._next.get(session_id, 1)
+        held = self._held.setdefault(session_id, {})
+        if seq < expected:
+            self.duplicates += 1
+            return None
+        if seq in held:
+            self.duplicates += 1
+            return []
+        held[seq] = command
+        if seq != expected:
+            self.reordered += 1
+
+        ready = []
+        if base is not None and base > expected:
+            for missing in range(expected, base):
+                if missing in held:
+                    ready.append((missing, held.pop(missing)))
+                else:
+                    self.skipped += 1
+            expected = base
+        while held:
+            if expected not in held:
+                if len(held) <= self.window:
+                    break
+                oldest = min(held)
+                self.skipped += oldest - expected
+                AppLogger.warning(f"Reliable session {session_id} skipped commands {expected}..{oldest - 1} never received")
+                expected = oldest
+            ready.append((expected, held.pop(expected)))
+            expected += 1
+        self._next[session_id] = expected
+        return ready
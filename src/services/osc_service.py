@@ -1,10 +1,22 @@
-from pythonosc import udp_client
 from pythonosc.dispatcher import Dispatcher
-from pythonosc.osc.osc_server import BlockingOSCUDPServer
-from threading import Thread
+from contextlib import contextmanager
+from threading import Event, Lock, Thread, local
+import itertools
 import time
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple, Union
 from utils.logger import AppLogger
+from .data_cache import DataCacheService
+from .edit_history import HistoryStep
+from .osc_coalescer import OSCCoalescer
+from .osc_fanout import FanoutClient, OSCTarget
+from .osc_recorder import OUTGOING, OSCRecorder, RecordingOSCUDPServer
+from .osc_bundle import BUNDLE_HEADER_SIZE, DEFAULT_MTU, ELEMENT_SIZE_PREFIX, Message, build_message, pack_bundles
+from .osc_reliable import ACK_ADDRESS, RELIABLE_ADDRESSES, ReliableSender
+from .osc_stats import OSCStats
+from .osc_template import TemplateUDPClient, palette_address
+from .state_diff import diff_states
+from .state_hash import STATE_HASH_ADDRESS
+from .state_stream import DEFAULT_CHUNK_SIZE, QUERY_CHUNKED_ADDRESS, RESEND_ADDRESS, STATE_CHUNK_ADDRESS, StateTransfer
 
 
 class OSCService:
@@ -16,11 +28,26 @@ class OSCService:
         self.client_ip = client_ip
         self.client_port = client_port
         
-        self.client: Optional[udp_client.SimpleUDPClient] = None
-        self.server: Optional[BlockingOSCUDPServer] = None
+        self.client: Optional[Union[TemplateUDPClient, FanoutClient]] = None
+        self.targets: List[OSCTarget] = []
+        self.server: Optional[RecordingOSCUDPServer] = None
         self.server_thread: Optional[Thread] = None
         self.is_running = False
         
+        self.coalescer = OSCCoalescer(self._transmit)
+        self.mtu = DEFAULT_MTU
+        self._batch_state = local()
+        self.reliable: Optional[ReliableSender] = None
+        self.recorder: Optional[OSCRecorder] = None
+        
+        self.stats = OSCStats()
+        self._monitor_thread: Optional[Thread] = None
+        self._monitor_stop = Event()
+        
+        self._transfers: Dict[int, StateTransfer] = {}
+        self._transfer_ids = itertools.count(1)
+        self._transfers_lock = Lock()
+        
         self._setup_dispatcher()
         
     def _setup_dispatcher(self):
@@ -28,24 +55,42 @@ class OSCService:
         self.dispatcher = Dispatcher()
         
         # Response handlers
-        self.dispatcher.map("/response/success", self._handle_success_response)
-        self.dispatcher.map("/response/error", self._handle_error_response)
+        self.dispatcher.map("/response/success", self._handle_success_response, needs_reply_address=True)
+        self.dispatcher.map("/response/error", self._handle_error_response, needs_reply_address=True)
         self.dispatcher.map("/response/state", self._handle_state_response)
+        self.dispatcher.map(STATE_CHUNK_ADDRESS, self._handle_state_chunk)
+        self.dispatcher.map(ACK_ADDRESS, self._handle_ack, needs_reply_address=True)
         
     def start_client(self) -> bool:
         """Start OSC client for sending messages"""
         try:
-            self.client = udp_client.SimpleUDPClient(self.client_ip, self.client_port)
+            if self.targets:
+                self.client = FanoutClient(self.targets)
+                self._update_reliable_targets()
+                AppLogger.success(f"OSC client started: {', '.join(target.label for target in self.targets)}")
+                return True
+            self.client = TemplateUDPClient(self.client_ip, self.client_port)
+            self._update_reliable_targets()
             AppLogger.success(f"OSC client started: {self.client_ip}:{self.client_port}")
             return True
         except Exception as e:
             AppLogger.error(f"Failed to start OSC client: {e}")
             return False
             
+    def set_targets(self, targets: List[OSCTarget]) -> bool:
+        """Send to several playback engines instead of client_ip:client_port, or back to it with an empty list"""
+        self.targets = list(targets)
+        if self.client is None:
+            return True
+        self.client.close()
+        return self.start_client()
+            
     def start_server(self) -> bool:
         """Start OSC server for receiving responses"""
         try:
-            self.server = BlockingOSCUDPServer((self.server_ip, self.server_port), self.dispatcher)
+            self.server = RecordingOSCUDPServer((self.server_ip, self.server_port), self.dispatcher)
+            self.server.recorder = self.recorder
+            self.server_port = self.server.server_address[1]
             self.server_thread = Thread(target=self._run_server, daemon=True)
             self.server_thread.start()
             self.is_running = True
@@ -65,6 +110,15 @@ class OSCService:
     def stop(self):
         """Stop OSC client and server"""
         self.is_running = False
+        self.coalescer.stop()
+        if self.reliable:
+            self.reliable.stop()
+        with self._transfers_lock:
+            transfers = list(self._transfers.values())
+        for transfer in transfers:
+            self._end_transfer(transfer, "OSC service stopped")
+        self.stop_monitoring()
+        self.stop_recording()
         
         if self.server:
             self.server.shutdown()
@@ -74,6 +128,8 @@ class OSCService:
             self.server_thread.join(timeout=1.0)
             self.server_thread = None
             
+        if self.client:
+            self.client.close()
         self.client = None
         AppLogger.info("OSC service stopped")
         
@@ -111,8 +167,7 @@ class OSCService:
         g = max(0, min(255, g))
         b = max(0, min(255, b))
         
-        address = f"/palette/{palette_id}/{color_index}"
-        return self._send_message(address, r, g, b)
+        return self.send_coalesced(palette_address(palette_id, color_index), r, g, b)
         
     # ===== Scene Management Commands =====
         
@@ -206,27 +261,249 @@ class OSCService:
         """Send query current state command"""
         return self._send_message("/query_current_state")
         
+    def send_query_state_hash(self, *path: int) -> bool:
+        """Send query for content hashes of show, scene or effect at path"""
+        return self._send_message(STATE_HASH_ADDRESS, *path)
+        
+    def query_full_state_chunked(self, data_cache, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Optional[StateTransfer]:
+        """Request full state as sequence-numbered chunks parsed into data_cache as they arrive
+
+        Returns the transfer; call its wait() (off the UI thread) to drive
+        resends of missing chunks until the show is loaded.
+        """
+        if not self.is_running:
+            AppLogger.warning("OSC server not running, cannot receive state chunks")
+            return None
+            
+        transfer_id = next(self._transfer_ids)
+        transfer = StateTransfer(transfer_id, data_cache, self._request_resend)
+        with self._transfers_lock:
+            self._transfers[transfer_id] = transfer
+        if not self._send_message(QUERY_CHUNKED_ADDRESS, transfer_id, chunk_size):
+            self._end_transfer(transfer, "request not sent")
+            return None
+        return transfer
+        
+    def sync_full_state(self, data_cache, timeout: float = 10.0, chunk_size: int = DEFAULT_CHUNK_SIZE) -> bool:
+        """Load backend show into data_cache over the chunked protocol, blocking until done"""
+        transfer = self.query_full_state_chunked(data_cache, chunk_size)
+        if transfer is None:
+            return False
+        success = transfer.wait(timeout)
+        self._end_transfer(transfer)
+        return success
+        
+    def sync_delta(self, data_cache, backend_state: Optional[Dict[str, Any]] = None, timeout: float = 10.0) -> bool:
+        """Bring backend in line with data_cache by sending only the commands that differ
+
+        backend_state is the backend's show in export_to_dict format; when
+        omitted it is fetched with the chunked full-state query. Returns False
+        if the backend cannot be converged incrementally, in which case the
+        caller should fall back to send_load_json.
+        """
+        if backend_state is None:
+            snapshot = DataCacheService()
+            if not self.sync_full_state(snapshot, timeout):
+                return False
+            backend_state = snapshot.export_to_dict()
+            
+        commands = diff_states(backend_state, data_cache.export_to_dict())
+        if commands is None:
+            AppLogger.warning("Backend state cannot be synced incrementally, full reload required")
+            return False
+        AppLogger.info(f"Delta sync: {len(commands)} commands")
+        return self.send_bundle(commands)
+        
+    def send_history_step(self, step: Optional[HistoryStep], data_cache) -> bool:
+        """Replay a data_cache.undo() or redo() on the backend
+
+        Falls back to a delta sync against the backend's reported state when
+        the step cannot be expressed as incremental commands.
+        """
+        if step is None:
+            return False
+        if step.commands is None:
+            return self.sync_delta(data_cache)
+        return self.send_bundle(step.commands)
+        
+    def _request_resend(self, transfer_id: int, seqs: List[int]) -> bool:
+        """Ask backend to resend missing chunks of a transfer"""
+        return self._send_message(RESEND_ADDRESS, transfer_id, *seqs)
+        
+    def _end_transfer(self, transfer: StateTransfer, reason: str = "cancelled"):
+        """Stop tracking transfer, cancelling it if still running"""
+        transfer.cancel(reason)
+        with self._transfers_lock:
+            self._transfers.pop(transfer.transfer_id, None)
+        
     # ===== Helper Methods =====
         
     def _send_message(self, address: str, *args) -> bool:
+        """Send OSC message immediately, after any pending or in-flight coalesced updates"""
+        self.coalescer.flush()
+        if self.reliable and address in RELIABLE_ADDRESSES and getattr(self._batch_state, 'messages', None) is None:
+            return self.reliable.send(address, args)
+        return self._transmit(address, args)
+        
+    def set_reliable_delivery(self, enabled: bool, **options) -> Optional[ReliableSender]:
+        """Turn acked, retransmitted delivery of structural commands on or off
+
+        Real-time updates sent with send_coalesced stay fire-and-forget.
+        options are passed to ReliableSender (initial_timeout, max_timeout,
+        max_retries).
+        """
+        if self.reliable:
+            self.reliable.stop()
+            self.reliable = None
+        if enabled:
+            self.reliable = ReliableSender(self._send_sequenced, **options)
+            self._update_reliable_targets()
+        return self.reliable
+        
+    def _update_reliable_targets(self):
+        """Have reliable delivery wait for an ack from each fan-out target"""
+        if self.reliable:
+            fanout = isinstance(self.client, FanoutClient)
+            self.reliable.set_targets([(target.ip, target.port) for target in self.targets] if fanout else None)
+        
+    def _send_sequenced(self, messages: List[Message], targets: Optional[List[Tuple[str, int]]] = None) -> bool:
+        """Send sequence header and command as one bundle to targets (default all), counting the header as overhead"""
+        if not self.client:
+            AppLogger.warning("OSC client not initialized")
+            return False
+            
+        address = messages[-1][0]
+        self.stats.start_send(address)
+        try:
+            bundle = pack_bundles(messages)[0]
+            self._send_packet(bundle, targets)
+            header, command = bundle.content(0), bundle.content(1)
+            self.stats.record_overhead(BUNDLE_HEADER_SIZE + ELEMENT_SIZE_PREFIX + header.size)
+            self.stats.record_send(command.address, ELEMENT_SIZE_PREFIX + command.size, started=True)
+            AppLogger.info(f"OSC sent reliably: {address} {messages[-1][1]}")
+            return True
+        except Exception as e:
+            self.stats.record_error(address, started=True)
+            AppLogger.error(f"Failed to send OSC message {address}: {e}")
+            return False
+        
+    def send_coalesced(self, address: str, *args) -> bool:
+        """Queue high-rate parameter update; only latest value per parameter is sent each flush"""
+        if not self.client:
+            AppLogger.warning("OSC client not initialized")
+            return False
+        if getattr(self._batch_state, 'messages', None) is not None:
+            return self._send_message(address, *args)
+        return self.coalescer.submit(address, *args)
+        
+    def set_max_send_rate(self, rate: float):
+        """Set maximum coalesced flushes per second, typically the scene fps"""
+        self.coalescer.set_max_rate(rate)
+        
+    def flush_pending(self) -> int:
+        """Send all queued coalesced updates now"""
+        return self.coalescer.flush()
+        
+    def get_coalescing_stats(self) -> Dict[str, int]:
+        """Get counters of coalesced (dropped) versus sent updates"""
+        return self.coalescer.get_stats()
+        
+    @contextmanager
+    def batch(self, timetag: Optional[float] = None):
+        """Collect messages sent by this thread and send them as bundles on exit
+
+        All bundles share timetag (seconds since epoch, None for immediate) so
+        the backend applies them on the same frame. Coalesced updates sent
+        inside the block go into the batch directly. Nested batches join the
+        outermost one; messages are discarded if the block raises.
+        """
+        if getattr(self._batch_state, 'messages', None) is not None:
+            yield
+            return
+            
+        self._batch_state.messages = []
+        try:
+            yield
+            messages = self._batch_state.messages
+        except Exception:
+            AppLogger.warning(f"OSC batch discarded: {len(self._batch_state.messages)} messages")
+            raise
+        finally:
+            self._batch_state.messages = None
+            
+        self.send_bundle(messages, timetag)
+        
+    def send_bundle(self, messages: List[Message], timetag: Optional[float] = None) -> bool:
+        """Send (address, args) messages as MTU-sized bundles sharing one timetag"""
+        if not messages:
+            return True
+        if not self.client:
+            AppLogger.warning("OSC client not initialized")
+            return False
+            
+        sent = started = 0
+        try:
+            bundles = pack_bundles(messages, timetag, self.mtu)
+            for bundle in bundles:
+                for message in bundle:
+                    self.stats.start_send(message.address)
+                    started += 1
+                self._send_packet(bundle)
+                self.stats.record_overhead(BUNDLE_HEADER_SIZE)
+                for message in bundle:
+                    self.stats.record_send(message.address, ELEMENT_SIZE_PREFIX + message.size, started=True)
+                    sent += 1
+            
+            AppLogger.info(f"OSC sent: {len(messages)} messages in {len(bundles)} bundles")
+            return True
+            
+        except Exception as e:
+            for index, (address, _) in enumerate(messages[sent:], sent):
+                self.stats.record_error(address, started=index < started)
+            AppLogger.error(f"Failed to send OSC bundle: {e}")
+            return False
+        
+    def _transmit(self, address: str, args: tuple) -> bool:
         """Send OSC message with error handling"""
+        batch = getattr(self._batch_state, 'messages', None)
+        if batch is not None:
+            batch.append((address, tuple(args)))
+            return True
+            
         if not self.client:
             AppLogger.warning("OSC client not initialized")
             return False
             
+        self.stats.start_send(address)
         try:
-            if args:
-                self.client.send_message(address, args)
-            else:
-                self.client.send_message(address, [])
+            send_fast = None if self.recorder else getattr(self.client, 'send_fast', None)
+            size = send_fast(address, args) if send_fast else None
+            if size is None:
+                message = build_message(address, args)
+                self._send_packet(message)
+                size = message.size
+            self.stats.record_send(address, size, started=True)
             
             AppLogger.info(f"OSC sent: {address} {args}")
             return True
             
         except Exception as e:
+            self.stats.record_error(address, started=True)
             AppLogger.error(f"Failed to send OSC message {address}: {e}")
             return False
             
+    def _send_packet(self, content, targets: Optional[List[Tuple[str, int]]] = None):
+        """Send built message or bundle, appending it to the session recording if one is running
+
+        targets limits a fan-out client to some of its engines.
+        """
+        if targets is None:
+            self.client.send(content)
+        else:
+            self.client.send(content, targets)
+        if self.recorder:
+            self.recorder.record(OUTGOING, content.dgram)
+            
     def ping_backend(self) -> bool:
         """Ping backend to check connection"""
         return self._send_message("/ping")
@@ -235,20 +512,116 @@ class OSCService:
         """Check if OSC service is connected"""
         return self.client is not None and self.is_running
         
+    # ===== Session Recording =====
+        
+    def start_recording(self, path: str) -> bool:
+        """Record every sent packet and received response to a session log for replay.py
+
+        Messages skip the template fast path while recording so the exact
+        datagram can be logged.
+        """
+        self.stop_recording()
+        try:
+            self.recorder = OSCRecorder(path)
+        except OSError as e:
+            AppLogger.error(f"Failed to start OSC recording: {e}")
+            return False
+        if self.server:
+            self.server.recorder = self.recorder
+        AppLogger.info(f"OSC recording started: {path}")
+        return True
+        
+    def stop_recording(self):
+        """Stop session recording and close its log"""
+        recorder, self.recorder = self.recorder, None
+        if self.server:
+            self.server.recorder = None
+        if recorder:
+            recorder.close()
+        
+    # ===== Statistics =====
+        
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-address counters, bytes, send errors, latency percentiles and coalescing counters"""
+        stats = self.stats.get_stats()
+        stats['coalescing'] = self.coalescer.get_stats()
+        if self.reliable:
+            stats['reliable'] = self.reliable.get_stats()
+        if isinstance(self.client, FanoutClient):
+            stats['targets'] = self.client.get_stats()
+        return stats
+        
+    def reset_stats(self):
+        """Clear traffic counters and latency histograms"""
+        self.stats.reset()
+        
+    def start_monitoring(self, dump_interval: Optional[float] = 10.0, ping_interval: Optional[float] = None) -> bool:
+        """Start background thread logging stats every dump_interval and pinging backend every ping_interval seconds"""
+        if self._monitor_thread and self._monitor_thread.is_alive():
+            return False
+        self._monitor_stop.clear()
+        self._monitor_thread = Thread(target=self._run_monitor, args=(dump_interval, ping_interval), daemon=True)
+        self._monitor_thread.start()
+        return True
+        
+    def stop_monitoring(self):
+        """Stop periodic stats dump and pings"""
+        self._monitor_stop.set()
+        if self._monitor_thread:
+            self._monitor_thread.join(timeout=1.0)
+            self._monitor_thread = None
+            
+    def _run_monitor(self, dump_interval: Optional[float], ping_interval: Optional[float]):
+        """Ping backend and dump stats on their intervals until stopped"""
+        next_dump = time.monotonic() + dump_interval if dump_interval else None
+        next_ping = time.monotonic() if ping_interval else None
+        while True:
+            deadlines = [deadline for deadline in (next_dump, next_ping) if deadline is not None]
+            if not deadlines or self._monitor_stop.wait(max(0.0, min(deadlines) - time.monotonic())):
+                return
+            now = time.monotonic()
+            if next_ping is not None and now >= next_ping:
+                self.ping_backend()
+                next_ping = now + ping_interval
+            if next_dump is not None and now >= next_dump:
+                AppLogger.info(self.stats.format_summary())
+                next_dump = now + dump_interval
+        
     # ===== Response Handlers =====
         
-    def _handle_success_response(self, address: str, *args):
+    def _handle_success_response(self, sender, address: str, *args):
         """Handle success response from backend"""
+        self.stats.record_response(True, list(args))
+        if isinstance(self.client, FanoutClient):
+            self.client.record_response(sender, True, list(args))
         AppLogger.success(f"Backend response: {address} - {args}")
         
-    def _handle_error_response(self, address: str, *args):
+    def _handle_error_response(self, sender, address: str, *args):
         """Handle error response from backend"""
+        self.stats.record_response(False, list(args))
+        if isinstance(self.client, FanoutClient):
+            self.client.record_response(sender, False, list(args))
         AppLogger.error(f"Backend error: {address} - {args}")
         
     def _handle_state_response(self, address: str, *args):
         """Handle state response from backend"""
         AppLogger.info(f"Backend state: {address} - {args}")
         
+    def _handle_ack(self, sender, address: str, session_id: int, seq: int):
+        """Handle backend ack of a reliably sent command, counting it only for the target that sent it"""
+        if self.reliable:
+            self.reliable.acknowledge(session_id, seq, tuple(sender[:2]))
+        
+    def _handle_state_chunk(self, address: str, transfer_id: int, seq: int, total: int, payload: bytes):
+        """Handle one chunk of a streamed full-state transfer"""
+        with self._transfers_lock:
+            transfer = self._transfers.get(transfer_id)
+        if transfer is None:
+            return
+        if transfer.handle_chunk(seq, total, payload):
+            with self._transfers_lock:
+                self._transfers.pop(transfer_id, None)
+        
     # ===== Convenience Methods =====
         
     def send_segment_color_slot_update(self, segment_id: int, slot_index: int, palette_id: int, color_index: int) -> bool:
@@ -257,7 +630,7 @@ class OSCService:
         
     def send_segment_transparency_update(self, segment_id: int, slot_index: int, transparency_value: float) -> bool:
         """Send segment transparency update command"""
-        return self.send_update_segment(segment_id, "transparency", slot_index, transparency_value)
+        return self.send_coalesced("/update_segment", segment_id, "transparency", slot_index, transparency_value)
         
     def send_segment_length_update(self, segment_id: int, slot_index: int, led_count: int) -> bool:
         """Send segment length update command"""
@@ -269,7 +642,7 @@ class OSCService:
         
     def send_segment_move_speed_update(self, segment_id: int, speed: float) -> bool:
         """Send segment move speed update command"""
-        return self.send_update_segment(segment_id, "move_speed", speed)
+        return self.send_coalesced("/update_segment", segment_id, "move_speed", speed)
         
     def send_segment_initial_position_update(self, segment_id: int, position: int) -> bool:
         """Send segment initial position update command"""
@@ -0,0 +1,226 @@
+import re
+import time
+from collections import deque
+from threading import Lock
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from .osc_transport import DEFAULT_TIMEOUT
+
+
+PALETTE_ADDRESS = re.compile(r"^/palette/[^/]+/[^/]+$")
+MAX_TRACKED_SENDS = 4096
+
+
+def address_family(address: str) -> str:
+    """Collapse per-palette real-time addresses into one stats key"""
+    if PALETTE_ADDRESS.match(address):
+        return "/palette/{palette_id}/{color_index}"
+    return address
+
+
+class LatencyHistogram:
+    """HDR-style log-linear histogram of latencies in microseconds
+
+    Values below 2**sub_bits are counted exactly; above that every power of two
+    is split into 2**(sub_bits - 1) buckets, keeping relative error under
+    1 / 2**(sub_bits - 1) with constant-time recording.
+    """
+
+    def __init__(self, sub_bits: int = 7, max_seconds: float = 60.0):
+        self.sub_bits = sub_bits
+        self.sub_count = 1 << sub_bits
+        self.half_count = self.sub_count >> 1
+        self.max_us = int(max_seconds * 1e6)
+        self.counts = [0] * (self._index(self.max_us) + 1)
+        self.total = 0
+        self.sum_us = 0
+        self.min_us: Optional[int] = None
+        self.max_seen_us = 0
+
+    def _index(self, value: int) -> int:
+        if value < self.sub_count:
+            return value
+        shift = value.bit_length() - self.sub_bits
+        return self.sub_count + (shift - 1) * self.half_count + ((value >> shift) - self.half_count)
+
+    def _value_at(self, index: int) -> float:
+        """Get midpoint of bucket in microseconds"""
+        if index < self.sub_count:
+            return float(index)
+        shift = (index - self.sub_count) // self.half_count + 1
+        base = ((index - self.sub_count) % self.half_count + self.half_count) << shift
+        return base + ((1 << shift) - 1) / 2.0
+
+    def record(self, seconds: float):
+        """Record one latency sample"""
+        value = min(max(int(seconds * 1e6), 0), self.max_us)
+        self.counts[self._index(value)] += 1
+        self.total += 1
+        self.sum_us += value
+        self.min_us = value if self.min_us is None else min(self.min_us, value)
+        self.max_seen_us = max(self.max_seen_us, value)
+
+    def percentile(self, percent: float) -> float:
+        """Get latency in milliseconds at given percentile (0-100)"""
+        if self.total == 0:
+            return 0.0
+        target = max(1, int(round(self.total * percent / 100.0)))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min(self._value_at(index), self.max_seen_us) / 1000.0
+        return self.max_seen_us / 1000.0
+
+    def to_dict(self) -> Dict[str, float]:
+        """Get sample count and summary latencies in milliseconds"""
+        return {
+            'count': self.total,
+            'min_ms': (self.min_us or 0) / 1000.0,
+            'mean_ms': self.sum_us / self.total / 1000.0 if self.total else 0.0,
+            'p50_ms': self.percentile(50),
+            'p90_ms': self.percentile(90),
+            'p99_ms': self.percentile(99),
+            'p999_ms': self.percentile(99.9),
+            'max_ms': self.max_seen_us / 1000.0
+        }
+
+
+class OSCStats:
+    """Thread-safe OSC traffic counters and edit-to-apply latency histograms
+
+    A response echoing the correlation id of a send completes that send.
+    Other send times are remembered per address, and a backend response
+    naming that address completes the oldest outstanding one. Sends left
+    without a response for timeout seconds are counted as lost, so a lost
+    response does not shift the latency of every later one.
+    """
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT):
+        self.timeout = timeout
+        self._lock = Lock()
+        self._clear()
+
+    def _clear(self):
+        self.started_at = time.monotonic()
+        self.addresses: Dict[str, Dict[str, int]] = {}
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.overall = LatencyHistogram()
+        self.responses = {'success': 0, 'error': 0, 'unmatched': 0, 'lost': 0}
+        self.overhead_bytes = 0
+        self._in_flight: Dict[str, Deque[float]] = {}
+        self._correlated: Dict[int, Tuple[str, float]] = {}
+
+    def reset(self):
+        """Clear all counters and histograms"""
+        with self._lock:
+            self._clear()
+
+    def _entry(self, family: str) -> Dict[str, int]:
+        entry = self.addresses.get(family)
+        if entry is None:
+            entry = self.addresses[family] = {'messages': 0, 'bytes': 0, 'errors': 0}
+        return entry
+
+    def start_send(self, address: str, correlation_id: Optional[int] = None):
+        """Remember send time of a message about to be sent, before its response can arrive"""
+        now = time.perf_counter()
+        with self._lock:
+            if correlation_id is not None:
+                self._correlated[correlation_id] = (address, now)
+                return
+            in_flight = self._in_flight.get(address)
+            if in_flight is None:
+                in_flight = self._in_flight[address] = deque(maxlen=MAX_TRACKED_SENDS)
+            in_flight.append(now)
+
+    def record_send(self, address: str, size: int, started: bool = False, correlation_id: Optional[int] = None):
+        """Count sent message and remember its send time unless start_send already did"""
+        if not started:
+            self.start_send(address, correlation_id)
+        with self._lock:
+            entry = self._entry(address_family(address))
+            entry['messages'] += 1
+            entry['bytes'] += size
+
+    def record_overhead(self, size: int):
+        """Count bytes not belonging to any message, such as bundle headers"""
+        with self._lock:
+            self.overhead_bytes += size
+
+    def record_error(self, address: str, started: bool = False, correlation_id: Optional[int] = None):
+        """Count failed send, forgetting the send time start_send remembered for it"""
+        with self._lock:
+            self._entry(address_family(address))['errors'] += 1
+            in_flight = self._in_flight.get(address)
+            if started and correlation_id is not None:
+                self._correlated.pop(correlation_id, None)
+            elif started and in_flight:
+                in_flight.pop()
+
+    def record_response(self, success: bool, args: List[Any]):
+        """Match backend response to the send with its correlation id, or else the oldest send of the command it names"""
+        now = time.perf_counter()
+        correlation_id = args[0] if args and isinstance(args[0], int) and not isinstance(args[0], bool) else None
+        command = next((arg for arg in args if isinstance(arg, str) and arg.startswith("/")), None)
+        with self._lock:
+            self.responses['success' if success else 'error'] += 1
+            self._expire(now)
+            if correlation_id in self._correlated:
+                command, sent_at = self._correlated.pop(correlation_id)
+            else:
+                in_flight = self._in_flight.get(command) if command else None
+                if not in_flight:
+                    self.responses['unmatched'] += 1
+                    return
+                sent_at = in_flight.popleft()
+            latency = now - sent_at
+            family = address_family(command)
+            histogram = self.latency.get(family)
+            if histogram is None:
+                histogram = self.latency[family] = LatencyHistogram()
+            histogram.record(latency)
+            self.overall.record(latency)
+
+    def _expire(self, now: float):
+        """Count sends outstanding for longer than timeout as lost"""
+        deadline = now - self.timeout
+        for in_flight in self._in_flight.values():
+            while in_flight and in_flight[0] < deadline:
+                in_flight.popleft()
+                self.responses['lost'] += 1
+        while self._correlated:
+            correlation_id, (_, sent_at) = next(iter(self._correlated.items()))
+            if sent_at >= deadline:
+                break
+            del self._correlated[correlation_id]
+            self.responses['lost'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get snapshot of counters, rates and latency percentiles"""
+        with self._lock:
+            self._expire(time.perf_counter())
+            elapsed = max(time.monotonic() - self.started_at, 1e-9)
+            messages = sum(entry['messages'] for entry in self.addresses.values())
+            sent_bytes = sum(entry['bytes'] for entry in self.addresses.values()) + self.overhead_bytes
+            return {
+                'elapsed_s': elapsed,
+                'messages_sent': messages,
+                'bytes_sent': sent_bytes,
+                'send_errors': sum(entry['errors'] for entry in self.addresses.values()),
+                'messages_per_s': messages / elapsed,
+                'responses': dict(self.responses),
+                'latency': self.overall.to_dict(),
+                'addresses': {
+                    family: dict(entry, latency=self.latency[family].to_dict()) if family in self.latency else dict(entry)
+                    for family, entry in self.addresses.items()
+                }
+            }
+
+    def format_summary(self) -> str:
+        """Get one-line summary for periodic logging"""
+        stats = self.get_stats()
+        latency = stats['latency']
+        return (f"OSC stats: {stats['messages_sent']} msgs ({stats['messages_per_s']:.1f}/s), "
+                f"{stats['bytes_sent']} bytes, {stats['send_errors']} errors, "
+                f"latency p50 {latency['p50_ms']:.2f} ms p99 {latency['p99_ms']:.2f} ms over {latency['count']} responses")
+
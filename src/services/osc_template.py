@@ -0,0 +1,147 @@
+import socket
+import struct
+from collections import OrderedDict
+from functools import lru_cache
+from threading import Lock
+from typing import Any, Optional, Tuple
+
+
+MAX_TEMPLATES = 512
+
+_INT32 = struct.Struct(">i")
+_FLOAT32 = struct.Struct(">f")
+
+TemplateKey = Tuple[Any, ...]
+
+
+def _pad(data: bytes) -> bytes:
+    """Null-terminate and pad to a multiple of 4 bytes as OSC strings require"""
+    return data + b"\0" * (4 - len(data) % 4)
+
+
+@lru_cache(maxsize=1024)
+def palette_address(palette_id: int, color_index: int) -> str:
+    """Get real-time palette color address without formatting it on every tick"""
+    return f"/palette/{palette_id}/{color_index}"
+
+
+def template_key(address: str, args: tuple) -> Optional[TemplateKey]:
+    """Get key of template that can encode args, or None if a type needs the generic builder
+
+    Ints and floats become patchable slots; strings and booleans are part of
+    the template since they change the encoded layout.
+    """
+    key = [address]
+    for arg in args:
+        kind = type(arg)
+        if kind is float:
+            key.append('f')
+        elif kind is int and -0x80000000 <= arg <= 0x7FFFFFFF:
+            key.append('i')
+        elif kind is str:
+            key.append(('s', arg))
+        elif kind is bool:
+            key.append('T' if arg else 'F')
+        else:
+            return None
+    return tuple(key)
+
+
+class MessageTemplate:
+    """OSC message pre-encoded once, with int and float argument bytes patched in place"""
+
+    def __init__(self, key: TemplateKey):
+        address, parts = key[0], key[1:]
+        tags = ","
+        payload = b""
+        slots = []
+        for index, part in enumerate(parts):
+            if isinstance(part, tuple):
+                tags += "s"
+                payload += _pad(part[1].encode("utf-8"))
+            elif part in ('T', 'F'):
+                tags += part
+            else:
+                tags += part
+                slots.append((index, len(payload), _INT32 if part == 'i' else _FLOAT32))
+                payload += b"\0\0\0\0"
+
+        header = _pad(address.encode("utf-8")) + _pad(tags.encode("ascii"))
+        self.buffer = bytearray(header + payload)
+        self.view = memoryview(self.buffer)
+        self.slots = [(index, len(header) + offset, packer) for index, offset, packer in slots]
+
+    def encode(self, args: tuple) -> memoryview:
+        """Write argument values into the shared buffer and return a view of it
+
+        The view is overwritten by the next encode, so send it before encoding
+        again.
+        """
+        for index, offset, packer in self.slots:
+            packer.pack_into(self.buffer, offset, args[index])
+        return self.view
+
+
+class TemplateCache:
+    """Bounded LRU cache of MessageTemplates"""
+
+    def __init__(self, max_templates: int = MAX_TEMPLATES):
+        self.max_templates = max_templates
+        self._templates: "OrderedDict[TemplateKey, MessageTemplate]" = OrderedDict()
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def encode_view(self, address: str, args: tuple) -> Optional[memoryview]:
+        """Encode into the template's shared buffer; caller must hold lock until the view is used"""
+        key = template_key(address, args)
+        if key is None:
+            return None
+        template = self._templates.get(key)
+        if template is None:
+            template = self._templates[key] = MessageTemplate(key)
+            self.misses += 1
+            if len(self._templates) > self.max_templates:
+                self._templates.popitem(last=False)
+        else:
+            self._templates.move_to_end(key)
+            self.hits += 1
+        return template.encode(args)
+
+    def encode(self, address: str, args: tuple) -> Optional[bytes]:
+        """Encode message into a new bytes object, or None if args need the generic builder"""
+        with self.lock:
+            view = self.encode_view(address, args)
+            return None if view is None else bytes(view)
+
+
+class TemplateUDPClient:
+    """UDP client sending every OSC packet through one persistent socket
+
+    `send` accepts built messages and bundles like SimpleUDPClient; `send_fast`
+    encodes through a TemplateCache and hands the reused buffer to sendto
+    without copying.
+    """
+
+    def __init__(self, address: str, port: int):
+        self.address = (address, port)
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.setblocking(False)
+        self.templates = TemplateCache()
+
+    def send(self, content) -> None:
+        """Send built OscMessage or OscBundle"""
+        self._sock.sendto(content.dgram, self.address)
+
+    def send_fast(self, address: str, args: tuple) -> Optional[int]:
+        """Send message via cached template, returning its size, or None if args need the generic path"""
+        with self.templates.lock:
+            view = self.templates.encode_view(address, args)
+            if view is None:
+                return None
+            self._sock.sendto(view, self.address)
+            return len(view)
+
+    def close(self):
+        """Close socket"""
+        self._sock.close()
@@ -0,0 +1,265 @@
+import asyncio
+import concurrent.futures
+import itertools
+import json
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from pythonosc.osc_packet import OscPacket, ParseError
+from utils.logger import AppLogger
+from .osc_bundle import build_message, pack_bundles
+from .state_hash import STATE_HASH_ADDRESS, Path, compare_nodes
+
+
+CORRELATION_ADDRESS = "/correlation_id"
+RESPONSE_ADDRESSES = ("/response/success", "/response/error", "/response/state")
+DEFAULT_TIMEOUT = 2.0
+FINISHED_ID_MEMORY = 1024
+
+
+class OSCResponseError(Exception):
+    """Backend answered a command with /response/error"""
+
+    def __init__(self, address: str, args: List[Any]):
+        super().__init__(f"{address} failed: {' '.join(str(arg) for arg in args)}")
+        self.address = address
+        self.args_received = args
+
+
+class _ResponseProtocol(asyncio.DatagramProtocol):
+    """Datagram protocol handing parsed OSC messages to transport"""
+
+    def __init__(self, on_message: Callable[[str, List[Any]], None]):
+        self.on_message = on_message
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]):
+        try:
+            for timed in OscPacket(data).messages:
+                self.on_message(timed.message.address, list(timed.message.params))
+        except ParseError as e:
+            AppLogger.warning(f"Dropped malformed OSC packet from {addr}: {e}")
+
+
+class AsyncOSCTransport:
+    """Asyncio OSC transport matching backend responses to the commands that caused them
+
+    Commands sent with `request` or `submit` go out as a bundle of
+    `/correlation_id <id>` followed by the command; the backend echoes the id
+    as first argument of `/response/success|error|state`. Responses without an
+    id resolve the oldest outstanding command; responses whose id is not
+    outstanding, e.g. late replies to timed out commands, are dropped. Run `start` on Flet's loop
+    (`page.run_task(osc_transport.start)`) and await requests from async
+    handlers, or use `submit_threadsafe` from sync ones.
+    """
+
+    def __init__(self, server_ip: str = "127.0.0.1", server_port: int = 8000, client_ip: str = "127.0.0.1", client_port: int = 8001, timeout: float = DEFAULT_TIMEOUT):
+        self.server_ip = server_ip
+        self.server_port = server_port
+        self.client_ip = client_ip
+        self.client_port = client_port
+        self.timeout = timeout
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._pending: "OrderedDict[int, Tuple[str, asyncio.Future, asyncio.TimerHandle]]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self._finished: "deque[int]" = deque(maxlen=FINISHED_ID_MEMORY)
+        self._handlers: Dict[str, Callable[[str, List[Any]], None]] = {}
+
+    @property
+    def is_running(self) -> bool:
+        return self._transport is not None
+
+    async def start(self) -> bool:
+        """Bind response socket on the running event loop"""
+        try:
+            self._loop = asyncio.get_running_loop()
+            self._transport, _ = await self._loop.create_datagram_endpoint(
+                lambda: _ResponseProtocol(self._on_message),
+                local_addr=(self.server_ip, self.server_port)
+            )
+            self.server_port = self._transport.get_extra_info('sockname')[1]
+            AppLogger.success(f"Async OSC transport started: {self.server_ip}:{self.server_port}")
+            return True
+        except Exception as e:
+            AppLogger.error(f"Failed to start async OSC transport: {e}")
+            return False
+
+    def stop(self):
+        """Close socket and fail all outstanding commands"""
+        if self._transport:
+            self._transport.close()
+            self._transport = None
+        for correlation_id, (address, future, timer) in self._pending.items():
+            timer.cancel()
+            if not future.done():
+                future.cancel()
+            self._finished.append(correlation_id)
+        self._pending.clear()
+        AppLogger.info("Async OSC transport stopped")
+
+    def map(self, address: str, handler: Callable[[str, List[Any]], None]):
+        """Register handler for unsolicited messages from backend"""
+        self._handlers[address] = handler
+
+    def send(self, address: str, *args) -> bool:
+        """Send command without waiting for a response"""
+        return self._sendto(build_message(address, args).dgram)
+
+    def submit(self, address: str, *args, timeout: Optional[float] = None) -> asyncio.Future:
+        """Send correlated command, returning future resolved with response arguments
+
+        The future raises OSCResponseError on /response/error and
+        asyncio.TimeoutError when no response arrives within timeout seconds.
+        Must be called from the transport's event loop.
+        """
+        future = self._loop.create_future()
+        correlation_id = next(self._ids)
+        timer = self._loop.call_later(timeout or self.timeout, self._expire, correlation_id)
+        self._pending[correlation_id] = (address, future, timer)
+
+        bundle = pack_bundles([(CORRELATION_ADDRESS, (correlation_id,)), (address, args)])[0]
+        if not self._sendto(bundle.dgram):
+            self._resolve(correlation_id, error=ConnectionError(f"Failed to send {address}"))
+        return future
+
+    async def request(self, address: str, *args, timeout: Optional[float] = None) -> List[Any]:
+        """Send correlated command and wait for its response arguments"""
+        return await self.submit(address, *args, timeout=timeout)
+
+    def submit_threadsafe(self, address: str, *args, timeout: Optional[float] = None) -> concurrent.futures.Future:
+        """Send correlated command from another thread, returning concurrent future"""
+        return asyncio.run_coroutine_threadsafe(self.request(address, *args, timeout=timeout), self._loop)
+
+    def pending_count(self) -> int:
+        """Get number of commands still waiting for a response"""
+        return len(self._pending)
+
+    # ===== Commands Returning New IDs =====
+
+    async def create_scene(self, led_count: int, fps: int) -> Optional[int]:
+        """Create scene and return ID assigned by backend"""
+        return self._new_id(await self.request("/create_scene", led_count, fps))
+
+    async def duplicate_scene(self, source_id: int) -> Optional[int]:
+        """Duplicate scene and return ID assigned by backend"""
+        return self._new_id(await self.request("/duplicate_scene", source_id))
+
+    async def create_effect(self) -> Optional[int]:
+        """Create effect and return ID assigned by backend"""
+        return self._new_id(await self.request("/create_effect"))
+
+    async def duplicate_effect(self, source_id: int) -> Optional[int]:
+        """Duplicate effect and return ID assigned by backend"""
+        return self._new_id(await self.request("/duplicate_effect", source_id))
+
+    async def create_palette(self) -> Optional[int]:
+        """Create palette and return ID assigned by backend"""
+        return self._new_id(await self.request("/create_palette"))
+
+    async def duplicate_palette(self, source_id: int) -> Optional[int]:
+        """Duplicate palette and return ID assigned by backend"""
+        return self._new_id(await self.request("/duplicate_palette", source_id))
+
+    async def duplicate_segment(self, source_id: int) -> Optional[int]:
+        """Duplicate segment and return ID assigned by backend"""
+        return self._new_id(await self.request("/duplicate_segment", source_id))
+
+    # ===== State Drift =====
+
+    async def find_state_drift(self, data_cache) -> List[Path]:
+        """Locate (scene_id, effect_id, segment_id) paths where backend and data_cache disagree
+
+        Walks the content hash tree one level per round trip, querying only
+        subtrees whose hashes differ, so a single changed segment is found in
+        three exchanges regardless of show size. An empty list means in sync.
+        """
+        divergent: List[Path] = []
+        level: List[Path] = [()]
+        while level:
+            replies = await asyncio.gather(*(self.request(STATE_HASH_ADDRESS, *path) for path in level), return_exceptions=True)
+            next_level: List[Path] = []
+            for path, reply in zip(level, replies):
+                if isinstance(reply, OSCResponseError):
+                    remote = None
+                elif isinstance(reply, BaseException):
+                    raise reply
+                else:
+                    remote = json.loads(reply[0])
+                found, descend = compare_nodes(path, data_cache.get_state_hash_node(*path), remote)
+                divergent += found
+                next_level += descend
+            level = next_level
+        return divergent
+
+    # ===== Helper Methods =====
+
+    @staticmethod
+    def _new_id(args: List[Any]) -> Optional[int]:
+        """Get new entity ID from success response arguments (last integer)"""
+        for arg in reversed(args):
+            if isinstance(arg, int) and not isinstance(arg, bool):
+                return arg
+        return None
+
+    def _sendto(self, dgram: bytes) -> bool:
+        """Send datagram to backend"""
+        if not self._transport:
+            AppLogger.warning("Async OSC transport not started")
+            return False
+        try:
+            self._transport.sendto(dgram, (self.client_ip, self.client_port))
+            return True
+        except Exception as e:
+            AppLogger.error(f"Failed to send OSC datagram: {e}")
+            return False
+
+    def _on_message(self, address: str, args: List[Any]):
+        """Route response to its outstanding command, everything else to mapped handlers"""
+        if address not in RESPONSE_ADDRESSES:
+            handler = self._handlers.get(address)
+            if handler:
+                handler(address, args)
+            return
+
+        if args and isinstance(args[0], int) and not isinstance(args[0], bool):
+            correlation_id, args = args[0], args[1:]
+            if correlation_id not in self._pending:
+                late = "late" if correlation_id in self._finished else "unknown"
+                AppLogger.warning(f"Dropped backend response with {late} correlation id {correlation_id}: {address} - {args}")
+                return
+        elif self._pending:
+            correlation_id = next(iter(self._pending))
+        else:
+            AppLogger.info(f"Uncorrelated backend response: {address} - {args}")
+            return
+
+        if address == "/response/error":
+            self._resolve(correlation_id, error=OSCResponseError(self._pending[correlation_id][0], args))
+        else:
+            self._resolve(correlation_id, result=args)
+
+    def _resolve(self, correlation_id: int, result: Any = None, error: Optional[BaseException] = None):
+        """Complete outstanding command"""
+        entry = self._pending.pop(correlation_id, None)
+        if entry is None:
+            return
+        _, future, timer = entry
+        timer.cancel()
+        if error is not None or future.done():
+            self._finished.append(correlation_id)
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _expire(self, correlation_id: int):
+        """Fail command whose response did not arrive in time"""
+        entry = self._pending.get(correlation_id)
+        if entry:
+            self._resolve(correlation_id, error=asyncio.TimeoutError(f"No response to {entry[0]}"))
+
+
+# Global instance
+osc_transport = AsyncOSCTransport()
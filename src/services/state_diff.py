@@ -0,0 +1,315 @@
+import copy
+from typing import Any, Dict, List, Optional
+from utils.logger import AppLogger
+from .osc_bundle import Message
+
+
+DEFAULT_PALETTE = [[0, 0, 0], [255, 0, 0], [255, 255, 0], [0, 0, 255], [0, 255, 0], [255, 255, 255]]
+
+
+def new_scene_dict(scene_id: int, led_count: int, fps: int) -> Dict[str, Any]:
+    """Scene a backend creates for `/create_scene`"""
+    return {
+        'scene_id': scene_id,
+        'led_count': led_count,
+        'fps': fps,
+        'current_effect_id': 0,
+        'current_palette_id': 0,
+        'palettes': [copy.deepcopy(DEFAULT_PALETTE)],
+        'effects': [{'effect_id': 0, 'segments': {}}]
+    }
+
+
+def new_segment_dict(segment_id: int) -> Dict[str, Any]:
+    """Segment a backend creates for `/create_segment`, matching DataCacheService.create_segment"""
+    return {
+        'segment_id': segment_id,
+        'color': [0, 1, 2],
+        'transparency': [1.0, 0.8, 0.6],
+        'length': [10, 15],
+        'move_speed': 100.0,
+        'move_range': [0, 249],
+        'initial_position': 0,
+        'current_position': 0.0,
+        'is_edge_reflect': True,
+        'region_id': 0,
+        'dimmer_time': [[1000, 0, 100], [1000, 100, 0]]
+    }
+
+
+class Unreachable(Exception):
+    """Target state cannot be reached with incremental OSC commands"""
+
+
+def diff_states(current: Dict[str, Any], target: Dict[str, Any]) -> Optional[List[Message]]:
+    """Get OSC commands that turn backend state current into target, both in export_to_dict format
+
+    Returns None when only a full reload can converge the two, e.g. when a
+    scene or effect ID the backend would assign differs from the target's.
+    Segment region_id and current_position have no OSC command and are not
+    compared.
+    """
+    try:
+        return StatePlanner(current, target).plan()
+    except Unreachable as e:
+        AppLogger.info(f"Delta sync not possible: {e}")
+        return None
+
+
+def diff_caches(current_cache, target_cache) -> Optional[List[Message]]:
+    """Get OSC commands that turn current_cache's show into target_cache's"""
+    return diff_states(current_cache.export_to_dict(), target_cache.export_to_dict())
+
+
+class StatePlanner:
+    """Plan commands against a model of the backend, tracking its current scene and effect
+
+    Scene-scoped commands act on whatever scene and effect the backend has
+    selected, so `/change_scene` and `/change_effect` are only emitted when the
+    next command needs a different one. After anything that leaves the
+    backend's selection ambiguous the cursor is reset so the next command
+    navigates explicitly.
+    """
+
+    def __init__(self, current: Dict[str, Any], target: Dict[str, Any]):
+        self.scenes = {scene['scene_id']: copy.deepcopy(scene) for scene in current.get('scenes', [])}
+        self.target = target
+        self.scene_id: Optional[int] = current.get('current_scene_id')
+        self.effect_id: Optional[int] = current.get('current_effect_id')
+        self.commands: List[Message] = []
+
+    def plan(self) -> List[Message]:
+        target_scenes = {scene['scene_id']: scene for scene in self.target.get('scenes', [])}
+        if not target_scenes:
+            raise Unreachable("target has no scenes")
+
+        for scene_id in sorted(set(self.scenes) - set(target_scenes), reverse=True):
+            self._emit("/delete_scene", scene_id)
+            del self.scenes[scene_id]
+            if scene_id == self.scene_id:
+                self._reset_cursor()
+
+        for scene_id in sorted(set(target_scenes) - set(self.scenes)):
+            scene = target_scenes[scene_id]
+            self._expect_id(scene_id, self.scenes, "scene")
+            self._emit("/create_scene", scene['led_count'], scene['fps'])
+            self.scenes[scene_id] = new_scene_dict(scene_id, scene['led_count'], scene['fps'])
+
+        for scene_id, scene in target_scenes.items():
+            self._diff_scene(self.scenes[scene_id], scene)
+
+        self._enter(self.target.get('current_scene_id', next(iter(target_scenes))))
+        current_effect_id = self.target.get('current_effect_id')
+        if current_effect_id is not None:
+            self._enter(self.scene_id, current_effect_id)
+        current_palette_id = self.target.get('current_palette_id')
+        if current_palette_id is not None and current_palette_id != self.scenes[self.scene_id]['current_palette_id']:
+            self._emit("/change_palette", current_palette_id)
+        return self.commands
+
+    # ===== Scenes =====
+
+    def _diff_scene(self, scene: Dict[str, Any], target: Dict[str, Any]):
+        scene_id = target['scene_id']
+        for param in ('led_count', 'fps'):
+            if scene[param] != target[param]:
+                self._emit("/update_scene", scene_id, param, target[param])
+                scene[param] = target[param]
+
+        self._diff_palettes(scene, target)
+
+        effects = {effect['effect_id']: effect for effect in scene['effects']}
+        target_effects = {effect['effect_id']: effect for effect in target['effects']}
+        removed = sorted(set(effects) - set(target_effects))
+        added = sorted(set(target_effects) - set(effects))
+        if added and len(removed) == len(effects):
+            # The backend refuses to delete its last effect
+            self._create_effects(scene, effects, added)
+            self._delete_effects(scene, effects, removed)
+        else:
+            self._delete_effects(scene, effects, removed)
+            self._create_effects(scene, effects, added)
+
+        for effect_id, effect in target_effects.items():
+            self._diff_segments(scene_id, effects[effect_id], effect, target['current_palette_id'])
+
+        if scene['current_effect_id'] != target['current_effect_id']:
+            self._enter(scene_id, target['current_effect_id'])
+        if scene['current_palette_id'] != target['current_palette_id']:
+            self._enter(scene_id)
+            self._emit("/change_palette", target['current_palette_id'])
+            scene['current_palette_id'] = target['current_palette_id']
+
+    def _diff_palettes(self, scene: Dict[str, Any], target: Dict[str, Any]):
+        palettes, target_palettes = scene['palettes'], target['palettes']
+        while len(palettes) > len(target_palettes):
+            self._enter(target['scene_id'])
+            self._emit("/delete_palette", len(palettes) - 1)
+            palettes.pop()
+            scene['current_palette_id'] = None
+        while len(palettes) < len(target_palettes):
+            self._enter(target['scene_id'])
+            self._emit("/create_palette")
+            palettes.append(copy.deepcopy(DEFAULT_PALETTE))
+
+        for palette_id, (palette, target_palette) in enumerate(zip(palettes, target_palettes)):
+            if len(palette) != len(target_palette):
+                raise Unreachable(f"palette {palette_id} of scene {target['scene_id']} changes size")
+            for color_index, (color, target_color) in enumerate(zip(palette, target_palette)):
+                if list(color) != list(target_color):
+                    self._enter(target['scene_id'])
+                    self._emit(f"/palette/{palette_id}/{color_index}", *target_color)
+                    palette[color_index] = list(target_color)
+
+    # ===== Effects =====
+
+    def _create_effects(self, scene: Dict[str, Any], effects: Dict[int, Dict[str, Any]], effect_ids: List[int]):
+        for effect_id in effect_ids:
+            self._expect_id(effect_id, effects, f"effect in scene {scene['scene_id']}")
+            self._enter(scene['scene_id'])
+            self._emit("/create_effect")
+            effects[effect_id] = {'effect_id': effect_id, 'segments': {}}
+
+    def _delete_effects(self, scene: Dict[str, Any], effects: Dict[int, Dict[str, Any]], effect_ids: List[int]):
+        for effect_id in effect_ids:
+            self._enter(scene['scene_id'])
+            self._emit("/delete_effect", effect_id)
+            del effects[effect_id]
+            if scene['current_effect_id'] == effect_id:
+                scene['current_effect_id'] = None
+            self._reset_cursor()
+
+    # ===== Segments =====
+
+    def _diff_segments(self, scene_id: int, effect: Dict[str, Any], target: Dict[str, Any], palette_id: int):
+        segments, target_segments = effect['segments'], target['segments']
+
+        for seg_id in [seg_id for seg_id in segments if seg_id not in target_segments]:
+            self._enter(scene_id, target['effect_id'])
+            self._emit("/delete_segment", int(seg_id))
+            del segments[seg_id]
+
+        for seg_id, target_segment in target_segments.items():
+            segment = segments.get(seg_id)
+            if segment is not None and len(segment['color']) > len(target_segment['color']):
+                self._enter(scene_id, target['effect_id'])
+                self._emit("/delete_segment", int(seg_id))
+                del segments[seg_id]
+                segment = None
+            if segment is None:
+                self._enter(scene_id, target['effect_id'])
+                self._emit("/create_segment", int(seg_id))
+                segment = segments[seg_id] = new_segment_dict(int(seg_id))
+                if len(segment['color']) > len(target_segment['color']):
+                    raise Unreachable(f"segment {seg_id} has fewer colors than a new segment")
+            for address, args in self._segment_updates(segment, target_segment, palette_id):
+                self._enter(scene_id, target['effect_id'])
+                self._emit(address, *args)
+
+        self._reorder_segments(scene_id, target['effect_id'], list(segments), list(target_segments))
+
+    def _segment_updates(self, segment: Dict[str, Any], target: Dict[str, Any], palette_id: int) -> List[Message]:
+        seg_id = target['segment_id']
+        updates = []
+        for index, color_index in enumerate(target['color']):
+            if index < len(segment['color']) and segment['color'][index] == color_index:
+                continue
+            updates.append(("/update_segment", (seg_id, "color_slot", index, palette_id, color_index)))
+            if index >= len(segment['color']):
+                segment['color'].extend([0] * (index + 1 - len(segment['color'])))
+                segment['transparency'].extend([1.0] * (index + 1 - len(segment['transparency'])))
+                segment['length'].extend([10] * (len(segment['color']) - 1 - len(segment['length'])))
+            segment['color'][index] = color_index
+
+        for param in ('transparency', 'length'):
+            for index, value in enumerate(target[param]):
+                if segment[param][index] != value:
+                    updates.append(("/update_segment", (seg_id, param, index, value)))
+
+        if list(segment['move_range']) != list(target['move_range']):
+            updates.append(("/update_segment", (seg_id, "move_range", *target['move_range'])))
+        if segment['move_speed'] != target['move_speed']:
+            updates.append(("/update_segment", (seg_id, "move_speed", float(target['move_speed']))))
+        if segment['initial_position'] != target['initial_position']:
+            updates.append(("/update_segment", (seg_id, "initial_position", target['initial_position'])))
+        if segment['is_edge_reflect'] != target['is_edge_reflect']:
+            updates.append(("/update_segment", (seg_id, "edge_reflect", 1 if target['is_edge_reflect'] else 0)))
+
+        dimmers, target_dimmers = segment['dimmer_time'], target['dimmer_time']
+        for index, element in enumerate(target_dimmers):
+            if index >= len(dimmers):
+                updates.append(("/create_dimmer", (seg_id, *element)))
+            elif list(dimmers[index]) != list(element):
+                updates.append(("/update_dimmer", (seg_id, index, *element)))
+        for index in range(len(dimmers) - 1, len(target_dimmers) - 1, -1):
+            updates.append(("/delete_dimmer", (seg_id, index)))
+        return updates
+
+    def _reorder_segments(self, scene_id: int, effect_id: int, order: List[str], target_order: List[str]):
+        """Move only segments outside the longest run already in target order"""
+        if order == target_order:
+            return
+        rank = {seg_id: index for index, seg_id in enumerate(target_order)}
+        keep = _longest_increasing(order, rank)
+        for index, seg_id in enumerate(target_order):
+            if seg_id in keep:
+                continue
+            order.remove(seg_id)
+            position = order.index(target_order[index - 1]) + 1 if index else 0
+            order.insert(position, seg_id)
+            self._enter(scene_id, effect_id)
+            self._emit("/reorder_segment", int(seg_id), position)
+
+    # ===== Helpers =====
+
+    def _enter(self, scene_id: int, effect_id: Optional[int] = None):
+        """Select scene (and effect) on the backend unless already selected"""
+        scene = self.scenes[scene_id]
+        if self.scene_id != scene_id:
+            self._emit("/change_scene", scene_id)
+            self.scene_id = scene_id
+            self.effect_id = scene['current_effect_id']
+        if effect_id is not None and self.effect_id != effect_id:
+            self._emit("/change_effect", effect_id)
+            self.effect_id = effect_id
+            scene['current_effect_id'] = effect_id
+
+    def _reset_cursor(self):
+        self.scene_id = None
+        self.effect_id = None
+
+    def _emit(self, address: str, *args):
+        self.commands.append((address, tuple(args)))
+
+    @staticmethod
+    def _expect_id(new_id: int, existing, kind: str):
+        """Check backend would assign new_id to the next created item"""
+        expected = max(existing) + 1 if existing else 0
+        if new_id != expected:
+            raise Unreachable(f"new {kind} would get ID {expected}, target has {new_id}")
+
+
+def _longest_increasing(order: List[str], rank: Dict[str, int]) -> set:
+    """Get longest subsequence of order whose target ranks increase"""
+    tails: List[int] = []
+    previous: List[Optional[int]] = [None] * len(order)
+    for index, seg_id in enumerate(order):
+        lo, hi = 0, len(tails)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if rank[order[tails[mid]]] < rank[seg_id]:
+                lo = mid + 1
+            else:
+                hi = mid
+        previous[index] = tails[lo - 1] if lo else None
+        if lo == len(tails):
+            tails.append(index)
+        else:
+            tails[lo] = index
+
+    keep = set()
+    index = tails[-1] if tails else None
+    while index is not None:
+        keep.add(order[index])
+        index = previous[index]
+    return keep
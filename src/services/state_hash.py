@@ -0,0 +1,122 @@
+import hashlib
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+STATE_HASH_ADDRESS = "/query_state_hash"
+
+Path = Tuple[int, ...]
+
+
+def digest(payload: Any) -> str:
+    """Hash JSON-serializable payload into a short hex string"""
+    data = json.dumps(payload, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+def segment_hash(segment) -> str:
+    """Get segment content hash, excluding runtime position"""
+    if segment.content_hash is None:
+        segment.content_hash = digest([
+            segment.segment_id,
+            segment.color,
+            [float(value) for value in segment.transparency],
+            segment.length,
+            float(segment.move_speed),
+            segment.move_range,
+            segment.initial_position,
+            bool(segment.is_edge_reflect),
+            segment.region_id,
+            segment.dimmer_time
+        ])
+    return segment.content_hash
+
+
+def effect_hash(effect) -> str:
+    """Get effect hash over its segment hashes in playback order"""
+    if effect.content_hash is None:
+        effect.content_hash = digest([effect.effect_id, [[seg_id, segment_hash(segment)] for seg_id, segment in effect.segments.items()]])
+    return effect.content_hash
+
+
+def scene_settings_hash(scene) -> str:
+    """Get hash of scene's own settings and palettes, without its effects"""
+    return digest([scene.led_count, scene.fps, scene.palettes])
+
+
+def scene_hash(scene) -> str:
+    """Get scene hash over its settings, palettes and effect hashes
+
+    The selected effect and palette are navigation state and not hashed.
+    """
+    if scene.content_hash is None:
+        scene.content_hash = digest([
+            scene.scene_id,
+            scene_settings_hash(scene),
+            [[effect.effect_id, effect_hash(effect)] for effect in scene.effects]
+        ])
+    return scene.content_hash
+
+
+def show_hash(scenes: Iterable) -> str:
+    """Get hash over all scene hashes"""
+    return digest([[scene.scene_id, scene_hash(scene)] for scene in scenes])
+
+
+def hash_node(scenes: Dict[int, Any], path: Path) -> Optional[Dict[str, Any]]:
+    """Get hash of node at path (scene_id, effect_id, segment_id) with its children's hashes
+
+    The empty path is the whole show. Returns None if the path does not exist.
+    """
+    if not path:
+        return {'hash': show_hash(scenes.values()), 'children': [[scene_id, scene_hash(scene)] for scene_id, scene in scenes.items()]}
+
+    scene = scenes.get(path[0])
+    if scene is None:
+        return None
+    if len(path) == 1:
+        return {
+            'hash': scene_hash(scene),
+            'settings': scene_settings_hash(scene),
+            'children': [[effect.effect_id, effect_hash(effect)] for effect in scene.effects]
+        }
+
+    effect = scene.get_effect(path[1])
+    if effect is None:
+        return None
+    if len(path) == 2:
+        return {'hash': effect_hash(effect), 'children': [[int(seg_id), segment_hash(segment)] for seg_id, segment in effect.segments.items()]}
+
+    segment = effect.get_segment(str(path[2]))
+    if segment is None or len(path) > 3:
+        return None
+    return {'hash': segment_hash(segment), 'children': []}
+
+
+def compare_nodes(path: Path, local: Optional[Dict[str, Any]], remote: Optional[Dict[str, Any]]) -> Tuple[List[Path], List[Path]]:
+    """Compare local and remote node at path, returning (divergent paths, child paths to query next)
+
+    A child present on one side only is divergent, as is a scene whose
+    settings or palettes differ or an effect whose segments are in another
+    order. Segments are leaves, so differing ones are reported without
+    another query.
+    """
+    if local is None or remote is None:
+        return [path], []
+    if local['hash'] == remote['hash']:
+        return [], []
+
+    local_children = {key: value for key, value in local['children']}
+    remote_children = {key: value for key, value in remote['children']}
+    divergent = [path + (key,) for key in local_children.keys() ^ remote_children.keys()]
+    descend = [path + (key,) for key, value in local_children.items() if key in remote_children and remote_children[key] != value]
+    if len(path) >= 2:
+        divergent += descend
+        descend = []
+
+    shared_order = [key for key in local_children if key in remote_children]
+    if (local.get('settings') != remote.get('settings')
+            or shared_order != [key for key in remote_children if key in local_children]
+            or not divergent and not descend):
+        divergent.append(path)
+    return sorted(divergent), descend
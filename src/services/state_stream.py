@@ -0,0 +1,234 @@
+import json
+import time
+from threading import Event, Lock
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from utils.logger import AppLogger
+
+
+QUERY_CHUNKED_ADDRESS = "/query_full_state_chunked"
+RESEND_ADDRESS = "/resend_state_chunks"
+STATE_CHUNK_ADDRESS = "/response/state_chunk"
+DEFAULT_CHUNK_SIZE = 1024
+MAX_RESEND_PER_REQUEST = 64
+
+
+def encode_state_records(data_cache) -> Iterator[bytes]:
+    """Serialize cache as newline-delimited JSON records, one scene header or effect per line
+
+    The first record carries the current selection, then every scene is sent
+    without effects followed by one record per effect, so no line grows with
+    the size of the whole show.
+    """
+    yield _encode_record({
+        'type': 'header',
+        'scene_count': len(data_cache.scenes),
+        'current_scene_id': data_cache.current_scene_id,
+        'current_effect_id': data_cache.current_effect_id,
+        'current_palette_id': data_cache.current_palette_id
+    })
+    for scene in data_cache.scenes.values():
+        yield _encode_record({'type': 'scene', 'scene': {
+            'scene_id': scene.scene_id,
+            'led_count': scene.led_count,
+            'fps': scene.fps,
+            'current_effect_id': scene.current_effect_id,
+            'current_palette_id': scene.current_palette_id,
+            'palettes': scene.palettes
+        }})
+        for effect in scene.effects:
+            yield _encode_record({'type': 'effect', 'scene_id': scene.scene_id, 'effect': effect.to_dict()})
+
+
+def _encode_record(record: Dict[str, Any]) -> bytes:
+    return json.dumps(record, separators=(',', ':')).encode('utf-8') + b"\n"
+
+
+def chunk_stream(records: Iterator[bytes], chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[bytes]:
+    """Split record stream into fixed-size chunks without regard to record boundaries"""
+    chunks = []
+    pending = bytearray()
+    for record in records:
+        pending += record
+        while len(pending) >= chunk_size:
+            chunks.append(bytes(pending[:chunk_size]))
+            del pending[:chunk_size]
+    if pending or not chunks:
+        chunks.append(bytes(pending))
+    return chunks
+
+
+class RecordParser:
+    """Incremental newline-delimited JSON parser holding at most one partial record"""
+
+    def __init__(self, on_record: Callable[[Dict[str, Any]], None]):
+        self.on_record = on_record
+        self._partial = bytearray()
+        self.records_parsed = 0
+
+    def feed(self, data: bytes):
+        """Parse every record completed by data"""
+        self._partial += data
+        start = 0
+        while True:
+            end = self._partial.find(b"\n", start)
+            if end < 0:
+                break
+            self.on_record(json.loads(self._partial[start:end]))
+            self.records_parsed += 1
+            start = end + 1
+        del self._partial[:start]
+
+    def close(self):
+        """Check that stream ended on a record boundary"""
+        if self._partial.strip():
+            raise ValueError(f"State stream ended inside a record ({len(self._partial)} bytes)")
+
+
+class ChunkReassembler:
+    """Deliver sequence-numbered chunks in order, buffering those that arrive early"""
+
+    def __init__(self, deliver: Callable[[bytes], None]):
+        self.deliver = deliver
+        self.total: Optional[int] = None
+        self.next_seq = 0
+        self._early: Dict[int, bytes] = {}
+        self.duplicates = 0
+
+    @property
+    def is_complete(self) -> bool:
+        return self.total is not None and self.next_seq >= self.total
+
+    def add(self, seq: int, total: int, payload: bytes) -> bool:
+        """Accept chunk, returning True when the stream is complete"""
+        if self.total is None:
+            self.total = total
+        if seq < self.next_seq or seq in self._early or seq >= self.total:
+            self.duplicates += 1
+            return self.is_complete
+
+        self._early[seq] = payload
+        while self.next_seq in self._early:
+            self.deliver(self._early.pop(self.next_seq))
+            self.next_seq += 1
+        return self.is_complete
+
+    def missing(self, limit: int = MAX_RESEND_PER_REQUEST) -> List[int]:
+        """Get sequence numbers not yet received, starting with the one blocking delivery"""
+        if self.total is None:
+            return [0]
+        missing = []
+        for seq in range(self.next_seq, self.total):
+            if seq not in self._early:
+                missing.append(seq)
+                if len(missing) >= limit:
+                    break
+        return missing
+
+
+class StateTransfer:
+    """Chunked full-state transfer parsed into a DataCacheService as chunks arrive
+
+    Records are staged in the cache and swapped in on the final chunk, so the
+    GUI keeps showing the previous show until the new one is complete. If no
+    chunk arrives for retry_interval seconds, `poll` asks the backend to
+    resend whatever is missing, up to max_retries times.
+    """
+
+    def __init__(self, transfer_id: int, data_cache, request_resend: Callable[[int, List[int]], Any],
+                 retry_interval: float = 0.25, max_retries: int = 8):
+        self.transfer_id = transfer_id
+        self.data_cache = data_cache
+        self.request_resend = request_resend
+        self.retry_interval = retry_interval
+        self.max_retries = max_retries
+
+        self.parser = RecordParser(data_cache.apply_state_record)
+        self.reassembler = ChunkReassembler(self.parser.feed)
+        self.started_at = time.monotonic()
+        self.last_activity = self.started_at
+        self.retries = 0
+        self.resent_chunks = 0
+        self.bytes_received = 0
+        self.error: Optional[str] = None
+        self.done = Event()
+        self._lock = Lock()
+
+        data_cache.begin_state_load()
+
+    @property
+    def succeeded(self) -> bool:
+        return self.done.is_set() and self.error is None
+
+    def handle_chunk(self, seq: int, total: int, payload: bytes) -> bool:
+        """Feed received chunk, returning True once the transfer has finished"""
+        with self._lock:
+            if self.done.is_set():
+                return True
+            self.last_activity = time.monotonic()
+            self.bytes_received += len(payload)
+            try:
+                if self.reassembler.add(seq, total, payload):
+                    self.parser.close()
+                    self.data_cache.finish_state_load()
+                    self._finish(None)
+            except Exception as e:
+                self._finish(f"Invalid state stream: {e}")
+            return self.done.is_set()
+
+    def poll(self, now: Optional[float] = None) -> bool:
+        """Request missing chunks if the transfer stalled, returning True once finished"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if self.done.is_set():
+                return True
+            if now - self.last_activity < self.retry_interval:
+                return False
+            if self.retries >= self.max_retries:
+                self._finish(f"Gave up after {self.retries} resend requests")
+                return True
+            missing = self.reassembler.missing()
+            self.retries += 1
+            self.resent_chunks += len(missing)
+            self.last_activity = now
+        self.request_resend(self.transfer_id, missing)
+        return False
+
+    def cancel(self, reason: str = "cancelled"):
+        """Abort transfer, keeping the previously loaded show"""
+        with self._lock:
+            if not self.done.is_set():
+                self._finish(reason)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Poll until finished or timeout seconds elapsed, returning True on success"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.done.wait(self.retry_interval / 2):
+            if deadline is not None and time.monotonic() >= deadline:
+                self.cancel("timed out")
+                break
+            self.poll()
+        return self.succeeded
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get transfer progress counters"""
+        return {
+            'transfer_id': self.transfer_id,
+            'chunks_total': self.reassembler.total,
+            'chunks_received': self.reassembler.next_seq + len(self.reassembler._early),
+            'duplicates': self.reassembler.duplicates,
+            'bytes_received': self.bytes_received,
+            'records_parsed': self.parser.records_parsed,
+            'resend_requests': self.retries,
+            'resent_chunks': self.resent_chunks,
+            'elapsed_s': time.monotonic() - self.started_at,
+            'error': self.error
+        }
+
+    def _finish(self, error: Optional[str]):
+        self.error = error
+        if error is not None:
+            self.data_cache.abort_state_load()
+            AppLogger.error(f"State transfer {self.transfer_id} failed: {error}")
+        else:
+            AppLogger.success(f"State transfer {self.transfer_id} complete: {self.reassembler.total} chunks, {self.parser.records_parsed} records")
+        self.done.set()
@@ -0,0 +1,215 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from components.data.data_action_handler import DataActionHandler
+from components.dimmer.dimmer_action import DimmerActionHandler
+from services.cache_events import (ChangeBatch, PaletteColorChanged, SceneSettingsChanged, SegmentParamChanged,
+                                   SelectionChanged, StructureChanged)
+from services.color_service import color_service
+from services.data_cache import DataCacheService, data_cache
+
+
+SHOW_FILE = os.path.join(os.path.dirname(__file__), "..", "jsons", "multiple_scenes.json")
+
+
+class DummyPage:
+    overlay = None
+
+    def run_task(self, coro):
+        asyncio.run(coro)
+
+
+class DummySegmentEditPanel:
+    def __init__(self):
+        self.calls = []
+
+    def update_segments_list(self, segment_ids):
+        self.calls.append("segments_list")
+
+    def update_regions_list(self, region_ids):
+        self.calls.append("regions_list")
+
+    def update_color_composition(self):
+        self.calls.append("color_composition")
+
+
+def test_mutations_emit_typed_events():
+    cache = DataCacheService()
+    cache.load_from_file(SHOW_FILE)
+    events = []
+    cache.subscribe(events.append)
+
+    cache.update_segment_parameter("0", "transparency", {"index": 0, "transparency": 0.5})
+    cache.add_dimmer_element("0", [100, 0, 255])
+    cache.update_palette_color(1, 2, [1, 2, 3])
+    cache.update_scene(cache.current_scene_id, {"fps": 20})
+    cache.create_segment(custom_id=30)
+    cache.set_current_effect(cache.current_effect_id)
+    cache.create_effect()
+
+    scene_id, effect_id = cache.current_scene_id, cache.current_effect_id
+    assert events == [
+        SegmentParamChanged(scene_id, effect_id, 0, "transparency"),
+        SegmentParamChanged(scene_id, effect_id, 0, "dimmer_time"),
+        PaletteColorChanged(scene_id, 1, 2),
+        SceneSettingsChanged(scene_id, ("fps",)),
+        StructureChanged(scene_id, "segment", effect_id),
+        SelectionChanged(scene_id, effect_id, cache.current_palette_id),
+        StructureChanged(scene_id, "effect"),
+    ]
+
+
+def test_subscribers_filtered_by_type_and_path():
+    cache = DataCacheService()
+    cache.load_from_file(SHOW_FILE)
+    scene_id, effect_id = cache.current_scene_id, cache.current_effect_id
+    params, on_segment, legacy = [], [], []
+    cache.subscribe(lambda event: params.append(event.param), SegmentParamChanged)
+    cache.subscribe(on_segment.append, path=(scene_id, effect_id, 1))
+    cache.add_change_listener(lambda: legacy.append(1))
+
+    cache.update_segment_parameter("0", "move_speed", 3.0)
+    cache.update_segment_parameter("1", "move_speed", 4.0)
+    cache.update_palette_color(0, 0, [9, 9, 9])
+    cache.delete_segment("0")
+    cache.update_segment_parameter("1", "move_speed", 5.0, scene_id=scene_id + 1)
+
+    assert params == ["move_speed", "move_speed"]
+    assert [type(event) for event in on_segment] == [SegmentParamChanged, PaletteColorChanged, StructureChanged]
+    assert len(legacy) == 4
+
+
+def test_failing_subscriber_does_not_stop_delivery():
+    cache = DataCacheService()
+    received = []
+
+    def failing(event):
+        raise RuntimeError("panel gone")
+
+    cache.subscribe(failing)
+    cache.subscribe(received.append)
+    cache.update_segment_parameter("0", "move_speed", 2.0)
+    cache.unsubscribe(received.append)
+    cache.update_segment_parameter("0", "move_speed", 3.0)
+    assert len(received) == 1
+
+
+def test_segment_edit_refreshes_only_color_composition():
+    data_cache.clear()
+    handler = DataActionHandler(DummyPage())
+    panel = DummySegmentEditPanel()
+    handler.segment_edit_panel = panel
+    color_service.set_current_segment_id("0")
+    try:
+        data_cache.update_segment_parameter("0", "transparency", {"index": 1, "transparency": 0.2})
+        data_cache.update_segment_parameter("0", "current_position", 12.0)
+        assert panel.calls == ["color_composition"]
+
+        panel.calls.clear()
+        data_cache.create_segment()
+        assert "segments_list" in panel.calls
+    finally:
+        for callback in (handler._on_cache_changed, handler._on_scene_settings_changed,
+                         handler._on_palette_color_changed, handler._on_segment_param_changed):
+            data_cache.unsubscribe(callback)
+        data_cache.clear()
+
+
+def test_transaction_merges_bulk_edit_into_one_notification():
+    data_cache.clear()
+    handler = DataActionHandler(DummyPage())
+    refreshes = []
+    handler.update_all_ui_from_cache = lambda: refreshes.append(1)
+    events, legacy = [], []
+    mark_dirty = lambda: legacy.append(1)
+    data_cache.subscribe(events.append)
+    data_cache.add_change_listener(mark_dirty)
+    try:
+        with data_cache.transaction():
+            for segment_id in range(1, 501):
+                data_cache.create_segment(custom_id=segment_id)
+            with data_cache.transaction():
+                for segment_id in range(1, 501):
+                    data_cache.update_segment_parameter(str(segment_id), "move_speed", 2.0)
+                    data_cache.update_segment_parameter(str(segment_id), "move_speed", 3.0)
+            assert events == [] and refreshes == []
+    finally:
+        for callback in (events.append, handler._on_cache_changed, handler._on_scene_settings_changed,
+                         handler._on_palette_color_changed, handler._on_segment_param_changed):
+            data_cache.unsubscribe(callback)
+        data_cache.remove_change_listener(mark_dirty)
+        data_cache.clear()
+
+    assert refreshes == [1] and legacy == [1]
+    assert len(events) == 1 and isinstance(events[0], ChangeBatch)
+    assert len(events[0].events) == 501
+    assert events[0].path == (0, 0)
+
+
+def test_transaction_rolls_back_on_error():
+    cache = DataCacheService()
+    cache.load_from_file(SHOW_FILE)
+    before = cache.export_to_dict()
+    before_hash = cache.get_state_hash()
+    events = []
+    cache.subscribe(events.append)
+
+    with pytest.raises(ValueError):
+        with cache.transaction():
+            cache.update_segment_parameter("0", "move_speed", 9.0)
+            cache.delete_segment("1")
+            cache.set_current_scene(1)
+            raise ValueError("bad edit")
+
+    assert events == []
+    assert cache.export_to_dict() == before
+    assert cache.get_state_hash() == before_hash
+
+    with cache.transaction():
+        cache.update_palette_color(0, 0, [4, 5, 6])
+    assert events == [PaletteColorChanged(cache.current_scene_id, 0, 0)]
+
+
+def test_rollback_keeps_untouched_objects():
+    cache = DataCacheService()
+    cache.load_from_file(SHOW_FILE)
+    effect, segment = cache.get_current_effect(), cache.get_segment("0")
+    speed = segment.move_speed
+
+    with pytest.raises(ValueError):
+        with cache.transaction():
+            cache.update_segment_parameter("0", "move_speed", speed + 1.0)
+            assert cache.get_segment("0") is not segment
+            raise ValueError("bad edit")
+
+    assert cache.get_current_effect() is effect
+    assert cache.get_segment("0") is segment and segment.move_speed == speed
+
+
+def test_failed_dimmer_helper_rolls_back(monkeypatch):
+    data_cache.load_from_file(SHOW_FILE)
+    handler = DimmerActionHandler(DummyPage())
+    dimmer_time = [list(element) for element in data_cache.get_segment("0").dimmer_time]
+    add_dimmer_element = data_cache.add_dimmer_element
+    calls = []
+
+    def failing_add(segment_id, dimmer_element, *args):
+        calls.append(dimmer_element)
+        return len(calls) < 3 and add_dimmer_element(segment_id, dimmer_element, *args)
+
+    monkeypatch.setattr(data_cache, "add_dimmer_element", failing_add)
+    try:
+        assert not handler.create_strobe_sequence("0", 3, 50)
+        assert calls[0] == [50, 0, 100]
+        assert data_cache.get_segment("0").dimmer_time == dimmer_time
+
+        monkeypatch.setattr(data_cache, "add_dimmer_element", add_dimmer_element)
+        assert handler.create_breathing_sequence("0", 400)
+        assert data_cache.get_segment("0").dimmer_time == dimmer_time + [[200, 0, 100], [200, 100, 0]]
+    finally:
+        data_cache.clear()
@@ -0,0 +1,153 @@
+import copy
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from models.effect import Effect
+from models.scene import Scene
+from models.segment import Segment
+from services.data_cache import DataCacheService
+
+
+SHOW_FILE = os.path.join(os.path.dirname(__file__), "..", "jsons", "multiple_scenes.json")
+
+
+def make_segment(segment_id):
+    return Segment(segment_id=segment_id, color=[0, 1], transparency=[0.0, 0.5], length=[10], move_speed=0.0,
+                   move_range=[0, 99], initial_position=0, current_position=0.0, is_edge_reflect=False,
+                   region_id=0, dimmer_time=[[1000, 0, 100]])
+
+
+def load_show():
+    cache = DataCacheService()
+    cache.load_from_file(SHOW_FILE)
+    return cache
+
+
+def test_duplicate_scene_is_independent_of_source():
+    cache = load_show()
+    source_id = cache.current_scene_id
+    source_before = copy.deepcopy(cache.get_scene(source_id).to_dict())
+    new_id = cache.duplicate_scene(source_id)
+    source, duplicate = cache.get_scene(source_id), cache.get_scene(new_id)
+    effect_id = source.effects[0].effect_id
+    assert duplicate.get_effect(effect_id) is source.get_effect(effect_id)
+
+    cache.update_segment_parameter("0", "color", {"index": 0, "color_index": 5}, scene_id=new_id, effect_id=effect_id)
+    cache.add_dimmer_element("0", [500, 0, 0], scene_id=new_id, effect_id=effect_id)
+    cache.update_segment_parameter("1", "move_range", [1, 2], scene_id=new_id, effect_id=effect_id)
+    cache.update_palette_color(0, 0, [1, 2, 3], scene_id=new_id)
+    cache.delete_segment("2", scene_id=new_id, effect_id=effect_id)
+    assert source.to_dict() == source_before
+    assert duplicate.get_effect(effect_id) is not source.get_effect(effect_id)
+    assert duplicate.get_effect(effect_id).get_segment("0").color[0] == 5
+
+    cache.update_segment_parameter("1", "move_speed", 9.0, scene_id=source_id, effect_id=effect_id)
+    assert duplicate.get_effect(effect_id).get_segment("1").move_speed != 9.0
+    assert "2" not in duplicate.get_effect(effect_id).segments
+
+
+def test_duplicate_segment_shares_lists_until_written():
+    effect = Effect(effect_id=0)
+    effect.add_segment(make_segment(0))
+    source = effect.get_segment("0")
+    duplicate = source.clone(1)
+    assert duplicate.dimmer_time is source.dimmer_time and duplicate.content_hash is None
+
+    duplicate.own("dimmer_time")
+    duplicate.dimmer_time.append([200, 100, 0])
+    assert source.dimmer_time == [[1000, 0, 100]]
+    assert duplicate.color is source.color
+
+    source.own("color")
+    source.color[0] = 7
+    assert duplicate.color == [0, 1]
+
+
+def test_duplicate_effect_and_palette_through_cache():
+    cache = load_show()
+    source_id = cache.current_effect_id
+    new_id = cache.duplicate_effect(source_id)
+    source, duplicate = cache.get_effect(effect_id=source_id), cache.get_effect(effect_id=new_id)
+    assert duplicate.get_segment("0") is source.get_segment("0")
+
+    cache.update_segment_parameter("0", "transparency", {"index": 0, "transparency": 0.1}, effect_id=new_id)
+    assert duplicate.get_segment("0").transparency[0] == 0.1
+    assert source.get_segment("0").transparency[0] != 0.1
+    assert source.get_segment("1") is duplicate.get_segment("1")
+
+    palette_id = cache.duplicate_palette(0)
+    scene = cache.get_current_scene()
+    assert scene.palettes[palette_id] == scene.palettes[0]
+    cache.update_palette_color(palette_id, 0, [9, 9, 9])
+    assert scene.palettes[0][0] != [9, 9, 9]
+
+
+def test_undo_after_editing_duplicate_restores_both():
+    cache = load_show()
+    source_id = cache.current_scene_id
+    before = copy.deepcopy(cache.export_to_dict())
+    new_id = cache.duplicate_scene(source_id)
+    effect_id = cache.get_scene(new_id).effects[0].effect_id
+    cache.update_segment_parameter("0", "segment_id", 30, scene_id=new_id, effect_id=effect_id)
+    cache.update_segment_parameter("30", "move_speed", 2.0, scene_id=new_id, effect_id=effect_id)
+    edited = copy.deepcopy(cache.export_to_dict())
+
+    for _ in range(3):
+        cache.undo()
+    assert cache.export_to_dict() == before
+    for _ in range(3):
+        cache.redo()
+    assert cache.export_to_dict() == edited
+
+
+def test_duplicating_large_scene_is_fast():
+    effect = Effect(effect_id=0)
+    for segment_id in range(10000):
+        effect.add_segment(make_segment(segment_id))
+    cache = DataCacheService()
+    cache.scenes = {0: Scene(scene_id=0, led_count=100, fps=60, current_effect_id=0, current_palette_id=0,
+                             palettes=[[[0, 0, 0]]], effects=[effect])}
+    cache._scene_ids = None
+    cache.current_scene_id = 0
+    cache.current_effect_id = 0
+
+    start = time.perf_counter()
+    new_id = cache.duplicate_scene(0)
+    assert time.perf_counter() - start < 0.05
+    assert cache.get_scene(new_id).get_effect(0) is effect
+
+
+def test_committed_transaction_leaves_nothing_shared():
+    cache = load_show()
+    with cache.transaction():
+        cache.update_segment_parameter("0", "move_speed", 3.0)
+        cache.update_segment_parameter("1", "move_speed", 4.0)
+    scene = cache.get_current_scene()
+    effect, segment, untouched = cache.get_current_effect(), cache.get_segment("0"), cache.get_segment("2")
+    dimmer_time, other_effect = segment.dimmer_time, scene.effects[-1]
+    assert other_effect is not effect
+
+    cache.update_segment_parameter("2", "move_speed", 6.0)
+    cache.add_dimmer_element("0", [100, 0, 100])
+    cache.update_segment_parameter("0", "move_speed", 5.0, effect_id=other_effect.effect_id)
+    assert cache.get_current_effect() is effect and cache.get_segment("2") is untouched
+    assert cache.get_segment("0").dimmer_time is dimmer_time
+    assert scene.get_effect(other_effect.effect_id) is other_effect
+
+
+def test_transaction_keeps_duplicates_apart():
+    cache = load_show()
+    source_id, effect_id = cache.current_scene_id, cache.current_effect_id
+    new_id = cache.duplicate_scene(source_id)
+    with cache.transaction():
+        cache.update_segment_parameter("0", "move_speed", 3.0)
+    duplicate = cache.get_scene(new_id).get_effect(effect_id)
+    assert duplicate.get_segment("0").move_speed != 3.0
+
+    cache.add_dimmer_element("0", [100, 0, 100], scene_id=new_id, effect_id=effect_id)
+    cache.update_segment_parameter("1", "move_speed", 8.0, scene_id=new_id, effect_id=effect_id)
+    assert cache.get_segment("0").dimmer_time[-1] != [100, 0, 100]
+    assert cache.get_segment("1").move_speed != 8.0
@@ -0,0 +1,73 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from engine.dimmer import CompiledDimmer, DimmerBank, DimmerBankCache, compile_dimmer
+from services.data_cache import DataCacheService
+
+
+def reference_brightness(dimmer_time, t):
+    """Reference per-ramp loop evaluation of a looping dimmer sequence"""
+    total = sum(max(d, 0) for d, _, _ in dimmer_time)
+    local = (t * 1000.0) % total
+    elapsed = 0.0
+    for duration, start, end in dimmer_time:
+        if local < elapsed + duration:
+            return (start + (end - start) * (local - elapsed) / duration) / 100.0
+        elapsed += duration
+    return dimmer_time[-1][2] / 100.0
+
+
+def test_compiled_dimmer_matches_reference():
+    dimmer_time = [[1000, 100, 0], [500, 0, 0], [2000, 0, 100], [0, 30, 30], [1500, 100, 50]]
+    compiled = CompiledDimmer(dimmer_time)
+    times = np.linspace(0, 20, 257)
+    expected = [reference_brightness(dimmer_time, t) for t in times]
+    assert np.allclose(compiled.brightness(times), expected)
+
+
+def test_bank_evaluates_segments_and_timestamps_in_one_call():
+    sequences = [[[1000, 0, 100]], [], [[400, 50, 50], [600, 20, 80]], [[0, 40, 70]]]
+    bank = DimmerBank([CompiledDimmer(seq) for seq in sequences])
+    times = np.array([0.0, 0.25, 0.7, 1.9])
+    levels = bank.levels_at(times)
+    assert levels.shape == (4, 4)
+    assert np.allclose(levels[:, 0], [0.0, 0.25, 0.7, 0.9])
+    assert np.all(levels[:, 1] == 1.0)
+    assert np.allclose(levels[:, 2], [0.5, 0.5, 0.2 + 0.6 * 0.3 / 0.6, 0.2 + 0.6 * 0.5 / 0.6])
+    assert np.all(levels[:, 3] == 0.7)
+
+
+def test_compiled_dimmer_cached_and_invalidated_by_cache_edits():
+    dc = DataCacheService()
+    segment = dc.get_segment("0")
+    compiled = compile_dimmer(segment)
+    assert compile_dimmer(segment) is compiled
+
+    assert dc.add_dimmer_element("0", [500, 100, 100])
+    assert segment.compiled_dimmer is None
+    assert len(compile_dimmer(segment)) == 3
+
+    assert dc.update_dimmer_element("0", 2, [500, 40, 40])
+    assert np.isclose(compile_dimmer(segment).brightness(2.2), 0.4)
+
+    assert dc.delete_dimmer_element("0", 2)
+    assert len(compile_dimmer(segment)) == 2
+
+
+def test_bank_cache_repacks_only_after_recompile():
+    dc = DataCacheService()
+    segments = [dc.get_segment("0")]
+    cache = DimmerBankCache()
+    bank = cache.get(segments)
+    assert cache.get(segments) is bank
+    dc.add_dimmer_element("0", [250, 10, 10])
+    assert cache.get(segments) is not bank
+
+
+def test_bank_handles_trailing_segment_without_ramps():
+    bank = DimmerBank([CompiledDimmer([[1000, 0, 100]]), CompiledDimmer([])])
+    assert np.allclose(bank.levels_at(0.5), [0.5, 1.0])
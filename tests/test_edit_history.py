@@ -0,0 +1,235 @@
+import asyncio
+import copy
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.cache_events import ChangeBatch
+from services.data_cache import DataCacheService, data_cache
+from services.edit_history import EditHistory
+from services.mock_engine import MockPlaybackEngine
+
+
+SHOW_FILE = os.path.join(os.path.dirname(__file__), "..", "jsons", "multiple_scenes.json")
+
+
+def load_show():
+    cache = DataCacheService()
+    cache.load_from_file(SHOW_FILE)
+    return cache
+
+
+def comparable(state):
+    state = copy.deepcopy(state)
+    for scene in state['scenes']:
+        scene['effects'] = sorted(scene['effects'], key=lambda effect: effect['effect_id'])
+        for effect in scene['effects']:
+            for segment in effect['segments'].values():
+                segment.pop('current_position')
+                segment.pop('region_id')
+                segment['move_speed'] = float(segment['move_speed'])
+            effect['segment_order'] = list(effect['segments'])
+    return state
+
+
+def mirror(cache):
+    """Mock engine holding the cache's current show"""
+    engine = MockPlaybackEngine(port=0)
+    state = cache.export_to_dict()
+    engine.data_cache.load_from_json_data(copy.deepcopy(state))
+    engine.data_cache.current_scene_id = state['current_scene_id']
+    engine.data_cache.current_effect_id = state['current_effect_id']
+    engine.data_cache.current_palette_id = state['current_palette_id']
+    return engine
+
+
+def replay(engine, step, cache):
+    """Apply step to engine, reloading the show when the step needs a full sync"""
+    assert step is not None
+    if step.commands is None:
+        return mirror(cache)
+    for address, args in step.commands:
+        replies = engine.handle_command(address, list(args))
+        assert not replies or replies[0][0] != "/response/error", (address, args, replies)
+    return engine
+
+
+EDITS = [
+    lambda cache: cache.update_segment_parameter("0", "move_speed", 7.5),
+    lambda cache: cache.update_segment_parameter("0", "color", {"index": 5, "color_index": 4}),
+    lambda cache: cache.update_segment_parameter("1", "transparency", {"index": 0, "transparency": 0.25}),
+    lambda cache: cache.update_segment_parameter("1", "move_range", [3, 40]),
+    lambda cache: cache.add_dimmer_element("1", [250, 10, 90]),
+    lambda cache: cache.update_dimmer_element("1", 0, [100, 100, 0]),
+    lambda cache: cache.delete_dimmer_element("1", 1),
+    lambda cache: cache.create_segment(),
+    lambda cache: cache.duplicate_segment("1"),
+    lambda cache: cache.delete_segment("1"),
+    lambda cache: cache.reorder_segments(list(reversed(cache.get_current_effect().segments))),
+    lambda cache: cache.update_segment_parameter("2", "segment_id", 40),
+    lambda cache: cache.update_palette_color(1, 2, [12, 34, 56]),
+    lambda cache: cache.create_palette([[1, 2, 3]] * 6),
+    lambda cache: cache.update_scene(cache.current_scene_id, {"fps": 24}),
+    lambda cache: cache.duplicate_effect(cache.current_effect_id),
+    lambda cache: cache.create_effect(),
+    lambda cache: cache.delete_effect(max(cache.get_effect_ids())),
+    lambda cache: cache.duplicate_scene(cache.current_scene_id),
+]
+
+
+def test_undo_redo_restores_cache_and_backend():
+    cache = load_show()
+    states = [copy.deepcopy(cache.export_to_dict())]
+    for edit in EDITS:
+        assert edit(cache) not in (None, False)
+        states.append(copy.deepcopy(cache.export_to_dict()))
+    with cache.transaction():
+        cache.update_segment_parameter("0", "move_speed", 1.0)
+        cache.create_segment(custom_id=90)
+        cache.update_segment_parameter("90", "initial_position", 12)
+    states.append(copy.deepcopy(cache.export_to_dict()))
+    assert len(cache.history) == len(states) - 1
+
+    engine = mirror(cache)
+    full_syncs = 0
+    for state in reversed(states[:-1]):
+        step = cache.undo()
+        full_syncs += step.commands is None
+        engine = replay(engine, step, cache)
+        assert cache.export_to_dict() == state
+        assert comparable(engine.export_state()) == comparable(state)
+    assert cache.undo() is None
+
+    for state in states[1:]:
+        step = cache.redo()
+        full_syncs += step.commands is None
+        engine = replay(engine, step, cache)
+        assert cache.export_to_dict() == state
+        assert comparable(engine.export_state()) == comparable(state)
+    assert cache.redo() is None
+    # Only recreating the duplicated scene needs one: its segments have fewer colors than a new segment
+    assert full_syncs == 1
+    rebuilt = DataCacheService()
+    rebuilt.load_from_json_data(copy.deepcopy(states[-1]))
+    assert cache.get_state_hash() == rebuilt.get_state_hash()
+
+
+def test_parameter_undo_plans_only_the_edited_segment():
+    cache = load_show()
+    for segment_id in range(100, 400):
+        cache.create_segment(custom_id=segment_id)
+    cache.update_segment_parameter("250", "move_speed", 3.0)
+    cache.update_segment_parameter("250", "move_speed", 4.0)
+
+    step = cache.undo()
+    assert step.commands == [("/update_segment", (250, "move_speed", 3.0))]
+    assert cache.get_segment("250").move_speed == 3.0
+    assert cache.redo().commands == [("/update_segment", (250, "move_speed", 4.0))]
+
+
+def test_undo_notifies_once_and_restores_selection():
+    cache = load_show()
+    effect_id = cache.current_effect_id
+    cache.duplicate_effect(effect_id)
+    cache.delete_effect(effect_id)
+    assert cache.current_effect_id != effect_id
+    events = []
+    cache.subscribe(events.append)
+
+    step = cache.undo()
+    assert cache.current_effect_id == effect_id
+    assert cache.get_current_scene().effects[0].effect_id == effect_id
+    assert len(events) == 1 and isinstance(events[0], ChangeBatch)
+    # /create_effect would assign the next free ID, not the restored one
+    assert step.commands is None
+
+
+def test_history_is_bounded_and_reset():
+    cache = load_show()
+    cache.history = EditHistory(max_depth=5, max_ops=40)
+    for speed in range(20):
+        cache.update_segment_parameter("0", "move_speed", float(speed))
+    assert len(cache.history) == 5
+    cache.update_segment_parameter("0", "move_speed", 19.0)
+    assert len(cache.history) == 5
+
+    with cache.transaction():
+        for segment_id in range(100, 150):
+            cache.create_segment(custom_id=segment_id)
+    assert len(cache.history) == 1
+    assert cache.undo() is not None and not cache.history.can_undo()
+
+    cache.update_segment_parameter("0", "move_speed", 2.0)
+    assert not cache.history.can_redo()
+
+    with pytest.raises(ValueError):
+        with cache.transaction():
+            cache.update_segment_parameter("0", "move_speed", 5.0)
+            raise ValueError("bad edit")
+    assert not cache.history.can_undo()
+
+    cache.update_segment_parameter("0", "move_speed", 6.0)
+    cache.load_from_file(SHOW_FILE)
+    assert not cache.history.can_undo()
+
+
+def test_keyboard_undo_sends_step_to_engine(monkeypatch):
+    from app import light_pattern_app
+
+    sent = []
+    monkeypatch.setattr(light_pattern_app.osc_service, "is_connected", lambda: True)
+    monkeypatch.setattr(light_pattern_app.osc_service, "send_history_step", lambda step, cache: sent.append(step))
+    app = SimpleNamespace(_text_focus=None, _history_sender=ThreadPoolExecutor(max_workers=1))
+    data_cache.clear()
+    try:
+        data_cache.update_segment_parameter("0", "move_speed", 4.0)
+        for key, shift in (("z", False), ("z", True), ("x", False)):
+            event = SimpleNamespace(ctrl=True, meta=False, shift=shift, key=key)
+            light_pattern_app.LightPatternApp._on_keyboard_event(app, event)
+        app._text_focus = "field"
+        light_pattern_app.LightPatternApp._on_keyboard_event(app, SimpleNamespace(ctrl=True, meta=False, shift=False, key="z"))
+        assert data_cache.get_segment("0").move_speed == 4.0
+    finally:
+        app._history_sender.shutdown(wait=True)
+        data_cache.clear()
+
+    assert [step.commands for step in sent] == [
+        [("/update_segment", (0, "move_speed", 100.0))],
+        [("/update_segment", (0, "move_speed", 4.0))],
+    ]
+
+
+def test_text_input_focus_followed_from_page_events():
+    import flet as ft
+    from app import light_pattern_app
+
+    dispatched = []
+
+    async def dispatch(e):
+        dispatched.append(e.name)
+
+    controls = {"field": ft.TextField(), "button": ft.ElevatedButton()}
+    page = SimpleNamespace(on_event_async=dispatch, get_control=controls.get)
+    app = SimpleNamespace(page=page, _text_focus=None)
+    light_pattern_app.LightPatternApp._watch_text_focus(app)
+
+    asyncio.run(page.on_event_async(SimpleNamespace(name="focus", target="field")))
+    assert app._text_focus == "field"
+    asyncio.run(page.on_event_async(SimpleNamespace(name="focus", target="button")))
+    asyncio.run(page.on_event_async(SimpleNamespace(name="blur", target="field")))
+    assert app._text_focus is None and dispatched == ["focus", "focus", "blur"]
+
+
+def test_reorder_to_same_order_records_nothing():
+    cache = load_show()
+    events = []
+    cache.subscribe(events.append)
+    assert cache.reorder_segments(list(cache.get_current_effect().segments))
+    assert len(cache.history) == 0 and events == []
+    assert cache.reorder_segments(list(reversed(cache.get_current_effect().segments)))
+    assert len(cache.history) == 1
@@ -0,0 +1,122 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from models.effect import Effect
+from models.scene import Scene
+from models.segment import Segment
+from services.data_cache import DataCacheService
+
+
+SHOW_FILE = os.path.join(os.path.dirname(__file__), "..", "jsons", "multiple_scenes.json")
+
+
+def make_segment(segment_id):
+    return Segment(segment_id=segment_id, color=[0], transparency=[0.0], length=[], move_speed=0.0,
+                   move_range=[0, 9], initial_position=0, current_position=0.0, is_edge_reflect=False,
+                   region_id=0, dimmer_time=[])
+
+
+def load_show():
+    cache = DataCacheService()
+    cache.load_from_file(SHOW_FILE)
+    return cache
+
+
+def test_getters_return_cached_views():
+    cache = load_show()
+    scene_ids, effect_ids, segment_ids = cache.get_scene_ids(), cache.get_effect_ids(), cache.get_segment_ids()
+    assert scene_ids is cache.get_scene_ids()
+    assert effect_ids is cache.get_effect_ids()
+    assert segment_ids is cache.get_segment_ids()
+    assert isinstance(segment_ids, tuple)
+    with pytest.raises(AttributeError):
+        segment_ids.append(99)
+
+    scene = cache.get_current_scene()
+    assert list(effect_ids) == [effect.effect_id for effect in scene.effects]
+    assert all(scene.get_effect(effect.effect_id) is effect for effect in scene.effects)
+
+
+def test_structural_changes_refresh_indexes():
+    cache = load_show()
+    cache.get_scene_ids(), cache.get_effect_ids(), cache.get_segment_ids()
+
+    new_scene = cache.create_scene(cache.get_current_scene().to_dict())
+    assert new_scene in cache.get_scene_ids()
+    cache.delete_scene(new_scene)
+    assert new_scene not in cache.get_scene_ids()
+
+    new_effect = cache.create_effect()
+    assert cache.get_effect_ids()[-1] == new_effect
+    assert cache.get_effect(effect_id=new_effect).effect_id == new_effect
+    cache.delete_effect(new_effect)
+    assert new_effect not in cache.get_effect_ids()
+    assert cache.get_effect(effect_id=new_effect) is None
+
+    before = cache.get_segment_ids()
+    assert cache.update_segment_parameter(str(before[0]), "segment_id", 77)
+    assert cache.get_segment_ids() == before[1:] + (77,)
+    assert cache.reorder_segments([str(segment_id) for segment_id in reversed(cache.get_segment_ids())])
+    assert cache.get_segment_ids() == (77,) + tuple(reversed(before[1:]))
+
+
+def test_rollback_restores_indexes():
+    cache = load_show()
+    scene_ids, effect_ids = cache.get_scene_ids(), cache.get_effect_ids()
+    with pytest.raises(ValueError):
+        with cache.transaction():
+            cache.create_scene(cache.get_current_scene().to_dict())
+            cache.create_effect()
+            cache.get_scene_ids(), cache.get_effect_ids()
+            raise ValueError("bad edit")
+    assert cache.get_scene_ids() == scene_ids
+    assert cache.get_effect_ids() == effect_ids
+
+
+def test_duplicate_effect_ids_resolve_to_first():
+    first, second = Effect(effect_id=3), Effect(effect_id=3)
+    scene = Scene(scene_id=0, led_count=10, fps=30, current_effect_id=3, current_palette_id=0,
+                  effects=[first, second])
+    assert scene.get_effect_ids() == (3, 3)
+    assert scene.get_effect(3) is first
+    assert scene.remove_effect(3)
+    assert scene.get_effect(3) is second and scene.get_effect_ids() == (3,)
+
+    effect = Effect(effect_id=0)
+    effect.add_segment(make_segment(1))
+    assert effect.get_segment_ids() == (1,)
+    effect.add_segment(make_segment(2))
+    assert effect.get_segment_ids() == (1, 2)
+    assert effect.reorder_segments(["2", "1"]) and effect.get_segment_ids() == (2, 1)
+    assert effect.remove_segment("2") and effect.get_segment_ids() == (1,)
+
+
+def test_same_length_changes_refresh_indexes():
+    effect = Effect(effect_id=0)
+    effect.add_segment(make_segment(1))
+    effect.add_segment(make_segment(2))
+    assert effect.get_segment_ids() == (1, 2)
+    renamed = effect.rename_segment("1", 5)
+    assert renamed is effect.get_segment("5") and renamed.segment_id == 5
+    assert effect.get_segment_ids() == (2, 5)
+    assert effect.rename_segment("2", 5) is None
+
+    first, second = Effect(effect_id=1), Effect(effect_id=2)
+    scene = Scene(scene_id=0, led_count=10, fps=30, current_effect_id=1, current_palette_id=0, effects=[first])
+    assert scene.get_effect_ids() == (1,)
+    scene.remove_effect(1)
+    scene.add_effect(second)
+    assert scene.get_effect_ids() == (2,) and scene.get_effect(1) is None
+
+
+def test_set_current_effect_uses_index():
+    cache = load_show()
+    scene = cache.get_current_scene()
+    effect_id = scene.effects[-1].effect_id
+    assert cache.set_current_effect(effect_id)
+    assert not cache.set_current_effect(max(scene.get_effect_ids()) + 1)
+    assert cache.current_effect_id == effect_id
@@ -0,0 +1,101 @@
+import asyncio
+import json
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.mock_engine import MockPlaybackEngine
+from services.osc_service import OSCService
+from services.osc_transport import AsyncOSCTransport, OSCResponseError
+
+
+SHOW_FILE = os.path.join(os.path.dirname(__file__), "..", "jsons", "multiple_scenes.json")
+
+
+@pytest.fixture
+def engine():
+    engine = MockPlaybackEngine(port=0)
+    assert engine.start()
+    yield engine
+    engine.stop()
+
+
+def run_with_transport(engine, scenario):
+    async def main():
+        transport = AsyncOSCTransport(server_port=0, client_port=engine.port)
+        assert await transport.start()
+        try:
+            return await scenario(transport)
+        finally:
+            transport.stop()
+    return asyncio.run(main())
+
+
+def test_crud_commands_answer_with_new_ids(engine):
+    async def scenario(transport):
+        assert await transport.request("/create_segment", 7) == ["/create_segment", 7]
+        assert await transport.duplicate_segment(7) == 8
+        assert await transport.create_effect() == 1
+        assert await transport.create_palette() == 1
+        assert await transport.duplicate_scene(0) == 1
+        with pytest.raises(OSCResponseError):
+            await transport.request("/delete_segment", 99)
+        with pytest.raises(OSCResponseError):
+            await transport.request("/no_such_command")
+    run_with_transport(engine, scenario)
+    assert engine.get_stats()['errors'] == 2
+
+
+def test_segment_and_dimmer_updates_apply_to_state(engine):
+    async def scenario(transport):
+        await transport.request("/update_segment", 0, "transparency", 1, 0.25)
+        await transport.request("/update_segment", 0, "move_range", 10, 50)
+        await transport.request("/update_segment", 0, "edge_reflect", 0)
+        await transport.request("/update_segment", 0, "color_slot", 2, 0, 5)
+        await transport.request("/create_dimmer", 0, 500, 20, 80)
+        await transport.request("/update_dimmer", 0, 0, 250, 0, 50)
+        await transport.request("/palette/0/1", 1, 2, 3)
+        await transport.request("/create_segment", 4)
+        await transport.request("/reorder_segment", 4, 0)
+        return json.loads((await transport.request("/query_full_state"))[0])
+    state = run_with_transport(engine, scenario)
+    effect = state['scenes'][0]['effects'][0]
+    segment = effect['segments']['0']
+    assert segment['transparency'][1] == 0.25
+    assert segment['move_range'] == [10, 50]
+    assert segment['is_edge_reflect'] is False
+    assert segment['color'][2] == 5
+    assert segment['dimmer_time'][0] == [250, 0, 50]
+    assert segment['dimmer_time'][-1] == [500, 20, 80]
+    assert state['scenes'][0]['palettes'][0][1] == [1, 2, 3]
+    assert list(effect['segments']) == ['4', '0']
+
+
+def test_fire_and_forget_commands_converge(engine):
+    service = OSCService(client_port=engine.port)
+    service.start_client()
+    service.send_load_json(os.path.abspath(SHOW_FILE))
+    service.send_change_scene(1)
+    for value in range(200):
+        service.send_update_segment(0, "move_speed", float(value))
+    service.flush_pending()
+
+    deadline = time.monotonic() + 2.0
+    while engine.get_stats()['commands_received'] < 202 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    state = engine.export_state()
+    assert state['current_scene_id'] == 1
+    scene = [s for s in state['scenes'] if s['scene_id'] == 1][0]
+    assert scene['effects'][0]['segments']['0']['move_speed'] == 199.0
+
+
+def test_render_thread_produces_frames():
+    engine = MockPlaybackEngine(port=0, render=True)
+    assert engine.start()
+    time.sleep(0.2)
+    engine.stop()
+    assert engine.get_stats()['frames_rendered'] > 0
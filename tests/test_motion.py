@@ -0,0 +1,76 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from engine.motion import MotionSolver, position_at
+from models.segment import Segment
+
+
+def make_segment(**overrides):
+    params = dict(
+        segment_id=0,
+        color=[0],
+        transparency=[0.0],
+        length=[],
+        move_speed=10.0,
+        move_range=[10, 50],
+        initial_position=20,
+        current_position=20.0,
+        is_edge_reflect=True,
+        region_id=0,
+        dimmer_time=[],
+    )
+    params.update(overrides)
+    return Segment(**params)
+
+
+def integrate(segment, steps, dt):
+    """Reference frame-by-frame integration of segment movement"""
+    start, end = segment.move_range
+    position = float(segment.initial_position)
+    direction = 1.0
+    for _ in range(steps):
+        position += direction * segment.move_speed * dt
+        if segment.is_edge_reflect:
+            if position > end:
+                position = 2 * end - position
+                direction = -direction
+            elif position < start:
+                position = 2 * start - position
+                direction = -direction
+        else:
+            position = start + (position - start) % (end - start + 1)
+    return position
+
+
+def test_reflect_matches_frame_integration():
+    for speed in (10.0, -7.5):
+        segment = make_segment(move_speed=speed)
+        expected = integrate(segment, 600, 1 / 60)
+        assert np.isclose(position_at(segment, 10.0), expected)
+
+
+def test_wrap_matches_frame_integration():
+    segment = make_segment(is_edge_reflect=False, move_speed=13.0)
+    assert np.isclose(position_at(segment, 9.0), integrate(segment, 540, 1 / 60))
+
+
+def test_positions_vectorized_over_segments_and_timestamps():
+    segments = [make_segment(), make_segment(is_edge_reflect=False), make_segment(move_speed=0.0)]
+    solver = MotionSolver(segments)
+    times = np.arange(0, 5, 0.5)
+    timeline = solver.positions(times)
+    assert timeline.shape == (len(times), 3)
+    for row, t in zip(timeline, times):
+        assert np.allclose(row, [position_at(s, t) for s in segments])
+    assert np.all(timeline[:, 2] == 20)
+
+
+def test_seeking_far_ahead_stays_in_range():
+    solver = MotionSolver([make_segment(), make_segment(is_edge_reflect=False)])
+    positions = solver.positions(45 * 60.0)
+    assert np.all((positions >= 10) & (positions <= 50))
+    assert np.allclose(solver.cycle_durations(), [8.0, 4.1])
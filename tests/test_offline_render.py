@@ -0,0 +1,35 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from engine.offline import open_frame_file, render_scene_to_file
+from engine.renderer import FrameRenderer
+from tests.test_renderer import make_scene, make_segment
+
+
+def test_chunked_render_matches_frame_by_frame(tmp_path):
+    scene = make_scene(make_segment(move_speed=25.0, dimmer_time=[[500, 0, 100], [500, 100, 0]]))
+    path = str(tmp_path / "show.npy")
+    assert render_scene_to_file(scene, path, duration=1.0, chunk_frames=7)
+
+    frames = np.load(path, mmap_mode='r')
+    assert frames.shape == (60, 100, 3)
+    renderer = FrameRenderer(scene)
+    for index in (0, 6, 7, 33, 59):
+        assert np.array_equal(frames[index], renderer.render(0, index / scene.fps))
+
+
+def test_raw_rgb_output(tmp_path):
+    scene = make_scene(make_segment(move_speed=10.0))
+    path = str(tmp_path / "show.rgb")
+    assert render_scene_to_file(scene, path, duration=0.5)
+    assert os.path.getsize(path) == 30 * 100 * 3
+    frames = open_frame_file(path, 30, 100, mode='r')
+    assert np.array_equal(frames[12], FrameRenderer(scene).render(0, 12 / scene.fps))
+
+
+def test_empty_duration_fails(tmp_path):
+    assert not render_scene_to_file(make_scene(make_segment()), str(tmp_path / "show.npy"), duration=0.0)
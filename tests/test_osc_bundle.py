@@ -0,0 +1,71 @@
+import os
+import socket
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from pythonosc.osc_bundle import OscBundle
+from services.osc_bundle import pack_bundles
+from services.osc_service import OSCService
+
+
+def make_receiver():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(1.0)
+    return sock
+
+
+def receive_bundles(sock, count):
+    return [OscBundle(sock.recv(65536)) for _ in range(count)]
+
+
+def make_service(sock):
+    service = OSCService(client_port=sock.getsockname()[1])
+    service.start_client()
+    return service
+
+
+def test_bundles_split_to_mtu_and_share_timetag():
+    messages = [("/update_segment", (index, "move_speed", 1.5)) for index in range(200)]
+    bundles = pack_bundles(messages, timetag=1700000000.25, mtu=512)
+    assert len(bundles) > 1
+    assert all(bundle.size <= 512 for bundle in bundles)
+    assert len({bundle.timestamp for bundle in bundles}) == 1
+    assert sum(bundle.num_contents for bundle in bundles) == 200
+
+
+def test_batch_sends_collected_messages_as_bundles():
+    sock = make_receiver()
+    service = make_service(sock)
+    with service.batch():
+        service.send_create_segment(7)
+        for slot in range(3):
+            service.send_segment_length_update(7, slot, 10 + slot)
+        service.send_segment_transparency_update(7, 0, 0.5)
+
+    bundle, = receive_bundles(sock, 1)
+    contents = [(message.address, message.params) for message in bundle]
+    assert contents == [
+        ("/create_segment", [7]),
+        ("/update_segment", [7, "length", 0, 10]),
+        ("/update_segment", [7, "length", 1, 11]),
+        ("/update_segment", [7, "length", 2, 12]),
+        ("/update_segment", [7, "transparency", 0, 0.5]),
+    ]
+    service.coalescer.stop(flush=False)
+    sock.close()
+
+
+def test_batch_discarded_on_error():
+    sock = make_receiver()
+    service = make_service(sock)
+    with pytest.raises(RuntimeError):
+        with service.batch():
+            service.send_delete_segment(1)
+            raise RuntimeError("edit failed")
+    service.send_delete_segment(2)
+    assert sock.recv(65536).startswith(b"/delete_segment")
+    sock.close()
@@ -0,0 +1,110 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.osc_coalescer import OSCCoalescer, coalesce_key
+from services.osc_service import OSCService
+
+
+class RecordingClient:
+    def __init__(self):
+        self.messages = []
+    def send(self, message):
+        self.messages.append((message.address, tuple(message.params)))
+
+
+def make_service():
+    service = OSCService()
+    service.client = RecordingClient()
+    service.set_max_send_rate(1000)
+    return service
+
+
+def test_keys_separate_segments_params_and_slots():
+    assert coalesce_key("/update_segment", (5, "transparency", 0, 0.3)) == ("/update_segment", 5, "transparency", 0)
+    assert coalesce_key("/update_segment", (5, "move_speed", 2.0)) == ("/update_segment", 5, "move_speed")
+    assert coalesce_key("/palette/0/2", (1, 2, 3)) == ("/palette/0/2",)
+
+
+def test_latest_value_wins_within_flush():
+    sent = []
+    coalescer = OSCCoalescer(lambda address, args: sent.append((address, args)) or True, max_rate=1e-3)
+    coalescer.flush()
+    for value in range(10):
+        coalescer.submit("/update_segment", 1, "transparency", 0, value / 10)
+    coalescer.submit("/update_segment", 1, "transparency", 1, 0.5)
+    assert coalescer.flush() == 2
+    assert sent == [("/update_segment", (1, "transparency", 0, 0.9)), ("/update_segment", (1, "transparency", 1, 0.5))]
+    stats = coalescer.get_stats()
+    assert stats['coalesced'] == 9
+    assert stats['sent'] == 2
+    coalescer.stop(flush=False)
+
+
+def test_flush_rate_is_bounded():
+    sent = []
+    coalescer = OSCCoalescer(lambda address, args: sent.append(args) or True, max_rate=20)
+    start = time.monotonic()
+    while time.monotonic() - start < 0.25:
+        coalescer.submit("/palette/0/1", 1, 2, 3)
+        time.sleep(0.001)
+    coalescer.stop()
+    assert len(sent) <= 0.25 * 20 + 2
+    assert coalescer.get_stats()['coalesced'] >= 100
+
+
+def test_service_sends_pending_updates_before_structural_commands():
+    service = make_service()
+    service.set_max_send_rate(1)
+    service.coalescer.flush()
+    service.send_segment_transparency_update(3, 0, 0.25)
+    service.send_segment_transparency_update(3, 0, 0.5)
+    service.send_delete_segment(3)
+    assert service.client.messages == [
+        ("/update_segment", (3, "transparency", 0, 0.5)),
+        ("/delete_segment", (3,)),
+    ]
+    service.coalescer.stop(flush=False)
+
+
+def test_palette_color_updates_flush_in_background():
+    service = make_service()
+    for value in range(50):
+        service.send_palette_color_update(0, 2, value, 0, 0)
+    deadline = time.monotonic() + 1.0
+    while not service.client.messages and time.monotonic() < deadline:
+        time.sleep(0.005)
+    service.coalescer.stop()
+    assert service.client.messages[-1] == ("/palette/0/2", (49, 0, 0))
+    assert service.get_coalescing_stats()['sent'] < 50
+
+
+def test_concurrent_flushes_keep_latest_value_last():
+    sent = []
+    first_send = threading.Event()
+    release = threading.Event()
+
+    def slow_send(address, args):
+        if not first_send.is_set():
+            first_send.set()
+            release.wait(1.0)
+        sent.append(args)
+        return True
+
+    coalescer = OSCCoalescer(slow_send, max_rate=1e-3)
+    coalescer.submit("/update_segment", 1, "move_speed", 1.0)
+    stale = threading.Thread(target=coalescer.flush)
+    stale.start()
+    assert first_send.wait(1.0)
+    coalescer.submit("/update_segment", 1, "move_speed", 2.0)
+    fresh = threading.Thread(target=coalescer.flush)
+    fresh.start()
+    time.sleep(0.05)
+    release.set()
+    stale.join(1.0)
+    fresh.join(1.0)
+    coalescer.stop(flush=False)
+    assert sent == [(1, "move_speed", 1.0), (1, "move_speed", 2.0)]
@@ -0,0 +1,164 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from pythonosc.osc_message import OscMessage
+from services.mock_engine import MockPlaybackEngine
+from services.osc_bundle import build_message
+from services.osc_fanout import FanoutClient, OSCTarget, translate_args
+from services.osc_service import OSCService
+
+
+class StalledSocket:
+    """Socket standing in for an engine that takes 20ms per packet"""
+
+    def __init__(self):
+        self.sent = 0
+        self.dgrams = []
+
+    def sendto(self, dgram, address):
+        time.sleep(0.02)
+        self.sent += 1
+        self.dgrams.append(dgram)
+
+    def close(self):
+        pass
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_led_positions_translated_for_split_targets():
+    right = OSCTarget("127.0.0.1", 9000, led_start=100, led_count=150)
+    assert translate_args("/update_segment", (3, "move_range", 120, 200), right) == (3, "move_range", 20, 100)
+    assert translate_args("/update_segment", (3, "initial_position", 90), right) == (3, "initial_position", -10)
+    assert translate_args("/create_scene", (250, 60), right) == (150, 60)
+    assert translate_args("/update_scene", (1, "led_count", 250), right) == (1, "led_count", 150)
+    assert translate_args("/update_segment", (3, "move_speed", 4.0), right) is None
+    assert translate_args("/create_scene", (250, 60), OSCTarget("127.0.0.1", 9000, led_start=100)) is None
+
+
+def test_slow_target_only_backs_up_its_own_queue():
+    engine = MockPlaybackEngine(port=0)
+    assert engine.start()
+    client = FanoutClient([OSCTarget("127.0.0.1", engine.port), OSCTarget("127.0.0.1", 9, name="slow")])
+    stalled = StalledSocket()
+    client._queues[1]._sock = stalled
+    client._queues[1]._max_queue = 8
+    try:
+        started = time.monotonic()
+        for speed in range(50):
+            assert client.send_fast("/update_segment", (0, "move_speed", float(speed))) is not None
+        assert time.monotonic() - started < 0.2
+        assert wait_until(lambda: engine.get_stats()['commands_received'] >= 50)
+    finally:
+        client.close(drain=False)
+        engine.stop()
+
+    stats = client.get_stats()
+    assert stats[f"127.0.0.1:{engine.port}"]['messages_sent'] == 50
+    assert stats['slow']['dropped'] >= 40
+    assert stalled.sent + stats['slow']['dropped'] <= 50
+
+
+def test_service_fans_out_to_split_strip():
+    service = OSCService(server_port=0)
+    assert service.start_server()
+    reply_address = ("127.0.0.1", service.server_port)
+    left = MockPlaybackEngine(port=0, reply_address=reply_address)
+    right = MockPlaybackEngine(port=0, reply_address=reply_address)
+    assert left.start() and right.start()
+    service.set_targets([
+        OSCTarget("127.0.0.1", left.port, name="left", led_count=100),
+        OSCTarget("127.0.0.1", right.port, name="right", led_start=100, led_count=100),
+    ])
+    assert service.start_client()
+    try:
+        service.send_create_segment(7)
+        service.send_bundle([
+            ("/update_segment", (7, "move_range", 120, 180)),
+            ("/update_segment", (7, "move_speed", 3.0)),
+        ])
+        service.send_segment_initial_position_update(7, 130)
+        assert wait_until(lambda: left.get_stats()['commands_received'] >= 4 and right.get_stats()['commands_received'] >= 4)
+        assert wait_until(lambda: service.get_stats()['responses']['success'] >= 8)
+        stats = service.get_stats()['targets']
+    finally:
+        service.stop()
+        left.stop()
+        right.stop()
+
+    assert left.data_cache.get_segment("7").move_range == [120, 180]
+    assert right.data_cache.get_segment("7").move_range == [20, 80]
+    assert right.data_cache.get_segment("7").initial_position == 30
+    assert right.data_cache.get_segment("7").move_speed == 3.0
+    assert stats['left']['responses']['success'] == 4
+    assert stats['right']['responses']['success'] == 4
+    assert stats['right']['bytes_sent'] == stats['left']['bytes_sent']
+
+
+def test_unsplit_targets_share_one_encoding():
+    client = FanoutClient([OSCTarget("127.0.0.1", 9), OSCTarget("127.0.0.1", 9, name="copy")])
+    try:
+        size = client.send_fast("/palette/0/1", (1, 2, 3))
+    finally:
+        client.close()
+    assert size == build_message("/palette/0/1", (1, 2, 3)).size
+    assert client.templates.misses == 1
+
+
+
+def test_full_queue_drops_only_superseded_updates():
+    client = FanoutClient([OSCTarget("127.0.0.1", 9, name="slow")], max_queue=4)
+    stalled = StalledSocket()
+    client._queues[0]._sock = stalled
+    try:
+        for value in range(10):
+            client.send_fast("/update_segment", (0, "move_speed", float(value)))
+            client.send_fast("/create_segment", (value,))
+    finally:
+        client.close()
+
+    messages = [OscMessage(dgram) for dgram in stalled.dgrams]
+    updates = [message.params for message in messages if message.address == "/update_segment"]
+    assert [message.params[0] for message in messages if message.address == "/create_segment"] == list(range(10))
+    assert updates[-1] == [0, "move_speed", 9.0]
+    stats = client.get_stats()['slow']
+    assert stats['dropped'] == 10 - len(updates) and stats['dropped'] > 0
+    assert stats['overflowed'] == 0
+
+
+def test_full_queue_keeps_commands_without_blocking():
+    client = FanoutClient([OSCTarget("127.0.0.1", 9, name="slow")], max_queue=1)
+    stalled = StalledSocket()
+    client._queues[0]._sock = stalled
+    try:
+        started = time.monotonic()
+        for segment_id in range(5):
+            client.send_fast("/create_segment", (segment_id,))
+        assert time.monotonic() - started < 0.02
+    finally:
+        client.close()
+    assert [OscMessage(dgram).params[0] for dgram in stalled.dgrams] == list(range(5))
+    assert client.get_stats()['slow']['overflowed'] == 0
+
+
+def test_full_overflow_reports_overflow():
+    client = FanoutClient([OSCTarget("127.0.0.1", 9, name="slow")], max_queue=1, max_overflow=1)
+    client._queues[0]._sock = StalledSocket()
+    try:
+        started = time.monotonic()
+        for segment_id in range(5):
+            client.send_fast("/create_segment", (segment_id,))
+        assert time.monotonic() - started < 0.02
+    finally:
+        client.close()
+    stats = client.get_stats()['slow']
+    assert stats['overflowed'] >= 2
+    assert stats['messages_sent'] + stats['overflowed'] == 5
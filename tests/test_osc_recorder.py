@@ -0,0 +1,68 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.mock_engine import MockPlaybackEngine
+from services.osc_bundle import build_message
+from services.osc_recorder import INCOMING, OUTGOING, OSCRecorder, read_log, replay_log
+from services.osc_service import OSCService
+
+
+def record_session(path):
+    service = OSCService(server_port=0)
+    assert service.start_server()
+    engine = MockPlaybackEngine(port=0, reply_address=("127.0.0.1", service.server_port))
+    assert engine.start()
+    service.client_port = engine.port
+    service.start_client()
+    assert service.start_recording(path)
+    try:
+        service.send_create_segment(12)
+        for speed in range(10):
+            service.send_update_segment(12, "move_speed", float(speed))
+            time.sleep(0.02)
+        service.send_bundle([("/update_segment", (12, "move_range", 5, 50)), ("/palette/0/1", (1, 2, 3))])
+        deadline = time.monotonic() + 2.0
+        while service.get_stats()['responses']['success'] < 12 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        service.stop()
+        engine.stop()
+    return engine.export_state()
+
+
+def test_log_round_trip(tmp_path):
+    path = str(tmp_path / "session.osclog")
+    recorder = OSCRecorder(path)
+    first = build_message("/change_scene", (2,)).dgram
+    recorder.record(OUTGOING, first)
+    time.sleep(0.01)
+    recorder.record(INCOMING, b"reply")
+    recorder.close()
+    recorder.record(OUTGOING, b"after close")
+
+    records = list(read_log(path))
+    assert [(direction, dgram) for direction, _, dgram in records] == [(OUTGOING, first), (INCOMING, b"reply")]
+    assert 0.01 <= records[1][1] - records[0][1] < 0.5
+
+
+def test_recorded_session_replays_to_same_state(tmp_path):
+    path = str(tmp_path / "session.osclog")
+    recorded_state = record_session(path)
+    records = list(read_log(path))
+    assert sum(1 for direction, _, _ in records if direction == OUTGOING) == 12
+    assert sum(1 for direction, _, _ in records if direction == INCOMING) == 12
+
+    for speed, min_elapsed, max_elapsed in ((1.0, 0.18, 1.0), (4.0, 0.04, 0.15), (0, 0.0, 0.05)):
+        engine = MockPlaybackEngine(port=0)
+        assert engine.start()
+        try:
+            report = replay_log(path, ("127.0.0.1", engine.port), speed=speed, settle=0.2)
+        finally:
+            engine.stop()
+        assert report['packets'] == 12 and report['send_errors'] == 0
+        assert report['responses'] == 12 and report['dropped'] == 0
+        assert min_elapsed <= report['elapsed_s'] <= max_elapsed
+        assert engine.export_state() == recorded_state
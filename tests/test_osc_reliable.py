@@ -0,0 +1,158 @@
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.mock_engine import MockPlaybackEngine
+from services.osc_fanout import OSCTarget
+from services.osc_reliable import SEQUENCE_ADDRESS, ReliableSender, ReorderBuffer
+from services.osc_service import OSCService
+
+
+def test_unacked_commands_are_retransmitted_with_backoff_then_dropped():
+    sent = []
+    sender = ReliableSender(lambda messages, targets: sent.append((time.monotonic(), messages)) or True,
+                            initial_timeout=0.02, max_timeout=0.08, max_retries=3)
+    sender.send("/delete_segment", (4,))
+    sender.send("/create_dimmer", (1, 100, 0, 255))
+    sender.acknowledge(sender.session_id, 2)
+    assert sender.wait_idle(timeout=2.0)
+    sender.stop()
+
+    retries = [at for at, messages in sent if messages[1] == ("/delete_segment", (4,))]
+    assert len(retries) == 4
+    gaps = [later - earlier for earlier, later in zip(retries, retries[1:])]
+    assert gaps[0] < gaps[-1]
+    assert sent[0][1][0] == (SEQUENCE_ADDRESS, (sender.session_id, 1, 1))
+    assert sent[1][1][0] == (SEQUENCE_ADDRESS, (sender.session_id, 2, 1))
+    assert sender.get_stats() == {'sent': 2, 'acked': 1, 'retransmits': 3, 'failed': 1, 'outstanding': 0}
+
+
+def test_acks_from_other_sessions_are_ignored():
+    sender = ReliableSender(lambda messages, targets: True, initial_timeout=10.0)
+    sender.send("/create_effect", ())
+    sender.acknowledge(sender.session_id + 1, 1)
+    assert sender.get_stats()['outstanding'] == 1
+    sender.acknowledge(sender.session_id, 1)
+    assert sender.get_stats()['outstanding'] == 0
+    sender.stop()
+
+
+def test_reorder_buffer_releases_in_sequence_order():
+    buffer = ReorderBuffer(window=2)
+    assert buffer.accept(1, 2, "update") == []
+    assert buffer.accept(1, 2, "update") == []
+    assert buffer.accept(1, 1, "create") == [(1, "create"), (2, "update")]
+    assert buffer.accept(1, 1, "create") is None
+    assert buffer.accept(2, 1, "other session") == [(1, "other session")]
+
+    assert buffer.accept(1, 5, "after lost", base=3) == []
+    assert buffer.accept(1, 6, "later", base=5) == [(5, "after lost"), (6, "later")]
+    assert buffer.accept(1, 8, 8) == [] and buffer.accept(1, 9, 9) == []
+    assert buffer.accept(1, 10, 10) == [(8, 8), (9, 9), (10, 10)]
+    assert (buffer.duplicates, buffer.reordered, buffer.skipped) == (2, 6, 3)
+
+
+def test_structural_commands_survive_packet_loss():
+    service = OSCService(server_port=0)
+    assert service.start_server()
+    engine = MockPlaybackEngine(port=0, reply_address=("127.0.0.1", service.server_port), packet_loss=0.3, seed=2)
+    assert engine.start()
+    service.client_port = engine.port
+    service.start_client()
+    service.set_reliable_delivery(True, initial_timeout=0.02, max_timeout=0.1, max_retries=20)
+    try:
+        for segment_id in range(10, 40):
+            service.send_create_segment(segment_id)
+        service.send_palette_color_update(0, 1, 1, 2, 3)
+        service.flush_pending()
+        assert service.reliable.wait_idle(timeout=5.0)
+        stats = service.get_stats()['reliable']
+    finally:
+        service.stop()
+        engine.stop()
+
+    engine_stats = engine.get_stats()
+    assert set(range(10, 40)) <= set(engine.data_cache.get_segment_ids())
+    assert stats['acked'] == 30 and stats['failed'] == 0 and stats['retransmits'] > 0
+    assert engine_stats['packets_dropped'] > 0
+    assert engine_stats['errors'] == 0
+
+
+def test_update_waits_for_lost_create():
+    service = OSCService(server_port=0)
+    assert service.start_server()
+    engine = MockPlaybackEngine(port=0, reply_address=("127.0.0.1", service.server_port))
+    assert engine.start()
+    service.client_port = engine.port
+    service.start_client()
+    service.set_reliable_delivery(True, initial_timeout=0.05, max_timeout=0.1)
+    send_packet, lost = service._send_packet, []
+
+    def lose_first_create(content, targets=None):
+        if not lost and b"/create_segment" in content.dgram:
+            lost.append(content)
+            return
+        send_packet(content, targets)
+
+    service._send_packet = lose_first_create
+    try:
+        service.send_create_segment(50)
+        service.send_update_segment(50, "move_speed", 7.5)
+        assert service.reliable.wait_idle(timeout=5.0)
+    finally:
+        service.stop()
+        engine.stop()
+
+    assert lost
+    assert engine.data_cache.get_segment("50").move_speed == 7.5
+    assert engine.get_stats()['errors'] == 0 and engine.get_stats()['reordered'] == 1
+
+
+def test_each_target_must_ack_and_only_laggards_are_resent():
+    sent = []
+    sender = ReliableSender(lambda messages, targets: sent.append(targets) or True, initial_timeout=0.02, max_retries=50)
+    left, right = ("127.0.0.1", 9001), ("127.0.0.1", 9002)
+    sender.set_targets([left, right])
+    sender.send("/create_segment", (5,))
+    sender.acknowledge(sender.session_id, 1, left)
+    sender.acknowledge(sender.session_id, 1, left)
+    assert not sender.wait_idle(timeout=0.1)
+    sender.acknowledge(sender.session_id, 1, ("127.0.0.1", 9003))
+    assert sender.get_stats()['outstanding'] == 1
+    sender.acknowledge(sender.session_id, 1, right)
+    assert sender.wait_idle(timeout=1.0)
+    sender.stop()
+
+    assert sent[0] is None and len(sent) > 1
+    assert all(targets == [right] for targets in sent[1:])
+    assert sender.get_stats()['acked'] == 1
+
+
+def test_fanout_resends_to_engine_that_lost_packets():
+    service = OSCService(server_port=0)
+    assert service.start_server()
+    reply_address = ("127.0.0.1", service.server_port)
+    reliable = MockPlaybackEngine(port=0, reply_address=reply_address)
+    lossy = MockPlaybackEngine(port=0, reply_address=reply_address, packet_loss=0.3, seed=5)
+    assert reliable.start() and lossy.start()
+    service.set_targets([OSCTarget("127.0.0.1", reliable.port, name="reliable"),
+                         OSCTarget("127.0.0.1", lossy.port, name="lossy")])
+    service.start_client()
+    service.set_reliable_delivery(True, initial_timeout=0.02, max_timeout=0.1, max_retries=20)
+    try:
+        for segment_id in range(10, 30):
+            service.send_create_segment(segment_id)
+        assert service.reliable.wait_idle(timeout=5.0)
+        stats = service.get_stats()['reliable']
+    finally:
+        service.stop()
+        reliable.stop()
+        lossy.stop()
+
+    assert lossy.get_stats()['packets_dropped'] > 0
+    for engine in (reliable, lossy):
+        assert set(range(10, 30)) <= set(engine.data_cache.get_segment_ids())
+        assert engine.get_stats()['errors'] == 0
+    assert stats['acked'] == 20 and stats['failed'] == 0
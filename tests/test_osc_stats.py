@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.mock_engine import MockPlaybackEngine
+from services.osc_service import OSCService
+from services.osc_stats import LatencyHistogram, OSCStats
+
+
+def test_histogram_percentiles_within_relative_error():
+    rng = np.random.default_rng(3)
+    samples = rng.lognormal(mean=-7, sigma=1.5, size=20000)
+    histogram = LatencyHistogram()
+    for sample in samples:
+        histogram.record(sample)
+    for percent in (50, 90, 99):
+        expected = np.percentile(samples, percent) * 1000
+        assert abs(histogram.percentile(percent) - expected) <= expected * 0.02 + 0.001
+
+
+def test_responses_match_oldest_send_of_same_command():
+    stats = OSCStats()
+    stats.record_send("/create_segment", 24)
+    stats.record_send("/palette/0/1", 28)
+    stats.record_send("/palette/1/2", 28)
+    stats.record_response(True, [5, "/create_segment", 7])
+    stats.record_response(True, ["/delete_segment"])
+    stats.record_error("/delete_segment")
+
+    snapshot = stats.get_stats()
+    assert snapshot['messages_sent'] == 3
+    assert snapshot['bytes_sent'] == 80
+    assert snapshot['send_errors'] == 1
+    assert snapshot['responses'] == {'success': 2, 'error': 0, 'unmatched': 1, 'lost': 0}
+    assert snapshot['addresses']['/palette/{palette_id}/{color_index}']['messages'] == 2
+    assert snapshot['addresses']['/create_segment']['latency']['count'] == 1
+
+
+def test_lost_response_expires_instead_of_shifting_later_latencies():
+    stats = OSCStats(timeout=0.05)
+    stats.record_send("/update_segment", 32)
+    time.sleep(0.06)
+    stats.record_send("/update_segment", 32)
+    stats.record_response(True, ["/update_segment"])
+    stats.record_send("/create_segment", 24, correlation_id=7)
+    stats.record_send("/create_segment", 24, correlation_id=8)
+    stats.record_response(True, [8, "/create_segment"])
+
+    snapshot = stats.get_stats()
+    assert snapshot['responses'] == {'success': 2, 'error': 0, 'unmatched': 0, 'lost': 1}
+    assert snapshot['latency']['max_ms'] < 50
+    time.sleep(0.06)
+    assert stats.get_stats()['responses']['lost'] == 2
+
+
+def test_service_measures_round_trip_against_engine():
+    service = OSCService(server_port=0)
+    assert service.start_server()
+    engine = MockPlaybackEngine(port=0, reply_address=("127.0.0.1", service.server_port))
+    engine.start()
+    service.client_port = engine.port
+    service.start_client()
+    service.start_monitoring(dump_interval=None, ping_interval=0.02)
+
+    for speed in range(20):
+        service.send_update_segment(0, "move_speed", float(speed))
+    deadline = time.monotonic() + 2.0
+    while service.get_stats()['latency']['count'] < 22 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    service.stop()
+    engine.stop()
+
+    stats = service.get_stats()
+    assert stats['addresses']['/update_segment']['latency']['count'] == 20
+    assert stats['addresses']['/ping']['messages'] >= 2
+    assert 0 < stats['latency']['p50_ms'] <= stats['latency']['p99_ms']
@@ -0,0 +1,47 @@
+import os
+import socket
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.osc_bundle import build_message
+from services.osc_template import MessageTemplate, TemplateUDPClient, template_key
+
+
+def test_template_encoding_matches_message_builder():
+    cases = [
+        ("/palette/0/3", (255, 0, 128)),
+        ("/update_segment", (7, "transparency", 2, 0.25)),
+        ("/update_segment", (7, "move_speed", -12.5)),
+        ("/flag", (True, False, 1)),
+        ("/x", ()),
+    ]
+    for address, args in cases:
+        template = MessageTemplate(template_key(address, args))
+        assert bytes(template.encode(args)) == build_message(address, args).dgram
+        template.encode(tuple(0 if type(arg) is int else arg for arg in args))
+        assert bytes(template.encode(args)) == build_message(address, args).dgram
+
+
+def test_untemplatable_args_use_generic_path():
+    assert template_key("/load_json", (b"blob",)) is None
+    assert template_key("/x", (2 ** 40,)) is None
+    assert template_key("/x", (1,)) != template_key("/x", (1.0,))
+    assert template_key("/x", ("a",)) != template_key("/x", ("b",))
+
+
+def test_fast_sends_reach_socket_through_cached_templates():
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(("127.0.0.1", 0))
+    receiver.settimeout(1.0)
+    client = TemplateUDPClient("127.0.0.1", receiver.getsockname()[1])
+    try:
+        for value in range(3):
+            assert client.send_fast("/palette/1/2", (value, 10, 20)) == build_message("/palette/1/2", (value, 10, 20)).size
+        assert client.send_fast("/load_json", (b"x",)) is None
+        received = [receiver.recv(1024) for _ in range(3)]
+    finally:
+        client.close()
+        receiver.close()
+    assert received[2] == build_message("/palette/1/2", (2, 10, 20)).dgram
+    assert (client.templates.misses, client.templates.hits) == (1, 2)
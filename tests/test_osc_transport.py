@@ -0,0 +1,107 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from pythonosc.osc_packet import OscPacket
+from services.osc_bundle import build_message
+from services.osc_transport import AsyncOSCTransport, OSCResponseError
+
+
+class FakeBackend(asyncio.DatagramProtocol):
+    """Answers each correlated command; /delete_* fails, /ping is ignored, unknown ids are echoed back"""
+
+    def __init__(self, echo_ids=True):
+        self.echo_ids = echo_ids
+        self.next_id = 10
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        messages = [timed.message for timed in OscPacket(data).messages]
+        correlation = [m.params[0] for m in messages if m.address == "/correlation_id"]
+        command = [m for m in messages if m.address != "/correlation_id"][0]
+        if command.address == "/ping":
+            return
+        prefix = correlation if self.echo_ids else []
+        if command.address.startswith("/delete"):
+            reply = build_message("/response/error", prefix + [command.address, "not found"])
+        else:
+            self.next_id += 1
+            reply = build_message("/response/success", prefix + [command.address, self.next_id])
+        self.transport.sendto(reply.dgram, addr)
+
+
+async def start_pair(echo_ids=True, timeout=1.0):
+    loop = asyncio.get_running_loop()
+    backend_transport, backend = await loop.create_datagram_endpoint(
+        lambda: FakeBackend(echo_ids), local_addr=("127.0.0.1", 0)
+    )
+    transport = AsyncOSCTransport(server_port=0, client_port=backend_transport.get_extra_info('sockname')[1], timeout=timeout)
+    assert await transport.start()
+    return transport, backend_transport
+
+
+def test_create_returns_backend_assigned_ids():
+    async def scenario():
+        transport, backend = await start_pair()
+        assert await transport.duplicate_scene(0) == 11
+        assert await transport.duplicate_segment(3) == 12
+        transport.stop()
+        backend.close()
+    asyncio.run(scenario())
+
+
+def test_pipelined_requests_resolve_independently():
+    async def scenario():
+        transport, backend = await start_pair()
+        futures = [transport.submit("/create_segment", index) for index in range(50)]
+        futures.append(transport.submit("/delete_segment", 3))
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        assert all(result[0] == "/create_segment" for result in results[:50])
+        assert isinstance(results[50], OSCResponseError)
+        assert transport.pending_count() == 0
+        transport.stop()
+        backend.close()
+    asyncio.run(scenario())
+
+
+def test_uncorrelated_responses_resolve_oldest_command():
+    async def scenario():
+        transport, backend = await start_pair(echo_ids=False)
+        assert await transport.create_effect() == 11
+        transport.stop()
+        backend.close()
+    asyncio.run(scenario())
+
+
+def test_request_times_out():
+    async def scenario():
+        transport, backend = await start_pair(timeout=0.05)
+        with pytest.raises(asyncio.TimeoutError):
+            await transport.request("/ping")
+        assert transport.pending_count() == 0
+        transport.stop()
+        backend.close()
+    asyncio.run(scenario())
+
+
+def test_late_reply_after_timeout_is_dropped():
+    async def scenario():
+        transport, backend = await start_pair(timeout=0.05)
+        with pytest.raises(asyncio.TimeoutError):
+            await transport.request("/ping")
+        pending = transport.submit("/ping", timeout=1.0)
+        transport._on_message("/response/success", [1, "/create_scene", 7])
+        transport._on_message("/response/success", [99, "/create_scene", 8])
+        assert not pending.done()
+        transport._on_message("/response/error", [2, "/ping", "busy"])
+        with pytest.raises(OSCResponseError):
+            await pending
+        transport.stop()
+        backend.close()
+    asyncio.run(scenario())
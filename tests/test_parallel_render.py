@@ -0,0 +1,51 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from engine.offline import render_scene_to_file
+from engine.parallel import PackedEffect, render_scenes_parallel
+from engine.renderer import FrameRenderer
+from tests.test_renderer import make_scene, make_segment
+
+
+def test_packed_effect_matches_renderer():
+    scene = make_scene(
+        make_segment(0, move_speed=30.0, dimmer_time=[[400, 0, 100]]),
+        make_segment(1, color=[3, 4, 5], length=[5, 8], transparency=[0.2, 0.5, 0.0], move_speed=-12.0),
+    )
+    packed = PackedEffect(scene)
+    renderer = FrameRenderer(scene)
+    for t in (0.0, 0.3, 1.7):
+        assert np.array_equal(packed.render_index(t), renderer.render_index(0, t))
+
+
+def test_parallel_render_splits_scenes_and_chunks(tmp_path):
+    scenes = [make_scene(make_segment(move_speed=speed)) for speed in (5.0, 40.0)]
+    paths = [str(tmp_path / f"scene_{index}.npy") for index in range(len(scenes))]
+    assert render_scenes_parallel(scenes, paths, duration=1.0, chunk_frames=16, max_workers=2)
+
+    for scene, path in zip(scenes, paths):
+        frames = np.load(path, mmap_mode='r')
+        assert frames.shape == (60, 100, 3)
+        renderer = FrameRenderer(scene)
+        for index in (0, 15, 16, 59):
+            assert np.array_equal(frames[index], renderer.render(0, index / scene.fps))
+
+
+def test_parallel_render_matches_serial_bytes(tmp_path):
+    scene = make_scene(
+        make_segment(0, move_speed=30.0, dimmer_time=[[400, 0, 100], [300, 100, 20]]),
+        make_segment(1, color=[3, 4, 5], length=[5, 8], transparency=[0.2, 0.5, 0.0], move_speed=-12.0),
+    )
+    serial, parallel = str(tmp_path / "serial.rgb"), str(tmp_path / "parallel.rgb")
+    assert render_scene_to_file(scene, serial, duration=1.5, chunk_frames=32)
+    assert render_scenes_parallel([scene], [parallel], duration=1.5, chunk_frames=7, max_workers=2)
+    with open(serial, 'rb') as serial_file, open(parallel, 'rb') as parallel_file:
+        assert serial_file.read() == parallel_file.read()
+
+
+def test_parallel_render_rejects_mismatched_paths(tmp_path):
+    assert not render_scenes_parallel([make_scene(make_segment())], [], duration=1.0)
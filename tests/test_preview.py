@@ -0,0 +1,84 @@
+import os
+import struct
+import sys
+import time
+import zlib
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from components.preview.preview_action import PreviewActionHandler
+from engine.png import encode_png
+from services.data_cache import data_cache
+from tests.test_renderer import make_scene, make_segment
+
+
+class DummyPage:
+    def __init__(self):
+        self.tasks = []
+    def run_task(self, handler, *args):
+        self.tasks.append((handler, args))
+
+
+def use_scene(monkeypatch, scene):
+    monkeypatch.setitem(data_cache.scenes, scene.scene_id, scene)
+    monkeypatch.setattr(data_cache, 'current_scene_id', scene.scene_id)
+
+
+def make_handler():
+    frames = []
+    handler = PreviewActionHandler(DummyPage(), frames.append)
+    return handler, frames
+
+
+def test_png_encodes_rgb_rows():
+    frame = np.arange(12, dtype=np.uint8).reshape(4, 3)
+    png = encode_png(frame)
+    assert png.startswith(b'\x89PNG\r\n\x1a\n')
+    width, height = struct.unpack('>II', png[16:24])
+    assert (width, height) == (4, 1)
+    idat_length = struct.unpack('>I', png[33:37])[0]
+    raw = zlib.decompress(png[41:41 + idat_length])
+    assert raw == b'\x00' + frame.tobytes()
+
+
+def test_step_skips_frames_when_behind(monkeypatch):
+    use_scene(monkeypatch, make_scene(make_segment(move_speed=60.0)))
+    handler, frames = make_handler()
+    handler._start_time = 0.0
+    assert handler.step(0.0)
+    assert not handler.step(0.01)
+    assert handler.step(5.5 / 60)
+    assert handler.frames_skipped == 4
+    assert len(frames) == 2
+
+
+def test_static_effect_pushes_single_frame(monkeypatch):
+    use_scene(monkeypatch, make_scene(make_segment(move_speed=0.0)))
+    handler, frames = make_handler()
+    handler._start_time = 0.0
+    for frame in range(10):
+        handler.step(frame / 60)
+    assert len(frames) == 1
+    assert handler.get_stats()['frames_unchanged'] == 9
+
+
+def test_start_schedules_single_loop():
+    handler, _ = make_handler()
+    handler.start()
+    handler.start()
+    assert len(handler.page.tasks) == 1
+    handler.stop()
+    assert not handler.is_playing
+
+
+def test_thousand_led_frame_fits_30_fps_budget(monkeypatch):
+    segments = [make_segment(i, move_speed=20.0 + i, move_range=[0, 990]) for i in range(20)]
+    use_scene(monkeypatch, make_scene(*segments, led_count=1000))
+    handler, _ = make_handler()
+    handler.render_image(0.0)
+    start = time.perf_counter()
+    for frame in range(30):
+        handler.render_image(frame / 60)
+    assert (time.perf_counter() - start) / 30 < 1 / 30
@@ -0,0 +1,108 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from engine.dimmer import dimmer_brightness
+from engine.renderer import FrameRenderer, apply_palette, palette_to_array
+from engine.strip_cache import build_segment_strip
+from models.effect import Effect
+from models.scene import Scene
+from models.segment import Segment
+
+
+PALETTE = [[0, 0, 0], [255, 0, 0], [0, 255, 0], [0, 0, 255], [255, 255, 0], [255, 255, 255]]
+
+
+def make_segment(segment_id=0, **overrides):
+    params = dict(
+        segment_id=segment_id,
+        color=[1, 2],
+        transparency=[0.0, 0.0],
+        length=[10],
+        move_speed=0.0,
+        move_range=[0, 90],
+        initial_position=0,
+        current_position=0.0,
+        is_edge_reflect=True,
+        region_id=0,
+        dimmer_time=[],
+    )
+    params.update(overrides)
+    return Segment(**params)
+
+
+def make_scene(*segments, led_count=100):
+    effect = Effect(effect_id=0)
+    for segment in segments:
+        effect.add_segment(segment)
+    return Scene(
+        scene_id=0,
+        led_count=led_count,
+        fps=60,
+        current_effect_id=0,
+        current_palette_id=0,
+        palettes=[PALETTE],
+        effects=[effect],
+    )
+
+
+def test_render_returns_uint8_frame_of_led_count():
+    frame = FrameRenderer(make_scene(make_segment())).render(0, 0.0)
+    assert frame.shape == (100, 3)
+    assert frame.dtype == np.uint8
+
+
+def test_strip_interpolates_between_color_slots():
+    rgb, alpha = build_segment_strip(make_segment(), palette_to_array(PALETTE))
+    assert len(rgb) == 11
+    assert rgb[0].tolist() == [255, 0, 0]
+    assert rgb[10].tolist() == [0, 255, 0]
+    assert np.allclose(rgb[5], [127.5, 127.5, 0])
+    assert np.allclose(alpha, 1.0)
+
+
+def test_segment_moves_with_speed():
+    scene = make_scene(make_segment(color=[5], transparency=[0.0], length=[], move_speed=10.0))
+    frame = FrameRenderer(scene).render(0, 2.0)
+    assert frame[20].tolist() == [255, 255, 255]
+    assert frame[:20].sum() == 0
+
+
+def test_edge_reflect_bounces_back():
+    segment = make_segment(color=[5], transparency=[0.0], length=[], move_speed=10.0, move_range=[0, 50])
+    frame = FrameRenderer(make_scene(segment)).render(0, 7.0)
+    assert frame[30].tolist() == [255, 255, 255]
+
+
+def test_dimmer_and_transparency_scale_output():
+    assert dimmer_brightness([[1000, 0, 100]], 0.5) == 0.5
+    assert dimmer_brightness([[1000, 0, 100]], 1.25) == 0.25
+    segment = make_segment(color=[5], transparency=[0.5], length=[], dimmer_time=[[1000, 50, 50]])
+    frame = FrameRenderer(make_scene(segment)).render(0, 0.0)
+    assert frame[0].tolist() == [64, 64, 64]
+
+
+def test_unknown_effect_renders_black():
+    frame = FrameRenderer(make_scene(make_segment())).render(7, 0.0)
+    assert not frame.any()
+
+
+def test_later_segments_draw_over_earlier_ones():
+    below = make_segment(0, color=[1], transparency=[0.0], length=[])
+    above = make_segment(1, color=[3], transparency=[0.5], length=[])
+    frame = FrameRenderer(make_scene(below, above)).render(0, 0.0)
+    assert frame[0].tolist() == [128, 0, 128]
+
+
+def test_index_frame_is_palette_independent():
+    scene = make_scene(make_segment(), make_segment(1, color=[3, 4], transparency=[0.2, 0.7], initial_position=5))
+    scene.palettes.append([[10 * i, 20 * i, 30 * i] for i in range(6)])
+    renderer = FrameRenderer(scene)
+    index_frame = renderer.render_index(0, 0.0)
+    assert index_frame.shape == (100, 6)
+    for palette_id in (0, 1):
+        expected = renderer.render(0, 0.0, palette_id)
+        assert np.array_equal(apply_palette(index_frame, renderer.get_palette(palette_id)), expected)
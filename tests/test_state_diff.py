@@ -0,0 +1,158 @@
+import copy
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.data_cache import DataCacheService
+from services.mock_engine import MockPlaybackEngine
+from services.osc_service import OSCService
+from services.state_diff import diff_states, new_segment_dict
+
+
+SHOW_FILE = os.path.join(os.path.dirname(__file__), "..", "jsons", "multiple_scenes.json")
+
+
+def load_show():
+    cache = DataCacheService()
+    cache.load_from_file(SHOW_FILE)
+    return cache.export_to_dict()
+
+
+def comparable(state):
+    state = copy.deepcopy(state)
+    for scene in state['scenes']:
+        scene['effects'] = sorted(scene['effects'], key=lambda effect: effect['effect_id'])
+        for effect in scene['effects']:
+            for segment in effect['segments'].values():
+                segment.pop('current_position')
+                segment.pop('region_id')
+                segment['move_speed'] = float(segment['move_speed'])
+            effect['segment_order'] = list(effect['segments'])
+    return state
+
+
+def apply(state, commands):
+    engine = MockPlaybackEngine(port=0)
+    engine.data_cache.load_from_json_data(state)
+    engine.data_cache.current_scene_id = state['current_scene_id']
+    engine.data_cache.current_effect_id = state['current_effect_id']
+    engine.data_cache.current_palette_id = state['current_palette_id']
+    for address, args in commands:
+        replies = engine.handle_command(address, list(args))
+        assert not replies or replies[0][0] != "/response/error", (address, args, replies)
+    return engine.export_state()
+
+
+def mutate(state, rng):
+    scenes = state['scenes']
+    for scene in scenes:
+        scene['fps'] = rng.choice([scene['fps'], 24, 120])
+        palette = rng.choice(scene['palettes'])
+        palette[rng.randrange(len(palette))] = [rng.randrange(256) for _ in range(3)]
+        for effect in scene['effects']:
+            segments = effect['segments']
+            for seg_id in list(segments):
+                segment = segments[seg_id]
+                roll = rng.random()
+                if roll < 0.1:
+                    del segments[seg_id]
+                elif roll < 0.3:
+                    segment['color'] = segment['color'] + [rng.randrange(6)]
+                    segment['transparency'] = segment['transparency'] + [0.5]
+                    segment['length'] = segment['length'] + [rng.randrange(1, 40)]
+                    segment['dimmer_time'] = segment['dimmer_time'][:1]
+                elif roll < 0.5:
+                    segment['move_range'] = [5, 100]
+                    segment['is_edge_reflect'] = not segment['is_edge_reflect']
+                    segment['dimmer_time'] = segment['dimmer_time'] + [[250, 10, 90]]
+            items = list(segments.items())
+            rng.shuffle(items)
+            effect['segments'] = dict(items)
+    new_segment = new_segment_dict(77)
+    new_segment['color'] = [5, 4, 3, 2]
+    new_segment['transparency'] = [0.0, 0.5, 1.0, 1.0]
+    new_segment['length'] = [30, 20, 10]
+    new_segment['dimmer_time'] = [[500, 0, 255]]
+    scenes[0]['effects'][0]['segments']['77'] = new_segment
+    scenes[-1]['effects'].append({'effect_id': max(e['effect_id'] for e in scenes[-1]['effects']) + 1, 'segments': {}})
+    scenes[0]['palettes'].pop()
+    state['current_scene_id'] = scenes[-1]['scene_id']
+    state['current_effect_id'] = scenes[-1]['effects'][-1]['effect_id']
+    scenes[-1]['current_effect_id'] = state['current_effect_id']
+    state['current_palette_id'] = scenes[-1]['current_palette_id']
+
+
+def test_identical_states_need_no_commands():
+    state = load_show()
+    assert diff_states(state, copy.deepcopy(state)) == []
+
+
+def test_small_edit_sends_only_that_edit():
+    current = load_show()
+    target = copy.deepcopy(current)
+    target['scenes'][0]['effects'][0]['segments']['0']['move_speed'] = 12.5
+    assert diff_states(current, target) == [("/update_segment", (0, "move_speed", 12.5))]
+
+
+def test_random_edits_converge():
+    for seed in range(10):
+        rng = random.Random(seed)
+        current = load_show()
+        target = copy.deepcopy(current)
+        mutate(target, rng)
+        commands = diff_states(current, target)
+        assert commands is not None
+        assert comparable(apply(current, commands)) == comparable(target)
+
+
+def test_created_and_deleted_scenes_converge():
+    current = load_show()
+    target = copy.deepcopy(current)
+    removed = target['scenes'].pop(0)
+    added = copy.deepcopy(target['scenes'][-1])
+    added['scene_id'] = max(scene['scene_id'] for scene in current['scenes']) + 1
+    for effect in added['effects']:
+        effect['segments'] = {seg_id: segment for seg_id, segment in effect['segments'].items() if len(segment['color']) >= 3}
+    target['scenes'].append(added)
+    target['current_scene_id'] = added['scene_id']
+    commands = diff_states(current, target)
+    assert ("/delete_scene", (removed['scene_id'],)) in commands
+    assert comparable(apply(current, commands)) == comparable(target)
+
+
+def test_unassignable_ids_need_full_reload():
+    current = load_show()
+    target = copy.deepcopy(current)
+    extra = copy.deepcopy(target['scenes'][0])
+    extra['scene_id'] = 50
+    target['scenes'].append(extra)
+    assert diff_states(current, target) is None
+
+
+def test_sync_delta_against_engine():
+    service = OSCService(server_port=0)
+    assert service.start_server()
+    engine = MockPlaybackEngine(port=0, reply_address=("127.0.0.1", service.server_port))
+    assert engine.start()
+    engine.data_cache.load_from_file(SHOW_FILE)
+    service.client_port = engine.port
+    service.start_client()
+
+    cache = DataCacheService()
+    cache.load_from_file(SHOW_FILE)
+    cache.update_segment_parameter("0", "move_range", [3, 33])
+    cache.add_dimmer_element("0", [100, 0, 255])
+    try:
+        assert service.sync_delta(cache, timeout=5.0)
+        deadline = time.monotonic() + 2.0
+        while comparable(engine.export_state()) != comparable(cache.export_to_dict()) and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        service.stop()
+        engine.stop()
+
+    assert comparable(engine.export_state()) == comparable(cache.export_to_dict())
+    assert engine.get_stats()['by_address'].get('/load_json') is None
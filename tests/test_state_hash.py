@@ -0,0 +1,98 @@
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.data_cache import DataCacheService
+from services.mock_engine import MockPlaybackEngine
+from services.osc_transport import AsyncOSCTransport
+from services.state_hash import digest
+
+
+SHOW_FILE = os.path.join(os.path.dirname(__file__), "..", "jsons", "multiple_scenes.json")
+
+
+def load_show():
+    cache = DataCacheService()
+    cache.load_from_file(SHOW_FILE)
+    return cache
+
+
+def fresh_hash(cache):
+    """Hash of the same show rebuilt from scratch, bypassing cached node hashes"""
+    rebuilt = DataCacheService()
+    rebuilt.load_from_json_data(cache.export_to_dict())
+    return rebuilt.get_state_hash()
+
+
+def test_mutations_update_hash_like_full_rehash():
+    cache = load_show()
+    hashes = {cache.get_state_hash()}
+    mutations = [
+        lambda: cache.update_segment_parameter("0", "move_speed", 42.0),
+        lambda: cache.update_segment_parameter("0", "transparency", {"index": 0, "transparency": 0.3}),
+        lambda: cache.update_palette_color(0, 1, [9, 9, 9]),
+        lambda: cache.add_dimmer_element("0", [10, 20, 30]),
+        lambda: cache.create_segment(custom_id=40),
+        lambda: cache.reorder_segments(["40"] + [seg_id for seg_id in cache.get_current_effect().segments if seg_id != "40"]),
+        lambda: cache.update_scene(cache.current_scene_id, {"fps": 12}),
+        lambda: cache.create_effect(),
+    ]
+    for mutate in mutations:
+        mutate()
+        current = cache.get_state_hash()
+        assert current == fresh_hash(cache)
+        assert current not in hashes
+        hashes.add(current)
+
+
+def test_unchanged_subtrees_keep_cached_hashes():
+    cache = load_show()
+    cache.get_state_hash()
+    other_scene = cache.get_scene(1)
+    other_hash = other_scene.content_hash
+    segment = cache.get_segment("0")
+    cache.update_segment_parameter("0", "move_speed", 5.0)
+
+    assert other_scene.content_hash == other_hash
+    assert segment.content_hash is None
+    assert cache.get_current_scene().content_hash is None
+
+
+def test_selection_and_runtime_position_are_not_hashed():
+    cache = load_show()
+    before = cache.get_state_hash()
+    cache.set_current_scene(1)
+    cache.update_segment_parameter("0", "current_position", 17.0)
+    assert cache.get_state_hash() == before
+    assert digest({'a': 1, 'b': [1.5]}) == digest({'b': [1.5], 'a': 1})
+
+
+def test_drift_located_against_engine():
+    engine = MockPlaybackEngine(port=0)
+    assert engine.start()
+    engine.data_cache.load_from_file(SHOW_FILE)
+    cache = load_show()
+    cache.set_current_scene(2)
+    cache.update_segment_parameter("1", "move_range", [1, 2])
+    cache.set_current_scene(0)
+    cache.update_palette_color(1, 0, [1, 2, 3])
+    cache.create_effect()
+
+    async def main():
+        transport = AsyncOSCTransport(server_port=0, client_port=engine.port)
+        assert await transport.start()
+        try:
+            drift = await transport.find_state_drift(cache)
+            engine.data_cache.load_from_json_data(cache.export_to_dict())
+            return drift, await transport.find_state_drift(cache)
+        finally:
+            transport.stop()
+
+    try:
+        drift, after_sync = asyncio.run(main())
+    finally:
+        engine.stop()
+    assert sorted(drift) == [(0,), (0, 2), (2, 0, 1)]
+    assert after_sync == []
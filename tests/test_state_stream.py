@@ -0,0 +1,89 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from services.data_cache import DataCacheService
+from services.mock_engine import MockPlaybackEngine
+from services.osc_service import OSCService
+from services.state_stream import StateTransfer, chunk_stream, encode_state_records
+
+
+SHOW_FILE = os.path.join(os.path.dirname(__file__), "..", "jsons", "multiple_scenes.json")
+
+
+def load_show():
+    cache = DataCacheService()
+    cache.load_from_file(SHOW_FILE)
+    cache.set_current_scene(1)
+    return cache
+
+
+def test_chunks_out_of_order_rebuild_show():
+    source = load_show()
+    chunks = chunk_stream(encode_state_records(source), 97)
+    target = DataCacheService()
+    notifications = []
+    target.add_change_listener(lambda: notifications.append(1))
+    transfer = StateTransfer(1, target, lambda transfer_id, seqs: None)
+
+    order = list(range(1, len(chunks), 2)) + [1, 3] + list(range(0, len(chunks), 2))
+    for seq in order:
+        transfer.handle_chunk(seq, len(chunks), chunks[seq])
+
+    assert transfer.succeeded
+    assert target.export_to_dict() == source.export_to_dict()
+    assert target.current_scene_id == 1
+    assert len(notifications) == 1
+    assert transfer.get_stats()['duplicates'] == 2
+
+
+def test_stalled_transfer_requests_missing_chunks():
+    source = load_show()
+    chunks = chunk_stream(encode_state_records(source), 256)
+    requested = []
+    transfer = StateTransfer(7, DataCacheService(), lambda transfer_id, seqs: requested.append((transfer_id, seqs)))
+    for seq in range(len(chunks)):
+        if seq not in (0, 4):
+            transfer.handle_chunk(seq, len(chunks), chunks[seq])
+
+    assert not transfer.poll(transfer.last_activity)
+    assert transfer.poll(transfer.last_activity + 1.0) is False
+    assert requested == [(7, [0, 4])]
+    for seq in requested[0][1]:
+        transfer.handle_chunk(seq, len(chunks), chunks[seq])
+    assert transfer.succeeded
+
+
+def test_failed_transfer_keeps_previous_show():
+    target = load_show()
+    before = target.export_to_dict()
+    transfer = StateTransfer(1, target, lambda transfer_id, seqs: None, max_retries=0)
+    transfer.handle_chunk(0, 2, b'{"type":"scene","scene":{"scene_id":9')
+    assert transfer.poll(transfer.last_activity + 1.0)
+    assert not transfer.succeeded
+    assert target.export_to_dict() == before
+
+    transfer = StateTransfer(2, target, lambda transfer_id, seqs: None)
+    transfer.handle_chunk(0, 1, b'{"type":"bogus"}\n')
+    assert transfer.error is not None
+    assert target.export_to_dict() == before
+
+
+def test_sync_from_lossy_engine():
+    service = OSCService(server_port=0)
+    assert service.start_server()
+    engine = MockPlaybackEngine(port=0, reply_address=("127.0.0.1", service.server_port), chunk_loss=0.3, seed=5)
+    assert engine.start()
+    engine.data_cache.load_from_file(SHOW_FILE)
+    service.client_port = engine.port
+    service.start_client()
+    try:
+        cache = DataCacheService()
+        assert service.sync_full_state(cache, timeout=5.0, chunk_size=512)
+    finally:
+        service.stop()
+        engine.stop()
+
+    assert engine.get_stats()['chunks_dropped'] > 0
+    assert cache.export_to_dict() == engine.export_state()
@@ -0,0 +1,90 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from engine.strip_cache import StripCache, build_effect_strips, strip_cache
+from models.segment import Segment
+from services.data_cache import DataCacheService
+
+
+def make_segment(segment_id=0, color=None, length=None):
+    return Segment(
+        segment_id=segment_id,
+        color=color or [1, 2],
+        transparency=[0.0] * len(color or [1, 2]),
+        length=length or [10],
+        move_speed=0.0,
+        move_range=[0, 90],
+        initial_position=0,
+        current_position=0.0,
+        is_edge_reflect=True,
+        region_id=0,
+        dimmer_time=[],
+    )
+
+
+def test_hits_and_misses_are_counted():
+    cache = StripCache()
+    segment = make_segment()
+    first = cache.get(segment)
+    second = cache.get(segment)
+    assert first is second
+    stats = cache.get_stats()
+    assert stats['misses'] == 1
+    assert stats['hits'] == 1
+    assert stats['entries'] == 1
+
+
+def test_identical_compositions_share_one_strip():
+    cache = StripCache()
+    strips = cache.get_many([make_segment(0), make_segment(1), make_segment(2, color=[3, 4])])
+    assert strips[0] is strips[1]
+    assert strips[0] is not strips[2]
+    assert cache.get_stats()['misses'] == 2
+
+
+def test_cached_strip_matches_direct_rasterisation():
+    cache = StripCache()
+    segment = make_segment(color=[1, 2, 3], length=[4, 7])
+    weights, alpha = cache.get(segment)
+    expected_weights, expected_alpha, _, _ = build_effect_strips([segment])
+    assert np.array_equal(weights, expected_weights)
+    assert np.array_equal(alpha, expected_alpha)
+    assert not weights.flags.writeable
+
+
+def test_lru_eviction_respects_byte_budget():
+    cache = StripCache()
+    strip_bytes = sum(part.nbytes for part in cache.get(make_segment(length=[20])))
+    cache = StripCache(max_bytes=strip_bytes * 2)
+    first, second, third = (make_segment(length=[20], color=[c, c]) for c in (1, 2, 3))
+    cache.get(first)
+    cache.get(second)
+    cache.get(first)
+    cache.get(third)
+    stats = cache.get_stats()
+    assert stats['evictions'] == 1
+    assert stats['bytes'] <= stats['max_bytes']
+    cache.get(first)
+    assert cache.get_stats()['hits'] == 2
+
+
+def test_parameter_update_evicts_only_affected_strip():
+    dc = DataCacheService()
+    strip_cache.clear()
+    segment = dc.get_segment("0")
+    other = make_segment(color=[5, 4, 3])
+    old_key = StripCache.key_for(segment)
+    strip_cache.get_many([segment, other])
+
+    assert dc.update_segment_parameter("0", "move_speed", 3.0)
+    assert strip_cache.get_stats()['entries'] == 2
+
+    assert dc.update_segment_parameter("0", "length", {"index": 0, "length": 3})
+    assert strip_cache.get_stats()['entries'] == 1
+    assert StripCache.key_for(segment) != old_key
+    strip_cache.get(other)
+    assert strip_cache.get_stats()['hits'] == 1